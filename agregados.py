@@ -0,0 +1,143 @@
+# agregados.py
+import bisect
+
+COLUMNAS_POSICIONES = ["Grupo", "Pos", "Equipo", "PJ", "G", "E", "P", "GF", "GC", "DG", "Pts"]
+COLUMNAS_RESULTADOS = ["Grupo", "Equipo 1", "Equipo 2", "Resultado"]
+COLUMNAS_GOLEADORES = ["Equipo", "Goles a favor", "Puntos"]
+COLUMNAS_CONFEDERACIONES = ["Confederación", "PJ", "G", "E", "P", "Pts"]
+COLUMNAS_TARJETAS = ["Equipo", "Tarj. Amarillas", "Tarj. Rojas"]
+CAMPOS_CONFEDERACION = ("PJ", "G", "E", "P", "Pts")
+
+
+class AgregadosInformes:
+    """
+    Los números de los cinco informes, mantenidos a medida que el torneo cambia
+    (se suscribe con Torneo.escuchar). Cada cambio toca sólo las filas de los
+    equipos y partidos afectados; `version` sube con cada cambio para que las
+    vistas sepan si lo que ya mostraron sigue vigente.
+    """
+    def __init__(self, torneo):
+        self.torneo = torneo
+        self.version = 0
+        self._reconstruir()
+        torneo.escuchar(self._al_cambiar)
+
+    def cerrar(self):
+        """Deja de seguir los cambios del torneo (ver Torneo.soltar_derivados)."""
+        self.torneo.dejar_de_escuchar(self._al_cambiar)
+
+    # ============================ MANTENIMIENTO ============================
+    def _reconstruir(self):
+        self._equipos = {}          # id -> (grupo, confederación, stats vistos)
+        self._orden = {}            # id -> orden de alta (desempate estable)
+        self._goles = []            # [(-GF, -Pts, orden, id)] ordenado
+        self._tarjetas = []         # [(-(TA+TR), -TR, orden, id)] ordenado
+        self._confederaciones = {}  # conf -> {campo: total}
+        self._grupos_sucios = set(self.torneo.grupos)
+        self._posiciones = {}       # grupo -> filas
+        self._posiciones_todas = None
+        self._resultados = {}       # match_id -> fila (sólo fase de grupos)
+        for id in self.torneo.equipos:
+            self._actualizar_equipo(id)
+        for mid in self.torneo.partidos_por_fase("Fase de Grupos"):
+            self._actualizar_partido(mid)
+        self.version += 1
+
+    def _al_cambiar(self, partidos, equipos):
+        if partidos is None and equipos is None:
+            self._reconstruir()
+            return
+        for id in equipos:
+            self._actualizar_equipo(id)
+        for mid in partidos:
+            self._actualizar_partido(mid)
+        self.version += 1
+
+    @staticmethod
+    def _clave_goles(stats, orden, id):
+        return (-stats['GF'], -stats['Pts'], orden, id)
+
+    @staticmethod
+    def _clave_tarjetas(stats, orden, id):
+        return (-(stats['TA'] + stats['TR']), -stats['TR'], orden, id)
+
+    @staticmethod
+    def _quitar(lista, clave):
+        i = bisect.bisect_left(lista, clave)
+        if i < len(lista) and lista[i] == clave:
+            del lista[i]
+
+    def _actualizar_equipo(self, id):
+        orden = self._orden.setdefault(id, len(self._orden))
+        anterior = self._equipos.pop(id, None)
+        if anterior:
+            grupo, conf, stats = anterior
+            self._quitar(self._goles, self._clave_goles(stats, orden, id))
+            self._quitar(self._tarjetas, self._clave_tarjetas(stats, orden, id))
+            totales = self._confederaciones[conf]
+            for c in CAMPOS_CONFEDERACION:
+                totales[c] -= stats[c]
+            self._grupos_sucios.add(grupo)
+
+        e = self.torneo.equipos.get(id)
+        if e is None:
+            return
+        stats = dict(e.stats)
+        conf = e.confederacion or "Desconocida"
+        self._equipos[id] = (e.grupo, conf, stats)
+        bisect.insort(self._goles, self._clave_goles(stats, orden, id))
+        bisect.insort(self._tarjetas, self._clave_tarjetas(stats, orden, id))
+        totales = self._confederaciones.setdefault(conf, {c: 0 for c in CAMPOS_CONFEDERACION})
+        for c in CAMPOS_CONFEDERACION:
+            totales[c] += stats[c]
+        if e.grupo:
+            self._grupos_sucios.add(e.grupo)
+
+    def _actualizar_partido(self, mid):
+        p = self.torneo.calendario.get(mid)
+        if p is None or p.fase != "Fase de Grupos":
+            self._resultados.pop(mid, None)
+            return
+        e1 = self.torneo.equipos.get(p.id_equipo1)
+        e2 = self.torneo.equipos.get(p.id_equipo2)
+        if not e1 or not e2:
+            self._resultados.pop(mid, None)
+            return
+        res = f"{p.goles_e1} - {p.goles_e2}" if p.goles_e1 is not None else "Pendiente"
+        self._resultados[mid] = [e1.grupo, e1.pais, e2.pais, res]
+
+    # ============================ LECTURA ============================
+    def posiciones(self):
+        """Tabla general: una fila por equipo, grupo por grupo."""
+        if self._grupos_sucios:
+            for g in self._grupos_sucios:
+                tabla = self.torneo.calcular_tabla_posiciones(g)
+                self._posiciones[g] = [
+                    [g, i, e.pais, e.stats['PJ'], e.stats['G'], e.stats['E'], e.stats['P'],
+                     e.stats['GF'], e.stats['GC'], e.stats['DG'], e.stats['Pts']]
+                    for i, e in enumerate(tabla, start=1)]
+            self._grupos_sucios = set()
+            self._posiciones_todas = None
+        if self._posiciones_todas is None:
+            self._posiciones_todas = [fila for g in sorted(self._posiciones) for fila in self._posiciones[g]]
+        return self._posiciones_todas
+
+    def resultados_grupos(self):
+        return list(self._resultados.values())
+
+    def goleadores(self, n=None):
+        claves = self._goles if n is None else self._goles[:n]
+        return [[self.torneo.equipos[id].pais, -gf, -pts] for gf, pts, _, id in claves]
+
+    def confederaciones(self):
+        return [[c] + [v[campo] for campo in CAMPOS_CONFEDERACION] for c, v in self._confederaciones.items()]
+
+    def tarjetas(self, n=None):
+        claves = self._tarjetas if n is None else self._tarjetas[:n]
+        return [[self.torneo.equipos[id].pais, self._equipos[id][2]['TA'], self._equipos[id][2]['TR']]
+                for _, _, _, id in claves]
+
+
+def agregados_de(torneo):
+    """Los agregados del torneo (se crean la primera vez y después sólo se mantienen)."""
+    return torneo.derivado('agregados', AgregadosInformes)
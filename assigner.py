@@ -2,9 +2,15 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import pandas as pd
 from utils import apply_style, center_fullscreen
-from core import load_teams_from_excel
+from core import load_teams_from_excel, load_team_info_from_excel, EQUIPOS_EJEMPLO, TorneoError
+from persistencia import trabajador
+from fixture import nombres_grupos, generar_fixture, exportar_fixture, cargar_en_torneo
+from registro import torneo_activo
+from sorteo import Sorteo, armar_bombos
 import os
 
+EQUIPOS_POR_GRUPO = 4
+
 class GroupAssigner:
     def __init__(self, master):
         self.master = master
@@ -12,13 +18,22 @@ class GroupAssigner:
         apply_style(self.master)
         center_fullscreen(self.master)
 
-        teams = load_teams_from_excel()
+        try:
+            teams = load_teams_from_excel()
+        except FileNotFoundError as e:
+            teams = EQUIPOS_EJEMPLO
+            messagebox.showwarning("Archivo no encontrado", f"No se encontró '{os.path.basename(str(e))}' en la carpeta del script.\nSe cargó una lista de ejemplo ({len(teams)} países).")
+        except TorneoError as e:
+            teams = []
+            messagebox.showerror("Error", str(e))
         unique = []
         for t in teams:
             if isinstance(t, str) and t.strip() and t.strip() not in unique:
                 unique.append(t.strip())
         self.pool = unique
-        self.groups_order = ['A','B','C','D','E','F']
+        self.all_teams = list(unique)
+        # un grupo cada EQUIPOS_POR_GRUPO países de la lista (A..Z, AA.. si hacen falta)
+        self.groups_order = nombres_grupos(max(1, len(self.pool) // EQUIPOS_POR_GRUPO))
         self.groups = {g: [] for g in self.groups_order}
         self.current_group_idx = 0
 
@@ -54,7 +69,7 @@ class GroupAssigner:
         pos_frame = ttk.Frame(right)
         pos_frame.pack(fill='x', pady=(6,12))
         self.position_labels = []
-        for i in range(4):
+        for i in range(EQUIPOS_POR_GRUPO):
             lbl = ttk.Label(pos_frame, text=f"{i+1}. ---", relief='ridge', padding=6)
             lbl.pack(side='left', expand=True, fill='x', padx=4)
             self.position_labels.append(lbl)
@@ -68,10 +83,11 @@ class GroupAssigner:
 
         bottom = ttk.Frame(self.master, padding=10)
         bottom.pack(fill='x')
-        self.info_label = ttk.Label(bottom, text="Cada grupo tiene 4 equipos. Avanza con los botones.")
+        self.info_label = ttk.Label(bottom, text=f"Cada grupo tiene {EQUIPOS_POR_GRUPO} equipos. Avanza con los botones.")
         self.info_label.pack(side='left')
         self.save_btn = ttk.Button(bottom, text="Finalizar asignación", command=self.finish_assignments, state='disabled')
         self.save_btn.pack(side='right')
+        ttk.Button(bottom, text="Sorteo automático", command=self.automatic_draw).pack(side='right', padx=6)
 
     def on_country_click(self, event):
         widget = event.widget
@@ -91,7 +107,7 @@ class GroupAssigner:
                 return
 
         cg = self.groups_order[self.current_group_idx]
-        if len(self.groups[cg]) >= 4:
+        if len(self.groups[cg]) >= EQUIPOS_POR_GRUPO:
             messagebox.showwarning("Grupo completo", f"Grupo {cg} ya está completo.")
             return
 
@@ -104,7 +120,7 @@ class GroupAssigner:
         self.refresh_pool_listbox()
         self.update_assigned()
 
-        if len(self.groups[cg]) == 4 and self.current_group_idx < len(self.groups_order) - 1:
+        if len(self.groups[cg]) == EQUIPOS_POR_GRUPO and self.current_group_idx < len(self.groups_order) - 1:
             self.current_group_idx += 1
 
         self.update_ui()
@@ -119,7 +135,7 @@ class GroupAssigner:
         self.assigned_listbox.delete(0, tk.END)
         for i, p in enumerate(self.groups[cg], start=1):
             self.assigned_listbox.insert(tk.END, f"{i}. {p}")
-        for i in range(4):
+        for i in range(EQUIPOS_POR_GRUPO):
             self.position_labels[i].config(
                 text=f"{i+1}. {self.groups[cg][i] if i < len(self.groups[cg]) else '---'}"
             )
@@ -130,9 +146,29 @@ class GroupAssigner:
         self.update_assigned()
         self.prev_btn.config(state='normal' if self.current_group_idx>0 else 'disabled')
         self.next_btn.config(state='normal' if self.current_group_idx < len(self.groups_order)-1 else 'disabled')
-        all_full = all(len(self.groups[g])==4 for g in self.groups_order)
+        all_full = all(len(self.groups[g])==EQUIPOS_POR_GRUPO for g in self.groups_order)
         self.save_btn.config(state='normal' if all_full else 'disabled')
 
+    def automatic_draw(self):
+        # bombos y confederaciones salen del Excel de equipos (ver sorteo.py)
+        if any(self.groups[g] for g in self.groups_order) and not messagebox.askyesno(
+                "Sorteo automático", "Se reemplazarán los grupos ya asignados. ¿Continuar?"):
+            return
+        n = len(self.groups_order)
+        equipos = self.all_teams[:n * EQUIPOS_POR_GRUPO]
+        try:
+            info = load_team_info_from_excel()
+            bombos = armar_bombos(equipos, n, {p: d['bombo'] for p, d in info.items()})
+            sorteo = Sorteo(bombos, {p: d['confederacion'] for p, d in info.items()})
+            self.groups = sorteo.sortear()
+        except TorneoError as e:
+            messagebox.showerror("Sorteo", str(e))
+            return
+        self.pool = [p for p in self.all_teams if p not in equipos]
+        self.current_group_idx = 0
+        self.refresh_pool_listbox()
+        self.update_ui()
+
     def go_prev_group(self):
         if self.current_group_idx>0:
             self.current_group_idx-=1
@@ -145,8 +181,8 @@ class GroupAssigner:
 
     def finish_assignments(self):
         for g in self.groups_order:
-            if len(self.groups[g]) != 4:
-                messagebox.showwarning("Faltan equipos", f"El Grupo {g} no tiene 4 equipos.")
+            if len(self.groups[g]) != EQUIPOS_POR_GRUPO:
+                messagebox.showwarning("Faltan equipos", f"El Grupo {g} no tiene {EQUIPOS_POR_GRUPO} equipos.")
                 return
 
         rows=[]
@@ -155,37 +191,31 @@ class GroupAssigner:
                 rows.append({'Grupo':g,'Posicion':pos,'Equipo':pais})
         df = pd.DataFrame(rows)
         out = os.path.join(os.path.dirname(__file__),'Grupos_Asignados_Sub20_2025.xlsx')
+        # los Excel se escriben en segundo plano (persistencia.py); la ventana no espera
+        trabajador.enviar(('excel', out), lambda: df.to_excel(out,index=False),
+                          al_fallar=lambda e: messagebox.showerror("Error", f"No se guardaron grupos: {e}"))
+
+        # Generar partidos (todos contra todos dentro de cada grupo, ver fixture.py)
+        grupos = {g: self.groups[g] for g in self.groups_order}
+        matches = list(generar_fixture(grupos))
+        # equipos y partidos quedan cargados en el torneo activo (PhaseGroupsUI los reusa)
         try:
-            df.to_excel(out,index=False)
-        except Exception as e:
-            messagebox.showerror("Error", f"No se guardaron grupos: {e}")
-            return
-
-        # Generar partidos
-        matches=[]
-        for g in self.groups_order:
-            teams = self.groups[g]
-            matches += [
-                {'Grupo':g,'Jornada':1,'Equipo1':teams[0],'Equipo2':teams[1]},
-                {'Grupo':g,'Jornada':1,'Equipo1':teams[2],'Equipo2':teams[3]},
-                {'Grupo':g,'Jornada':2,'Equipo1':teams[0],'Equipo2':teams[2]},
-                {'Grupo':g,'Jornada':2,'Equipo1':teams[3],'Equipo2':teams[1]},
-                {'Grupo':g,'Jornada':3,'Equipo1':teams[3],'Equipo2':teams[0]},
-                {'Grupo':g,'Jornada':3,'Equipo1':teams[1],'Equipo2':teams[2]}
-            ]
-        dfm = pd.DataFrame(matches)
-        outm = os.path.join(os.path.dirname(__file__),'FIFA_Sub20_2025_FaseGrupos_Partidos.xlsx')
+            info = load_team_info_from_excel()
+        except TorneoError:
+            info = {}
         try:
-            dfm.to_excel(outm,index=False)
-        except Exception as e:
-            messagebox.showerror("Error", f"No se guardaron partidos: {e}")
-            return
-
-        messagebox.showinfo("Guardado exitoso",
-                            "Grupos y partidos guardados correctamente.\n"
-                            "Ahora podés abrir la Fase de Grupos desde el menú principal.")
-        self.master.lift()
-        self.master.focus_force()
+            torneo = torneo_activo()
+            cargar_en_torneo(torneo, grupos, confederaciones={p: d['confederacion'] for p, d in info.items()})
+            torneo.guardar_datos()
+        except TorneoError as e:
+            messagebox.showerror("Error", f"No se cargaron los grupos en el torneo: {e}")
+        outm = os.path.join(os.path.dirname(__file__),'FIFA_Sub20_2025_FaseGrupos_Partidos.xlsx')
+        trabajador.enviar(('excel', outm), lambda: exportar_fixture(matches, outm),
+                          al_terminar=lambda _: messagebox.showinfo(
+                              "Guardado exitoso",
+                              "Grupos y partidos guardados correctamente.\n"
+                              "Ahora podés abrir la Fase de Grupos desde el menú principal."),
+                          al_fallar=lambda e: messagebox.showerror("Error", f"No se guardaron partidos: {e}"))
 
         # ✅ Cerrar solo la ventana de asignación
         self.master.destroy()
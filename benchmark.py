@@ -0,0 +1,269 @@
+# benchmark.py
+#
+# Mide cómo escala core.Torneo con torneos sintéticos de tamaño creciente (sin interfaz):
+#   python benchmark.py                          → 24, 96, 1000 y 10000 equipos
+#   python benchmark.py --tamanos 24 1000 --almacen sqlite --salida base.json
+#   python benchmark.py --comparar base.json     → marca las operaciones que empeoraron
+# Por operación informa cantidad de llamadas, llamadas por segundo y percentiles de
+# latencia; por tamaño, el pico de memoria (tracemalloc, en una pasada aparte para no
+# inflar los tiempos). Los resultados quedan en JSON para comparar entre versiones.
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+from core import Torneo, Equipo, Partido
+from fixture import nombres_grupos, generar_fixture
+from agregados import agregados_de
+from jugadores import estadisticas_de
+
+TAMANOS = (24, 96, 1000, 10000)
+CONFEDERACIONES = ("AFC", "CAF", "CONCACAF", "CONMEBOL", "OFC", "UEFA")
+EQUIPOS_POR_GRUPO = 4
+FASE_ELIMINATORIA = "Octavos de final"  # generar_rondas_eliminacion arranca desde acá
+UMBRAL_REGRESION = 1.2  # p50 nuevo / p50 anterior a partir del cual se avisa
+PERCENTILES = (50, 90, 99)
+MUESTRAS = 200  # llamadas sueltas medidas por operación que escribe en disco
+
+
+class Cronometro:
+    """Junta las duraciones (segundos) de cada operación medida."""
+    def __init__(self):
+        self.muestras = {}
+        self.unidades = {}  # operación -> elementos procesados (para las operaciones por lote)
+
+    def medir(self, operacion, funcion, *args, unidades=1):
+        inicio = time.perf_counter()
+        resultado = funcion(*args)
+        self.muestras.setdefault(operacion, []).append(time.perf_counter() - inicio)
+        self.unidades[operacion] = self.unidades.get(operacion, 0) + unidades
+        return resultado
+
+    def resumen(self):
+        resumen = {}
+        for operacion, muestras in self.muestras.items():
+            ms = np.array(muestras) * 1000
+            total = float(ms.sum()) / 1000
+            resumen[operacion] = {
+                'llamadas': len(ms),
+                'unidades': self.unidades[operacion],
+                'total_s': round(total, 6),
+                'por_segundo': round(self.unidades[operacion] / total, 1) if total else None,
+                **{f'p{p}_ms': round(float(np.percentile(ms, p)), 4) for p in PERCENTILES},
+                'max_ms': round(float(ms.max()), 4),
+            }
+        return resumen
+
+
+# ============================ TORNEO SINTÉTICO ============================
+def _grupos(n_equipos):
+    n_grupos = max(1, n_equipos // EQUIPOS_POR_GRUPO)
+    return {g: [f"Equipo {g}{pos}" for pos in range(1, EQUIPOS_POR_GRUPO + 1)] for g in nombres_grupos(n_grupos)}
+
+
+def _marcador(rng, empate=True):
+    g1, g2 = rng.randint(0, 4), rng.randint(0, 4)
+    if not empate and g1 == g2:
+        g1 += 1
+    return g1, g2, rng.randint(0, 3), rng.randint(0, 3), int(rng.random() < 0.05), int(rng.random() < 0.05)
+
+
+def _filas_jugadores(rng, partido):
+    return [{'jugador': f"Jugador {i}", 'equipo': eq, 'goles': rng.randint(0, 2), 'minutos': 90,
+             'amarillas': int(rng.random() < 0.2)} for i, eq in ((1, partido.id_equipo1), (2, partido.id_equipo2))]
+
+
+def armar_torneo(n_equipos, rng, ruta, compacto=False, cron=None):
+    """
+    Torneo con n_equipos en grupos de 4, todos los partidos de grupo y resultados al azar.
+    Los resultados entran en un solo lote (registrar_resultados): de a uno, cada llamada
+    escribe (y sincroniza) una línea del diario.
+    """
+    medir = cron.medir if cron else (lambda _, f, *a, **k: f(*a))
+    t = Torneo(nombre=f"Benchmark {n_equipos}", ruta=ruta, compacto=compacto, cargar=False)
+    grupos = _grupos(n_equipos)
+    ids = {}
+    for g, paises in grupos.items():
+        for pos, pais in enumerate(paises, start=1):
+            ids[pais] = f"{g}{pos}"
+            medir('agregar_equipo', t.agregar_equipo,
+                  Equipo(ids[pais], pais, pais[-3:], rng.choice(CONFEDERACIONES), g))
+    partidos = [medir('agregar_partido', t.agregar_partido,
+                      Partido(ids[f['Equipo1']], ids[f['Equipo2']], fase="Fase de Grupos"))
+                for f in generar_fixture(grupos)]
+    t.configuracion_cerrada = True
+    lote = [dict(zip(('goles_e1', 'goles_e2', 'ta1', 'ta2', 'tr1', 'tr2'), _marcador(rng)), match_id=mid)
+            for mid in partidos]
+    medir('registrar_resultados (lote)', t.registrar_resultados, lote, unidades=len(lote))
+    return t, partidos
+
+
+def _cerrar(t):
+    if hasattr(t.almacen, 'cerrar'):  # SQLite: liberar el archivo antes de borrar la carpeta
+        t.almacen.cerrar()
+
+
+def medir_tamano(n_equipos, semilla, repeticiones, almacen, compacto, muestras=MUESTRAS):
+    rng = random.Random(semilla)
+    cron = Cronometro()
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, 'torneo.db' if almacen == 'sqlite' else 'torneo.json')
+        t, partidos = armar_torneo(n_equipos, rng, ruta, compacto, cron)
+        grupos = sorted(t.grupos)
+
+        # llamadas sueltas (cada una escribe en disco): correcciones y planillas de jugadores
+        for mid in rng.sample(partidos, min(len(partidos), muestras)):
+            cron.medir('registrar_resultado', t.registrar_resultado, mid, *_marcador(rng))
+        for mid in rng.sample(partidos, min(len(partidos), muestras)):
+            cron.medir('registrar_jugadores', t.registrar_jugadores, mid, _filas_jugadores(rng, t.calendario[mid]))
+
+        for g in grupos:  # primera consulta después de los resultados: desempata
+            cron.medir('calcular_tabla_posiciones', t.calcular_tabla_posiciones, g)
+        for g in grupos:
+            cron.medir('calcular_tabla_posiciones (cache)', t.calcular_tabla_posiciones, g)
+        for _ in range(repeticiones):
+            cron.medir('obtener_ganadores_fase', t.obtener_ganadores_fase, "Fase de Grupos")
+            cron.medir('guardar_datos', t.guardar_datos)
+            copia = Torneo(ruta=ruta, compacto=compacto, cargar=False)
+            cron.medir('cargar_datos', copia.cargar_datos)
+            _cerrar(copia)
+
+        # informes: armado inicial, lectura y mantenimiento al corregir resultados
+        agregados = cron.medir('informes: armar agregados', agregados_de, t)
+        jugadores = cron.medir('informes: armar jugadores', estadisticas_de, t)
+        for _ in range(repeticiones):
+            for mid in rng.sample(partidos, min(len(partidos), 20)):
+                cron.medir('registrar_resultado (con informes)', t.registrar_resultado, mid, *_marcador(rng))
+            cron.medir('informe posiciones', agregados.posiciones)
+            cron.medir('informe resultados', agregados.resultados_grupos)
+            cron.medir('informe goleadores', agregados.goleadores)
+            cron.medir('informe confederaciones', agregados.confederaciones)
+            cron.medir('informe tarjetas', agregados.tarjetas)
+            cron.medir('informe bota de oro', jugadores.bota_de_oro, 20)
+            cron.medir('informe disciplina', jugadores.disciplina)
+
+        # eliminatoria: los primeros de grupo de a pares, resultados sin empate
+        primeros = [t.calcular_tabla_posiciones(g)[0].identificador for g in grupos]
+        llave = [t.agregar_partido(Partido(a, b, fase=FASE_ELIMINATORIA))
+                 for a, b in zip(primeros[0::2], primeros[1::2])]
+        for mid in llave:
+            t.registrar_resultado(mid, *_marcador(rng, empate=False))
+        if llave:
+            for _ in range(repeticiones):
+                cron.medir('obtener_ganadores_fase (eliminatoria)', t.obtener_ganadores_fase, FASE_ELIMINATORIA)
+            with contextlib.redirect_stdout(io.StringIO()):  # generar_rondas_eliminacion informa por consola
+                cron.medir('generar_rondas_eliminacion', t.generar_rondas_eliminacion)
+        _cerrar(t)
+
+    return {
+        'equipos': len(t.equipos),
+        'grupos': len(grupos),
+        'partidos': len(partidos),
+        'memoria_pico_mb': medir_memoria(n_equipos, semilla, almacen, compacto),
+        'operaciones': cron.resumen(),
+    }
+
+
+def medir_memoria(n_equipos, semilla, almacen, compacto):
+    """Pico de memoria (MB) de armar el torneo completo y sus informes, en una pasada aparte."""
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, 'torneo.db' if almacen == 'sqlite' else 'torneo.json')
+        tracemalloc.start()
+        try:
+            rng = random.Random(semilla)
+            t, partidos = armar_torneo(n_equipos, rng, ruta, compacto)
+            for mid in partidos[:MUESTRAS]:
+                t.registrar_jugadores(mid, _filas_jugadores(rng, t.calendario[mid]))
+            agregados_de(t).posiciones()
+            estadisticas_de(t).bota_de_oro()
+            _, pico = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        _cerrar(t)
+    return round(pico / 2 ** 20, 2)
+
+
+# ============================ RESULTADOS ============================
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def comparar(actual, anterior, umbral=UMBRAL_REGRESION):
+    """[(equipos, operación, p50 anterior, p50 actual, cociente)] de las operaciones que empeoraron más que umbral."""
+    previos = {r['equipos']: r['operaciones'] for r in anterior['resultados']}
+    regresiones = []
+    for r in actual['resultados']:
+        for operacion, datos in r['operaciones'].items():
+            previo = previos.get(r['equipos'], {}).get(operacion)
+            if not previo or not previo['p50_ms']:
+                continue
+            cociente = datos['p50_ms'] / previo['p50_ms']
+            if cociente > umbral:
+                regresiones.append((r['equipos'], operacion, previo['p50_ms'], datos['p50_ms'], cociente))
+    return regresiones
+
+
+def _imprimir(resultado):
+    print(f"\n{resultado['equipos']} equipos, {resultado['grupos']} grupos, {resultado['partidos']} partidos"
+          f" — pico de memoria {resultado['memoria_pico_mb']} MB")
+    for operacion, d in resultado['operaciones'].items():
+        print(f"  {operacion:40s} {d['unidades']:7d} ops  {d['por_segundo'] or 0:12.1f}/s"
+              f"  p50 {d['p50_ms']:9.3f} ms  p99 {d['p99_ms']:9.3f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de core.Torneo con torneos sintéticos.")
+    parser.add_argument('--tamanos', type=int, nargs='+', default=list(TAMANOS), help="cantidades de equipos")
+    parser.add_argument('--repeticiones', type=int, default=5, help="repeticiones de las operaciones sobre todo el torneo")
+    parser.add_argument('--muestras', type=int, default=MUESTRAS, help="llamadas sueltas a registrar_resultado/registrar_jugadores")
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--almacen', choices=('json', 'sqlite'), default='json')
+    parser.add_argument('--compacto', action='store_true', help="usar el modo compacto de Torneo")
+    parser.add_argument('--salida', default='bench_output.json', help="archivo JSON con los resultados")
+    parser.add_argument('--comparar', help="JSON de una corrida anterior para detectar regresiones")
+    parser.add_argument('--umbral', type=float, default=UMBRAL_REGRESION)
+    args = parser.parse_args(argv)
+
+    informe = {
+        'fecha': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'parametros': {k: v for k, v in vars(args).items() if k not in ('salida', 'comparar', 'umbral')},
+        'resultados': [],
+    }
+    for n in args.tamanos:
+        resultado = medir_tamano(n, args.semilla, args.repeticiones, args.almacen, args.compacto, args.muestras)
+        informe['resultados'].append(resultado)
+        _imprimir(resultado)
+
+    with open(args.salida, 'w', encoding='utf-8') as f:
+        json.dump(informe, f, ensure_ascii=False, indent=2)
+    print(f"\nResultados guardados en {args.salida}")
+
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            regresiones = comparar(informe, json.load(f), args.umbral)
+        for n, operacion, antes, ahora, cociente in regresiones:
+            print(f"⚠️ {n} equipos, {operacion}: p50 {antes:.3f} → {ahora:.3f} ms (x{cociente:.2f})")
+        if regresiones:
+            return 1
+        print("Sin regresiones respecto de", args.comparar)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+# compact_stats.py
+from collections.abc import MutableMapping
+import numpy as np
+from desempate import PUNTOS_AMARILLA, PUNTOS_ROJA
+
+# estadísticas numéricas de un equipo (una columna cada una)
+CAMPOS = ('PJ', 'G', 'E', 'P', 'GF', 'GC', 'DG', 'Pts', 'TA', 'TR')
+_POS = {c: i for i, c in enumerate(CAMPOS)}
+
+
+class TablaEstadisticas:
+    """
+    Estadísticas de todos los equipos en una matriz NumPy (campo x ordinal de equipo).
+    Cada Equipo guarda sólo una VistaEstadisticas que lee y escribe su columna.
+    """
+    def __init__(self, capacidad=32):
+        self.valores = np.zeros((len(CAMPOS), capacidad), dtype=np.int32)
+        self.max_avance = []
+        self.n = 0
+
+    def vista(self, ordinal, stats=None):
+        """Devuelve la vista del equipo con ese ordinal (copiando stats si se pasa)."""
+        if ordinal >= self.valores.shape[1]:
+            nuevos = np.zeros((len(CAMPOS), max(ordinal + 1, self.valores.shape[1] * 2)), dtype=np.int32)
+            nuevos[:, :self.n] = self.valores[:, :self.n]
+            self.valores = nuevos
+        while self.n <= ordinal:
+            self.max_avance.append('Fase de Grupos')
+            self.n += 1
+        vista = VistaEstadisticas(self, ordinal)
+        for clave, valor in (stats or {}).items():
+            if clave in _POS or clave == 'MaxAvance':
+                vista[clave] = valor
+        return vista
+
+    def ordenar(self, ordinales, sorteo=None):
+        """
+        Ordena ordinales por Pts, DG, GF descendente y luego juego limpio (ver desempate.py);
+        a igualdad decide `sorteo` (menor primero) o, sin él, el orden recibido.
+        """
+        ordinales = np.asarray(ordinales, dtype=np.intp)
+        v = self.valores[:, ordinales]
+        desempate = np.arange(len(ordinales)) if sorteo is None else np.asarray(sorteo)
+        fair_play = PUNTOS_AMARILLA * v[_POS['TA']] + PUNTOS_ROJA * v[_POS['TR']]
+        orden = np.lexsort((desempate, -fair_play, -v[_POS['GF']], -v[_POS['DG']], -v[_POS['Pts']]))
+        return ordinales[orden]
+
+    def sumar_por(self, ordinales, etiquetas, campos=CAMPOS):
+        """Suma los campos pedidos agrupando los ordinales por etiqueta (p. ej. confederación)."""
+        claves, inversa = np.unique(np.asarray(etiquetas), return_inverse=True)
+        filas = [_POS[c] for c in campos]
+        totales = np.zeros((len(claves), len(filas)), dtype=np.int64)
+        np.add.at(totales, inversa, self.valores[filas][:, np.asarray(ordinales, dtype=np.intp)].T)
+        return {str(k): dict(zip(campos, map(int, fila))) for k, fila in zip(claves, totales)}
+
+
+class VistaEstadisticas(MutableMapping):
+    """Se usa como el dict stats de siempre (e.stats['Pts'] += 3), pero sin guardar nada propio."""
+    __slots__ = ('_tabla', 'ordinal')
+
+    def __init__(self, tabla, ordinal):
+        self._tabla = tabla
+        self.ordinal = ordinal
+
+    def __getitem__(self, clave):
+        if clave == 'MaxAvance':
+            return self._tabla.max_avance[self.ordinal]
+        return int(self._tabla.valores[_POS[clave], self.ordinal])
+
+    def __setitem__(self, clave, valor):
+        if clave == 'MaxAvance':
+            self._tabla.max_avance[self.ordinal] = valor
+        elif clave in _POS:
+            self._tabla.valores[_POS[clave], self.ordinal] = valor
+        else:
+            raise KeyError(clave)
+
+    def __delitem__(self, clave):
+        raise KeyError(clave)
+
+    def __iter__(self):
+        yield from CAMPOS
+        yield 'MaxAvance'
+
+    def __len__(self):
+        return len(CAMPOS) + 1
+
+
+def acumular_partidos(n, o1, o2, g1, g2, ta1, ta2, tr1, tr2):
+    """
+    Estadísticas (CAMPOS x n equipos) que dejan los partidos dados, sin recorrerlos en Python:
+    cada argumento trae una columna del calendario (ordinales de los dos equipos, goles y tarjetas).
+    """
+    ordinales = np.concatenate([np.asarray(o1, dtype=np.intp), np.asarray(o2, dtype=np.intp)])
+    gf = np.concatenate([g1, g2]).astype(np.int64)
+    gc = np.concatenate([g2, g1]).astype(np.int64)
+
+    def suma(pesos=None):
+        return np.bincount(ordinales, weights=pesos, minlength=n).astype(np.int64)
+
+    v = np.zeros((len(CAMPOS), n), dtype=np.int64)
+    v[_POS['PJ']] = suma()
+    v[_POS['G']] = suma(gf > gc)
+    v[_POS['E']] = suma(gf == gc)
+    v[_POS['P']] = suma(gf < gc)
+    v[_POS['GF']] = suma(gf)
+    v[_POS['GC']] = suma(gc)
+    v[_POS['DG']] = v[_POS['GF']] - v[_POS['GC']]
+    v[_POS['Pts']] = 3 * v[_POS['G']] + v[_POS['E']]
+    v[_POS['TA']] = suma(np.concatenate([ta1, ta2]))
+    v[_POS['TR']] = suma(np.concatenate([tr1, tr2]))
+    return v
@@ -1,14 +1,42 @@
 # core.py
 import os
-import json
-from dataclasses import dataclass, field
+import bisect
+from dataclasses import dataclass, field, fields
 from typing import Dict
-import pandas as pd
-from tkinter import messagebox
+from storage import crear_almacen
+from input_cache import cargar_cacheado
+from desempate import MotorDesempate
+import cruces
+from persistencia import fusionar_cambios
 
+# core no importa tkinter ni pandas: se puede usar desde un worker, un servidor o un script
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+RUTA_DATOS = os.path.join(SCRIPT_DIR, 'torneo_data.json')
+
+EQUIPOS_EJEMPLO = [
+    "Arabia Saudita","Argentina","Australia","Brasil","Chile","Colombia",
+    "Corea del Sur","Cuba","Egipto","España","Estados Unidos","Francia",
+    "Italia","Japón","Marruecos","México","Nigeria","Noruega",
+    "Nueva Caledonia","Nueva Zelanda","Panamá","Paraguay","Sudáfrica","Ucrania"
+]
+
+
+class TorneoError(Exception):
+    """Error de la lógica del torneo (las interfaces lo muestran como quieran)."""
+
 
 @dataclass
+class InformeLote:
+    """Resultado de registrar_resultados: qué se validó, qué se aplicó y qué falló."""
+    validos: list = field(default_factory=list)      # match_id que pasaron la validación
+    aplicados: list = field(default_factory=list)    # match_id registrados (vacío en simulación)
+    conflictos: list = field(default_factory=list)   # (n° de resultado, motivo)
+
+    @property
+    def ok(self):
+        return not self.conflictos
+
+@dataclass(slots=True)
 class Equipo:
     identificador: str
     pais: str
@@ -18,6 +46,7 @@ class Equipo:
     stats: dict = field(default_factory=lambda: {
         'PJ': 0, 'G': 0, 'E': 0, 'P': 0,
         'GF': 0, 'GC': 0, 'DG': 0, 'Pts': 0,
+        'TA': 0, 'TR': 0,
         'MaxAvance': 'Fase de Grupos'
     })
 
@@ -28,10 +57,10 @@ class Equipo:
             'abreviatura': self.abreviatura or self.pais[:3].upper(),
             'confederacion': self.confederacion,
             'grupo': self.grupo,
-            'stats': self.stats
+            'stats': dict(self.stats)
         }
 
-@dataclass
+@dataclass(slots=True)
 class Partido:
     id_equipo1: str
     id_equipo2: str
@@ -45,12 +74,14 @@ class Partido:
     tarj_roja_e1: int = 0
     tarj_roja_e2: int = 0
     jugador_stats: list = field(default_factory=list)
+    sede: str = ""
 
     def to_dict(self):
-        return self.__dict__
+        return {f.name: getattr(self, f.name) for f in fields(self)}
 
 class Torneo:
-    def __init__(self, nombre="Copa Mundial Sub-20 de la FIFA Chile 2025"):
+    def __init__(self, nombre="Copa Mundial Sub-20 de la FIFA Chile 2025", almacen=None, compacto=False,
+                 ruta=None, cargar=True, escritor=None):
         self.nombre = nombre
         self.pais_sede = "Chile"
         self.fecha_inicio = "2025-09-27"
@@ -60,13 +91,183 @@ class Torneo:
         self.grupos = set()
         self.calendario: Dict[str, Partido] = {}
         self._match_id_counter = 1
-        self.FILENAME = os.path.join(SCRIPT_DIR, 'torneo_data.json') #en enta parte crea la BD digamos
-        self.cargar_datos()
+        # modo compacto: las stats numéricas viven en columnas NumPy (ver compact_stats.py)
+        self.compacto = compacto
+        # funciones avisadas de cada cambio (ver escuchar), p. ej. los agregados de informes
+        self._oyentes = []
+        self._cargando = False
+        # objetos mantenidos a partir del torneo (ver derivado); viven y mueren con él
+        self._derivados = {}
+        self._reiniciar_indices()
+        # por defecto JSON + diario en RUTA_DATOS; ruta .db/.sqlite usa SQLite (ver storage.py)
+        self.almacen = almacen or crear_almacen(ruta or RUTA_DATOS)
+        self.FILENAME = self.almacen.ruta #en enta parte crea la BD digamos
+        # con un escritor (persistencia.TrabajadorGuardado) las escrituras se hacen en otro hilo
+        self.escritor = escritor
+        if cargar:
+            self.cargar_datos()
+
+    # ============================================================
+    # 🔹 Índice de posiciones por grupo
+    # ============================================================
+    def _reiniciar_indices(self):
+        # tabla ordenada de cada grupo + contador de versión para que las vistas reusen lo ya armado
+        self._tablas: Dict[str, list] = {}
+        self._version_tablas: Dict[str, int] = {}
+        self._orden_equipos: Dict[str, int] = {}
+        # enfrentamientos directos por grupo y tabla ya desempatada (ver desempate.py)
+        self._desempate = MotorDesempate(self.nombre)
+        self._tablas_desempatadas: Dict[str, tuple] = {}
+        self._terceros = (None, None)  # (versión de las tablas, {1° rival: grupo del 3°})
+        if self.compacto:
+            from compact_stats import TablaEstadisticas
+            self._tabla_stats = TablaEstadisticas()
+        # índices del calendario (dict usado como conjunto ordenado de match_id)
+        self._partidos_por_fase: Dict[str, dict] = {}
+        self._partidos_por_grupo: Dict[str, dict] = {}
+        self._partidos_por_equipo: Dict[str, dict] = {}
+        self._pendientes: dict = {}
+        # claves naturales: país → id de equipo y (id1, id2, fase) → match_id
+        self._id_por_pais: Dict[str, str] = {}
+        self._partido_por_clave: Dict[tuple, str] = {}
+
+    def _clave_tabla(self, e):
+        # índice por (Pts, DG, GF desc.); los empates los resuelve después MotorDesempate
+        return (-e.stats['Pts'], -e.stats['DG'], -e.stats['GF'], self._orden_equipos[e.identificador])
+
+    def _quitar_de_tabla(self, identificador):
+        anterior = self.equipos.get(identificador)
+        if anterior and anterior.grupo in self._tablas:
+            tabla = self._tablas[anterior.grupo]
+            for i, e in enumerate(tabla):
+                if e.identificador == identificador:
+                    del tabla[i]
+                    break
+            self._version_tablas[anterior.grupo] += 1
+
+    def _ubicar_en_tabla(self, equipo):
+        if not equipo.grupo:
+            return
+        tabla = self._tablas.setdefault(equipo.grupo, [])
+        bisect.insort(tabla, equipo, key=self._clave_tabla)
+        self._version_tablas[equipo.grupo] = self._version_tablas.get(equipo.grupo, 0) + 1
+
+    # ============================================================
+    # 🔹 Índices del calendario por fase, grupo, equipo y estado
+    # ============================================================
+    def _indexar_partido(self, match_id, partido):
+        self._partidos_por_fase.setdefault(partido.fase, {})[match_id] = None
+        if partido.fase == "Fase de Grupos":
+            e1 = self.equipos.get(partido.id_equipo1)
+            if e1 and e1.grupo:
+                self._partidos_por_grupo.setdefault(e1.grupo, {})[match_id] = None
+        for id_equipo in (partido.id_equipo1, partido.id_equipo2):
+            self._partidos_por_equipo.setdefault(id_equipo, {})[match_id] = None
+        self._partido_por_clave.setdefault((partido.id_equipo1, partido.id_equipo2, partido.fase), match_id)
+        self._actualizar_estado(match_id, partido)
+
+    def _desindexar_partido(self, match_id):
+        partido = self.calendario.get(match_id)
+        if not partido:
+            return
+        self._partidos_por_fase.get(partido.fase, {}).pop(match_id, None)
+        e1 = self.equipos.get(partido.id_equipo1)
+        if e1:
+            self._partidos_por_grupo.get(e1.grupo, {}).pop(match_id, None)
+        for id_equipo in (partido.id_equipo1, partido.id_equipo2):
+            self._partidos_por_equipo.get(id_equipo, {}).pop(match_id, None)
+        self._pendientes.pop(match_id, None)
+        clave = (partido.id_equipo1, partido.id_equipo2, partido.fase)
+        if self._partido_por_clave.get(clave) == match_id:
+            del self._partido_por_clave[clave]
+
+    def _actualizar_estado(self, match_id, partido):
+        if partido.goles_e1 is None or partido.goles_e2 is None:
+            self._pendientes[match_id] = None
+        else:
+            self._pendientes.pop(match_id, None)
+
+    def fases(self):
+        return [f for f, ids in self._partidos_por_fase.items() if ids]
+
+    def partidos_por_fase(self, fase):
+        return {mid: self.calendario[mid] for mid in self._partidos_por_fase.get(fase, ())}
+
+    def partidos_de_grupo(self, grupo_id):
+        return {mid: self.calendario[mid] for mid in self._partidos_por_grupo.get(grupo_id, ())}
+
+    def partidos_de_equipo(self, id_equipo):
+        return {mid: self.calendario[mid] for mid in self._partidos_por_equipo.get(id_equipo, ())}
+
+    def partidos_pendientes(self, fase=None):
+        if fase is None:
+            return {mid: self.calendario[mid] for mid in self._pendientes}
+        return {mid: self.calendario[mid] for mid in self._partidos_por_fase.get(fase, ()) if mid in self._pendientes}
+
+    def buscar_equipo_por_pais(self, pais):
+        """Devuelve el identificador del equipo con ese país (o None)."""
+        return self._id_por_pais.get(pais)
+
+    def buscar_partido(self, id_equipo1, id_equipo2, fase="Fase de Grupos"):
+        """Devuelve el match_id del partido id_equipo1 vs id_equipo2 en esa fase (o None)."""
+        return self._partido_por_clave.get((id_equipo1, id_equipo2, fase))
+
+    def escuchar(self, oyente):
+        """
+        oyente(partidos, equipos) se llama después de cada cambio con los match_id y
+        los id de equipo afectados; tras cargar_datos se llama con (None, None) = todo cambió.
+        """
+        self._oyentes.append(oyente)
+
+    def dejar_de_escuchar(self, oyente):
+        """Saca un oyente agregado con escuchar (si no estaba, no hace nada)."""
+        if oyente in self._oyentes:
+            self._oyentes.remove(oyente)
+
+    def derivado(self, clave, crear):
+        """
+        Objeto mantenido a partir del torneo (agregados de informes, estadísticas de
+        jugadores): se crea con crear(self) la primera vez y se guarda en el torneo,
+        no en un caché global que lo mantendría vivo.
+        """
+        obj = self._derivados.get(clave)
+        if obj is None:
+            obj = self._derivados[clave] = crear(self)
+        return obj
+
+    def soltar_derivados(self):
+        """Desengancha los derivados (llaman a su cerrar) y los olvida; se rearman al pedirlos."""
+        derivados, self._derivados = self._derivados, {}
+        for obj in derivados.values():
+            obj.cerrar()
+
+    def _avisar(self, partidos=(), equipos=()):
+        if self._cargando:
+            return
+        for oyente in self._oyentes:
+            oyente(partidos, equipos)
+
+    def version_tabla(self, grupo_id=None):
+        """Cambia cada vez que se modifica la tabla del grupo (o cualquier tabla si grupo_id es None)."""
+        if grupo_id is None:
+            return sum(self._version_tablas.values())
+        return self._version_tablas.get(grupo_id, 0)
 
     def agregar_equipo(self, equipo: Equipo):
+        self._quitar_de_tabla(equipo.identificador)
+        anterior = self.equipos.get(equipo.identificador)
+        if anterior and self._id_por_pais.get(anterior.pais) == anterior.identificador:
+            del self._id_por_pais[anterior.pais]
+        self._id_por_pais.setdefault(equipo.pais, equipo.identificador)
+        self._orden_equipos.setdefault(equipo.identificador, len(self._orden_equipos))
+        if self.compacto:
+            equipo.stats = self._tabla_stats.vista(self._orden_equipos[equipo.identificador], dict(equipo.stats))
         self.equipos[equipo.identificador] = equipo
         if equipo.grupo:
             self.grupos.add(equipo.grupo)
+        self._desempate.agregar_equipo(equipo.identificador, equipo.grupo)
+        self._avisar(equipos=(equipo.identificador,))
+        self._ubicar_en_tabla(equipo)
 
     def agregar_equipo_dict(self, d):
         e = Equipo(d['identificador'], d['pais'], d.get('abreviatura',''), d.get('confederacion',''), d.get('grupo',''))
@@ -75,109 +276,400 @@ class Torneo:
     def agregar_partido(self, partido: Partido):
         match_id = f"M{self._match_id_counter:03d}"
         self.calendario[match_id] = partido
+        self._indexar_partido(match_id, partido)
         self._match_id_counter += 1
+        self._avisar(partidos=(match_id,))
         return match_id
 
     def cerrar_configuracion(self):
+        # agregar_equipo/agregar_partido no guardan: al cerrar se escribe todo una vez
         self.configuracion_cerrada = True
         self.guardar_datos()
 
-    def registrar_resultado(self, match_id, goles_e1, goles_e2, ta1=0, ta2=0, tr1=0, tr2=0):
+    def _validar_resultado(self, match_id):
         if not self.configuracion_cerrada:
-            messagebox.showerror("Error", "Debe cerrar la configuración antes de registrar resultados.")
-            return False
+            raise TorneoError("Debe cerrar la configuración antes de registrar resultados.")
         partido = self.calendario.get(match_id)
         if not partido:
-            messagebox.showerror("Error", f"Partido {match_id} no encontrado.")
-            return False
+            raise TorneoError(f"Partido {match_id} no encontrado.")
+        e1 = self.equipos.get(partido.id_equipo1)
+        e2 = self.equipos.get(partido.id_equipo2)
+        if not e1 or not e2:
+            raise TorneoError("Equipos del partido no encontrados en torneo.")
+        return partido, e1, e2
+
+    def registrar_resultado(self, match_id, goles_e1, goles_e2, ta1=0, ta2=0, tr1=0, tr2=0):
+        """
+        Registra (o corrige) el resultado y actualiza estadísticas. Si el partido ya tenía
+        resultado se descuenta el anterior antes de sumar el nuevo. Lanza TorneoError si no se puede.
+        """
+        partido, _, _ = self._validar_resultado(match_id)
+        equipos = self._aplicar_resultado(match_id, partido, goles_e1, goles_e2, ta1, ta2, tr1, tr2)
+        self.guardar_cambios(partidos=[match_id], equipos=equipos)
+        return True
 
+    # ============================================================
+    # 🔹 Estadísticas derivadas de los partidos
+    # ============================================================
+    # Las stats de cada equipo son la suma de sus partidos de grupo jugados: cada cambio
+    # de resultado se aplica como delta (se resta el viejo y se suma el nuevo), así una
+    # corrección cuesta lo mismo que una carga y la tabla no se desvía del calendario.
+    def _cuenta_en_tabla(self, partido):
+        return (partido.fase == "Fase de Grupos" and partido.goles_e1 is not None and partido.goles_e2 is not None
+                and partido.id_equipo1 in self.equipos and partido.id_equipo2 in self.equipos)
+
+    def _contar(self, partido, signo):
+        """Suma (signo=1) o descuenta (signo=-1) un partido jugado de las stats de sus equipos."""
+        e1, e2 = self.equipos[partido.id_equipo1], self.equipos[partido.id_equipo2]
+        g1, g2 = partido.goles_e1, partido.goles_e2
+        self._quitar_de_tabla(e1.identificador)
+        self._quitar_de_tabla(e2.identificador)
+        for e, gf, gc, ta, tr in ((e1, g1, g2, partido.tarj_ama_e1, partido.tarj_roja_e1),
+                                  (e2, g2, g1, partido.tarj_ama_e2, partido.tarj_roja_e2)):
+            e.stats['PJ'] += signo
+            e.stats['GF'] += signo * gf
+            e.stats['GC'] += signo * gc
+            e.stats['TA'] += signo * ta
+            e.stats['TR'] += signo * tr
+            if gf > gc:
+                e.stats['G'] += signo; e.stats['Pts'] += signo * 3
+            elif gf < gc:
+                e.stats['P'] += signo
+            else:
+                e.stats['E'] += signo; e.stats['Pts'] += signo
+            e.stats['DG'] = e.stats['GF'] - e.stats['GC']
+        self._desempate.registrar(e1.identificador, e2.identificador, g1, g2, signo)
+        self._ubicar_en_tabla(e1)
+        self._ubicar_en_tabla(e2)
+
+    def _aplicar_resultado(self, match_id, partido, goles_e1, goles_e2, ta1, ta2, tr1, tr2):
+        """Deja el partido con este resultado; devuelve los id de equipo cuyas stats cambiaron."""
+        equipos = []
+        if self._cuenta_en_tabla(partido):
+            self._contar(partido, -1)
+            equipos = [partido.id_equipo1, partido.id_equipo2]
         partido.goles_e1 = goles_e1
         partido.goles_e2 = goles_e2
         partido.tarj_ama_e1 = ta1
         partido.tarj_ama_e2 = ta2
         partido.tarj_roja_e1 = tr1
         partido.tarj_roja_e2 = tr2
+        self._actualizar_estado(match_id, partido)
+        if self._cuenta_en_tabla(partido):
+            self._contar(partido, 1)
+            equipos = [partido.id_equipo1, partido.id_equipo2]
+        self._avisar(partidos=(match_id,), equipos=equipos)
+        return equipos
+
+    def reconstruir_estadisticas(self, aplicar=True):
+        """
+        Recalcula las stats de todos los equipos desde los partidos de grupo del calendario
+        (vectorizado, ver compact_stats.acumular_partidos) y devuelve los id de los equipos
+        cuyas stats no coincidían. Con aplicar=False sólo verifica, sin cambiar nada.
+        """
+        from compact_stats import CAMPOS, acumular_partidos
+        ids = list(self.equipos)
+        ordinal = {id: i for i, id in enumerate(ids)}
+        jugados = [p for p in map(self.calendario.get, self._partidos_por_fase.get("Fase de Grupos", ()))
+                   if self._cuenta_en_tabla(p)]
+        columnas = ([ordinal[p.id_equipo1] for p in jugados], [ordinal[p.id_equipo2] for p in jugados],
+                    [p.goles_e1 for p in jugados], [p.goles_e2 for p in jugados],
+                    [p.tarj_ama_e1 for p in jugados], [p.tarj_ama_e2 for p in jugados],
+                    [p.tarj_roja_e1 for p in jugados], [p.tarj_roja_e2 for p in jugados])
+        valores = acumular_partidos(len(ids), *columnas).tolist()
+
+        distintos = []
+        for i, id in enumerate(ids):
+            stats = self.equipos[id].stats
+            nuevos = {c: fila[i] for c, fila in zip(CAMPOS, valores)}
+            if any(stats[c] != v for c, v in nuevos.items()):
+                distintos.append(id)
+                if aplicar:
+                    self._quitar_de_tabla(id)
+                    stats.update(nuevos)
+                    self._ubicar_en_tabla(self.equipos[id])
+        if aplicar:
+            self._desempate.reconstruir(jugados)
+            self._tablas_desempatadas = {}
+            if distintos:
+                self._avisar(equipos=distintos)
+        return distintos
 
-        e1 = self.equipos.get(partido.id_equipo1)
-        e2 = self.equipos.get(partido.id_equipo2)
-        if not e1 or not e2:
-            messagebox.showerror("Error", "Equipos del partido no encontrados en torneo.")
-            return False
-
-        e1.stats['PJ'] += 1
-        e2.stats['PJ'] += 1
-        e1.stats['GF'] += goles_e1
-        e2.stats['GF'] += goles_e2
-        e1.stats['GC'] += goles_e2
-        e2.stats['GC'] += goles_e1
-
-        if goles_e1 > goles_e2:
-            e1.stats['G'] += 1; e2.stats['P'] += 1; e1.stats['Pts'] += 3
-        elif goles_e1 < goles_e2:
-            e2.stats['G'] += 1; e1.stats['P'] += 1; e2.stats['Pts'] += 3
-        else:
-            e1.stats['E'] += 1; e2.stats['E'] += 1; e1.stats['Pts'] += 1; e2.stats['Pts'] += 1
-
-        e1.stats['DG'] = e1.stats['GF'] - e1.stats['GC']
-        e2.stats['DG'] = e2.stats['GF'] - e2.stats['GC']
-
-        self.guardar_datos()
-        return True
+    # ============================================================
+    # 🔹 Carga de resultados en lote (una jornada entera)
+    # ============================================================
+    def _resolver_id_equipo(self, nombre):
+        nombre = str(nombre).strip()
+        return nombre if nombre in self.equipos else self.buscar_equipo_por_pais(nombre)
+
+    def _resolver_resultado(self, r):
+        """Convierte un dict de entrada en (match_id, (g1, g2, ta1, ta2, tr1, tr2))."""
+        valores = []
+        for clave in ('goles_e1', 'goles_e2', 'ta1', 'ta2', 'tr1', 'tr2'):
+            v = r.get(clave, 0 if clave.startswith('t') else None)
+            try:
+                v = int(v)
+            except (TypeError, ValueError):
+                raise TorneoError(f"'{clave}' debe ser un número entero (se recibió {v!r}).")
+            if v < 0:
+                raise TorneoError(f"'{clave}' no puede ser negativo.")
+            valores.append(v)
+        g1, g2, ta1, ta2, tr1, tr2 = valores
+
+        match_id = r.get('match_id')
+        if match_id:
+            return str(match_id).strip(), (g1, g2, ta1, ta2, tr1, tr2)
+        id1 = self._resolver_id_equipo(r.get('equipo1', ''))
+        id2 = self._resolver_id_equipo(r.get('equipo2', ''))
+        if not id1 or not id2:
+            raise TorneoError(f"Equipos no encontrados: {r.get('equipo1')} / {r.get('equipo2')}.")
+        fase = r.get('fase') or "Fase de Grupos"
+        match_id = self.buscar_partido(id1, id2, fase)
+        if match_id:
+            return match_id, (g1, g2, ta1, ta2, tr1, tr2)
+        match_id = self.buscar_partido(id2, id1, fase)  # vino con local y visitante invertidos
+        if match_id:
+            return match_id, (g2, g1, ta2, ta1, tr2, tr1)
+        raise TorneoError(f"No hay partido {r.get('equipo1')} vs {r.get('equipo2')} en {fase}.")
+
+    def registrar_resultados(self, resultados, simulacion=False):
+        """
+        Registra muchos resultados juntos. Cada resultado es un dict con 'match_id'
+        (o 'equipo1'/'equipo2' por país o id y opcionalmente 'fase'), 'goles_e1',
+        'goles_e2' y opcionalmente 'ta1', 'ta2', 'tr1', 'tr2'.
+        Primero valida todos; si hay algún conflicto (o simulacion=True) no cambia nada.
+        Si no, aplica todos y guarda una sola vez. Devuelve un InformeLote.
+        """
+        informe = InformeLote()
+        lote = []
+        vistos = set()
+        for n, r in enumerate(resultados, start=1):
+            try:
+                match_id, valores = self._resolver_resultado(r)
+                partido, _, _ = self._validar_resultado(match_id)
+                if match_id in vistos:
+                    raise TorneoError(f"{match_id} aparece más de una vez en el lote.")
+                if partido.goles_e1 is not None and partido.goles_e2 is not None:
+                    raise TorneoError(f"{match_id} ya tiene resultado ({partido.goles_e1} : {partido.goles_e2}).")
+            except TorneoError as e:
+                informe.conflictos.append((n, str(e)))
+                continue
+            vistos.add(match_id)
+            informe.validos.append(match_id)
+            lote.append((match_id, partido, valores))
+
+        if informe.conflictos or simulacion:
+            return informe
+
+        equipos = {}
+        for match_id, partido, valores in lote:
+            equipos.update(dict.fromkeys(self._aplicar_resultado(match_id, partido, *valores)))
+            informe.aplicados.append(match_id)
+        if informe.aplicados:
+            self.guardar_cambios(partidos=informe.aplicados, equipos=list(equipos))
+        return informe
+
+    def actualizar_marcador(self, match_id, goles_e1, goles_e2):
+        """Carga el marcador de un partido de eliminación (no suma a la tabla de grupos)."""
+        partido = self.calendario.get(match_id)
+        if not partido:
+            raise TorneoError(f"Partido {match_id} no encontrado.")
+        # mismo camino que registrar_resultado (las tarjetas ya cargadas se conservan)
+        equipos = self._aplicar_resultado(match_id, partido, goles_e1, goles_e2,
+                                          partido.tarj_ama_e1, partido.tarj_ama_e2,
+                                          partido.tarj_roja_e1, partido.tarj_roja_e2)
+        self.guardar_cambios(partidos=[match_id], equipos=equipos)
+
+    def registrar_jugadores(self, match_id, filas):
+        """
+        Reemplaza las estadísticas de jugadores de un partido. Cada fila es un dict con
+        'jugador', 'equipo' (id o país de uno de los dos equipos del partido) y opcionalmente
+        'goles', 'asistencias', 'amarillas', 'rojas', 'minutos'. Lanza TorneoError si algo no cuadra.
+        """
+        partido = self.calendario.get(match_id)
+        if not partido:
+            raise TorneoError(f"Partido {match_id} no encontrado.")
+        normalizadas = {}
+        for r in filas:
+            nombre = str(r.get('jugador', '')).strip()
+            if not nombre:
+                raise TorneoError(f"{match_id}: falta el nombre del jugador.")
+            equipo = self._resolver_id_equipo(r.get('equipo', ''))
+            if equipo not in (partido.id_equipo1, partido.id_equipo2):
+                raise TorneoError(f"{match_id}: {r.get('equipo')!r} no juega este partido.")
+            if (equipo, nombre) in normalizadas:
+                raise TorneoError(f"{match_id}: {nombre} aparece más de una vez.")
+            fila = {'jugador': nombre, 'equipo': equipo}
+            for clave in ('goles', 'asistencias', 'amarillas', 'rojas', 'minutos'):
+                try:
+                    v = int(r.get(clave, 0) or 0)
+                except (TypeError, ValueError):
+                    raise TorneoError(f"{match_id}: '{clave}' de {nombre} debe ser un número entero.")
+                if v < 0:
+                    raise TorneoError(f"{match_id}: '{clave}' de {nombre} no puede ser negativo.")
+                fila[clave] = v
+            normalizadas[(equipo, nombre)] = fila
+        partido.jugador_stats = list(normalizadas.values())
+        self._avisar(partidos=(match_id,))
+        self.guardar_cambios(partidos=[match_id])
 
     def calcular_tabla_posiciones(self, grupo_id):
-        equipos_grupo = [e for e in self.equipos.values() if e.grupo == grupo_id]
-        tabla_ordenada = sorted(equipos_grupo, key=lambda e: (e.stats['Pts'], e.stats['DG'], e.stats['GF']), reverse=True)
-        return tabla_ordenada
+        # la tabla se mantiene ordenada al registrar resultados; los empates se
+        # resuelven sólo cuando cambió el grupo
+        version = self._version_tablas.get(grupo_id, 0)
+        guardada = self._tablas_desempatadas.get(grupo_id)
+        if not guardada or guardada[0] != version:
+            guardada = (version, self._desempate.ordenar_grupo(self._tablas.get(grupo_id, [])))
+            self._tablas_desempatadas[grupo_id] = guardada
+        return list(guardada[1])
+
+    def sorteo(self, id_equipo):
+        """Último criterio de desempate: número fijo por equipo, gana el menor."""
+        return self._desempate.sorteo(id_equipo)
+
+    def enfrentamientos_directos(self, grupo_id):
+        """
+        ({id: posición}, puntos, goles) del grupo: puntos[i][j] son los puntos que el
+        equipo i le sacó al j y goles[i][j] los goles que le hizo (copias).
+        """
+        d = self._desempate
+        posiciones = {id: i for i, id in enumerate(d.miembros.get(grupo_id, []))}
+        return (posiciones, [list(f) for f in d.puntos.get(grupo_id, [])],
+                [list(f) for f in d.goles.get(grupo_id, [])])
 
-    def guardar_datos(self):
-        data = {
-            'torneo': {
-                'nombre': self.nombre,
-                'pais_sede': self.pais_sede,
-                'fecha_inicio': self.fecha_inicio,
-                'fecha_fin': self.fecha_fin,
-                'configuracion_cerrada': self.configuracion_cerrada,
-                '_match_id_counter': self._match_id_counter
-            },
-            'equipos': {id: e.to_dict() for id, e in self.equipos.items()},
-            'calendario': {id: p.to_dict() for id, p in self.calendario.items()}
+    def ordenar_equipos(self, ids):
+        """
+        Ordena equipos de grupos distintos (p. ej. los terceros de cada grupo) por
+        Pts, DG, GF, juego limpio y sorteo.
+        """
+        ids = list(ids)
+        if self.compacto:
+            ordinales = [self._orden_equipos[id] for id in ids]
+            por_ordinal = dict(zip(ordinales, ids))
+            sorteo = [self._desempate.sorteo(id) for id in ids]
+            return [self.equipos[por_ordinal[o]] for o in self._tabla_stats.ordenar(ordinales, sorteo)]
+        return sorted((self.equipos[id] for id in ids), key=self._desempate.clave_general)
+
+    def totales_por_confederacion(self, campos=('PJ', 'G', 'E', 'P', 'Pts')):
+        """Suma estadísticas por confederación: {conf: {campo: total}}."""
+        if self.compacto and self.equipos:
+            equipos = list(self.equipos.values())
+            return self._tabla_stats.sumar_por([self._orden_equipos[e.identificador] for e in equipos],
+                                               [e.confederacion or "Desconocida" for e in equipos], campos)
+        totales = {}
+        for e in self.equipos.values():
+            conf = totales.setdefault(e.confederacion or "Desconocida", {c: 0 for c in campos})
+            for c in campos:
+                conf[c] += e.stats[c]
+        return totales
+
+    def _datos_torneo(self):
+        return {
+            'nombre': self.nombre,
+            'pais_sede': self.pais_sede,
+            'fecha_inicio': self.fecha_inicio,
+            'fecha_fin': self.fecha_fin,
+            'configuracion_cerrada': self.configuracion_cerrada,
+            '_match_id_counter': self._match_id_counter
         }
+
+    def guardar_datos(self):
+        """
+        Guarda el torneo completo (en JSON, compacta también el diario).
+        Con escritor la foto del estado se toma acá y la escritura queda encolada;
+        los errores llegan al manejador del escritor en lugar de lanzarse.
+        """
+        datos = (self._datos_torneo(),
+                 {id: e.to_dict() for id, e in self.equipos.items()},
+                 {id: p.to_dict() for id, p in self.calendario.items()})
+        # la compactación queda anotada al encolarla: los guardados que siguen no la repiten
+        self.almacen.anotar_compactacion()
+        if self.escritor:
+            self.escritor.enviar(('todo', self.almacen.ruta), self._escribir_todo, datos)
+        else:
+            self._escribir_todo(datos)
+
+    def _escribir_todo(self, datos):
         try:
-            with open(self.FILENAME, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=4, ensure_ascii=False)
+            self.almacen.guardar_todo(*datos)
         except Exception as ex:
-            messagebox.showerror("Error", f"No se pudo guardar datos: {ex}")
+            raise TorneoError(f"No se pudo guardar datos: {ex}") from ex
 
-    def cargar_datos(self):
-        if not os.path.exists(self.FILENAME):
-            return
+    def guardar_cambios(self, partidos=(), equipos=()):
+        """
+        Guarda sólo los partidos y equipos indicados (más los datos generales del torneo).
+        El costo no depende del tamaño del calendario.
+        """
+        datos = (self._datos_torneo(),
+                 {id: self.equipos[id].to_dict() for id in equipos},
+                 {mid: self.calendario[mid].to_dict() for mid in partidos})
+        self.almacen.anotar_cambios(*datos)
+        if self.escritor:
+            self.escritor.enviar(('cambios', self.almacen.ruta), self._escribir_cambios, datos,
+                                 fusionar=fusionar_cambios)
+        else:
+            self._escribir_cambios(datos)
+        if self.almacen.necesita_compactar():
+            self.guardar_datos()
+
+    def _escribir_cambios(self, datos):
         try:
-            with open(self.FILENAME, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        except Exception:
-            return
-        t_data = data.get('torneo', {})
+            self.almacen.guardar_cambios(*datos)
+        except Exception as ex:
+            raise TorneoError(f"No se pudo guardar datos: {ex}") from ex
+
+    def _aplicar_datos_torneo(self, t_data):
         self.nombre = t_data.get('nombre', self.nombre)
+        self._desempate.fijar_semilla(self.nombre)
         self.configuracion_cerrada = t_data.get('configuracion_cerrada', False)
         self._match_id_counter = t_data.get('_match_id_counter', 1)
+
+    def _cargar_equipo(self, id, e_data):
+        equipo = Equipo(e_data['identificador'], e_data['pais'], e_data.get('abreviatura',''), e_data.get('confederacion',''), e_data.get('grupo',''))
+        equipo.stats.update(e_data.get('stats', {}))
+        self.agregar_equipo(equipo)
+
+    def _cargar_partido(self, id, p_data):
+        partido = Partido(p_data['id_equipo1'], p_data['id_equipo2'], p_data.get('fecha',''), p_data.get('hora',''), p_data.get('fase','Fase de Grupos'))
+        partido.goles_e1 = p_data.get('goles_e1')
+        partido.goles_e2 = p_data.get('goles_e2')
+        partido.tarj_ama_e1 = p_data.get('tarj_ama_e1', 0)
+        partido.tarj_ama_e2 = p_data.get('tarj_ama_e2', 0)
+        partido.tarj_roja_e1 = p_data.get('tarj_roja_e1', 0)
+        partido.tarj_roja_e2 = p_data.get('tarj_roja_e2', 0)
+        partido.jugador_stats = p_data.get('jugador_stats', [])
+        partido.sede = p_data.get('sede') or ''
+        anterior = self.calendario.get(id)
+        if anterior and (anterior.fase, anterior.id_equipo1, anterior.id_equipo2) == (partido.fase, partido.id_equipo1, partido.id_equipo2):
+            # mismo partido con otro marcador: sólo cambia el estado
+            self.calendario[id] = partido
+            self._actualizar_estado(id, partido)
+        else:
+            self._desindexar_partido(id)
+            self.calendario[id] = partido
+            self._indexar_partido(id, partido)
+
+    def cargar_datos(self):
+        """Carga los registros del almacén (instantánea + diario) en orden."""
         self.equipos = {}
-        for id, e_data in data.get('equipos', {}).items():
-            equipo = Equipo(e_data['identificador'], e_data['pais'], e_data.get('abreviatura',''), e_data.get('confederacion',''), e_data.get('grupo',''))
-            equipo.stats = e_data.get('stats', equipo.stats)
-            self.equipos[id] = equipo
-            if equipo.grupo:
-                self.grupos.add(equipo.grupo)
         self.calendario = {}
-        for id, p_data in data.get('calendario', {}).items():
-            partido = Partido(p_data['id_equipo1'], p_data['id_equipo2'], p_data.get('fecha',''), p_data.get('hora',''), p_data.get('fase','Fase de Grupos'))
-            partido.goles_e1 = p_data.get('goles_e1')
-            partido.goles_e2 = p_data.get('goles_e2')
-            partido.tarj_ama_e1 = p_data.get('tarj_ama_e1', 0)
-            partido.tarj_ama_e2 = p_data.get('tarj_ama_e2', 0)
-            partido.tarj_roja_e1 = p_data.get('tarj_roja_e1', 0)
-            partido.tarj_roja_e2 = p_data.get('tarj_roja_e2', 0)
-            partido.jugador_stats = p_data.get('jugador_stats', [])
-            self.calendario[id] = partido
+        self._reiniciar_indices()
+        try:
+            registros = self.almacen.cargar()
+        except Exception:
+            self._avisar(None, None)
+            return
+        self._cargando = True
+        for registro in registros:
+            self._aplicar_datos_torneo(registro.get('t', {}))
+            for id, e_data in registro.get('e', {}).items():
+                self._cargar_equipo(id, e_data)
+            for id, p_data in registro.get('p', {}).items():
+                self._cargar_partido(id, p_data)
+        # las stats guardadas sólo son un caché: se derivan de nuevo de los partidos
+        self.reconstruir_estadisticas()
+        self._cargando = False
+        self._avisar(None, None)
     # ============================================================
     # 🔹 Obtener equipo por posición (para las llaves de eliminación)
     # ============================================================
@@ -185,29 +677,29 @@ class Torneo:
         """
         Devuelve el equipo correspondiente a un string como:
         '1°A', '2°C', '3°B/E/F' según las tablas de posiciones actuales.
-        Si la posición contiene varias opciones (3°B/E/F), elige una al azar.
+        Los puestos de tercero con varias opciones (3°B/E/F) se resuelven con la
+        tabla de mejores terceros de cruces.py.
         """
-        import random
-
         if not posicion_str or len(posicion_str) < 3:
             return None
 
         try:
             pos = int(posicion_str[0])  # 1, 2 o 3
-            grupos = []
 
             partes = posicion_str.split("°")[-1]
-            if "/" in partes:
-                grupos = partes.split("/")
-            else:
-                grupos = [partes]
-
-            grupos = [g.strip() for g in grupos if g.strip().isalpha()]
+            grupos = [g.strip() for g in partes.split("/") if g.strip().isalpha()]
 
             if not grupos:
                 return None
 
-            grupo = random.choice(grupos)
+            if len(grupos) == 1:
+                grupo = grupos[0]
+            else:
+                asignacion = self.asignacion_terceros()
+                rival = cruces.rival_del_puesto(f"{pos}°" + "/".join(grupos))
+                if not asignacion or not rival:
+                    return None
+                grupo = asignacion[rival]
             tabla = self.calcular_tabla_posiciones(grupo)
 
             if len(tabla) >= pos:
@@ -217,6 +709,32 @@ class Torneo:
             print("Error en obtener_equipo_por_posicion:", e)
             return None
 
+    def mejores_terceros(self, cantidad=4):
+        """Los `cantidad` mejores terceros de grupo, ya ordenados."""
+        terceros = []
+        for g in sorted(self.grupos):
+            tabla = self.calcular_tabla_posiciones(g)
+            if len(tabla) >= 3:
+                terceros.append(tabla[2].identificador)
+        return self.ordenar_equipos(terceros)[:cantidad]
+
+    def asignacion_terceros(self):
+        """
+        {'A': grupo del tercero que enfrenta a 1°A, ..., 'D': ...} según qué grupos
+        aportan los mejores terceros, o None si el formato no es el de 6 grupos.
+        Se recalcula sólo cuando cambió alguna tabla.
+        """
+        version = self.version_tabla()
+        if self._terceros[0] != version:
+            grupos = [e.grupo for e in self.mejores_terceros()]
+            self._terceros = (version, cruces.grupos_de_terceros(grupos) if len(grupos) == 4 else None)
+        return self._terceros[1]
+
+    def cruces_octavos(self):
+        """[(código, Equipo local, Equipo visitante)] de octavos, en orden de llave."""
+        return [(codigo, self.obtener_equipo_por_posicion(local), self.obtener_equipo_por_posicion(visitante))
+                for codigo, local, visitante in cruces.OCTAVOS]
+
     # ============================================================
     # 🔹 Generar rondas de eliminación automáticamente
     # ============================================================
@@ -225,6 +743,7 @@ class Torneo:
         Genera automáticamente los partidos de las siguientes fases de eliminación
         (Octavos → Cuartos → Semifinal → Final)
         en base a los ganadores de los encuentros anteriores.
+        Devuelve los match_id creados.
         """
         nuevas_rondas = []
 
@@ -234,40 +753,32 @@ class Torneo:
         # Buscar la fase actual
         fase_actual = None
         for fase in fases_orden:
-            if any(p.fase == fase for p in self.calendario.values()):
+            if self._partidos_por_fase.get(fase):
                 fase_actual = fase
                 break
 
         if not fase_actual:
             print("⚠️ No hay fase de eliminación actual para avanzar.")
-            return
+            return []
 
         # --- Obtener ganadores ---
-        ganadores = []
-        for p in self.calendario.values():
-            if p.fase != fase_actual:
-                continue
-            if p.goles_e1 is None or p.goles_e2 is None:
-                continue
-            if p.goles_e1 > p.goles_e2:
-                ganadores.append(self.equipos[p.id_equipo1])
-            elif p.goles_e2 > p.goles_e1:
-                ganadores.append(self.equipos[p.id_equipo2])
+        ganadores = self.obtener_ganadores_fase(fase_actual)
 
         if not ganadores:
             print("⚠️ No hay ganadores aún en la fase actual.")
-            return
+            return []
 
         # --- Siguiente fase ---
         idx = fases_orden.index(fase_actual)
         if idx + 1 >= len(fases_orden):
             print("🏁 El torneo ya llegó a la final.")
-            return
+            return []
 
         fase_siguiente = fases_orden[idx + 1]
         print(f"➡️ Generando {fase_siguiente} con {len(ganadores)} equipos...")
 
         # --- Crear nuevos partidos ---
+        nuevos_ids = []
         for i in range(0, len(ganadores), 2):
             if i + 1 < len(ganadores):
                 e1 = ganadores[i]
@@ -275,13 +786,14 @@ class Torneo:
                 nuevo_partido = Partido(e1.id_equipo1 if hasattr(e1, 'id_equipo1') else e1.identificador,
                                         e2.id_equipo1 if hasattr(e2, 'id_equipo1') else e2.identificador,
                                         fecha="", hora="", fase=fase_siguiente)
-                self.agregar_partido(nuevo_partido)
+                nuevos_ids.append(self.agregar_partido(nuevo_partido))
                 nuevas_rondas.append(nuevo_partido)
 
         # Guardar resultados
         if nuevas_rondas:
-            self.guardar_datos()
+            self.guardar_cambios(partidos=nuevos_ids)
             print(f"✅ {len(nuevas_rondas)} partidos creados para {fase_siguiente}.")
+        return nuevos_ids
 
     # ============================================================
     # 🔹 Obtener ganadores de una fase específica
@@ -289,9 +801,7 @@ class Torneo:
     def obtener_ganadores_fase(self, fase):
         """Devuelve una lista con los equipos ganadores de la fase especificada."""
         ganadores = []
-        for p in self.calendario.values():
-            if p.fase != fase:
-                continue
+        for p in self.partidos_por_fase(fase).values():
             if p.goles_e1 is None or p.goles_e2 is None:
                 continue
             if p.goles_e1 > p.goles_e2:
@@ -300,23 +810,23 @@ class Torneo:
                 ganadores.append(self.equipos[p.id_equipo2])
         return ganadores
 
-def load_teams_from_excel(filename="FIFA_Sub20_2025_Equipos.xlsx"):
-    path = os.path.join(SCRIPT_DIR, filename)
+def load_teams_from_excel(filename="FIFA_Sub20_2025_Equipos.xlsx", base_dir=SCRIPT_DIR):
+    """
+    Lee la lista de países del Excel. Lanza FileNotFoundError si no existe
+    (la interfaz puede usar EQUIPOS_EJEMPLO) y TorneoError si no se puede leer.
+    """
+    path = os.path.join(base_dir, filename)
     if not os.path.exists(path):
-        # fallback sample 24
-        sample = [
-            "Arabia Saudita","Argentina","Australia","Brasil","Chile","Colombia",
-            "Corea del Sur","Cuba","Egipto","España","Estados Unidos","Francia",
-            "Italia","Japón","Marruecos","México","Nigeria","Noruega",
-            "Nueva Caledonia","Nueva Zelanda","Panamá","Paraguay","Sudáfrica","Ucrania"
-        ]
-        messagebox.showwarning("Archivo no encontrado", f"No se encontró '{os.path.basename(path)}' en la carpeta del script.\nSe cargó una lista de ejemplo ({len(sample)} países).")
-        return sample
+        raise FileNotFoundError(path)
     try:
-        df = pd.read_excel(path)
+        # el Excel sólo se vuelve a parsear si cambió (ver input_cache.py)
+        return list(cargar_cacheado(path, _leer_equipos_excel))
     except Exception as e:
-        messagebox.showerror("Error", f"No se pudo leer '{os.path.basename(path)}': {e}")
-        return []
+        raise TorneoError(f"No se pudo leer '{os.path.basename(path)}': {e}") from e
+
+def _leer_equipos_excel(path):
+    import pandas as pd  # sólo se paga al leer el Excel
+    df = pd.read_excel(path)
     col_name = None
     for c in df.columns:
         if str(c).strip().lower() in ('pais','país','equipo','team','country','selección','seleccion'):
@@ -331,3 +841,34 @@ def load_teams_from_excel(filename="FIFA_Sub20_2025_Equipos.xlsx"):
         if en and en not in seen:
             seen.add(en); unique.append(en)
     return unique
+
+def load_team_info_from_excel(filename="FIFA_Sub20_2025_Equipos.xlsx", base_dir=SCRIPT_DIR):
+    """
+    {país: {'confederacion': ..., 'bombo': n o None}} con las columnas opcionales
+    'Confederación' y 'Bombo' del Excel de equipos ({} si el archivo no existe).
+    """
+    path = os.path.join(base_dir, filename)
+    if not os.path.exists(path):
+        return {}
+    try:
+        return cargar_cacheado(path, _leer_info_equipos_excel)
+    except Exception as e:
+        raise TorneoError(f"No se pudo leer '{os.path.basename(path)}': {e}") from e
+
+def _leer_info_equipos_excel(path):
+    import pandas as pd
+    df = pd.read_excel(path)
+    columnas = {str(c).strip().lower(): c for c in df.columns}
+    col_pais = next((columnas[c] for c in ('pais','país','equipo','team','country','selección','seleccion') if c in columnas), df.columns[0])
+    col_conf = next((columnas[c] for c in ('confederación','confederacion','confederation') if c in columnas), None)
+    col_bombo = next((columnas[c] for c in ('bombo','pot') if c in columnas), None)
+    info = {}
+    for _, fila in df.iterrows():
+        if pd.isna(fila[col_pais]) or not str(fila[col_pais]).strip():
+            continue
+        conf = fila[col_conf] if col_conf is not None else None
+        bombo = fila[col_bombo] if col_bombo is not None else None
+        info.setdefault(str(fila[col_pais]).strip(), {
+            'confederacion': '' if conf is None or pd.isna(conf) else str(conf).strip(),
+            'bombo': None if bombo is None or pd.isna(bombo) else int(bombo)})
+    return info
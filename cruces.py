@@ -0,0 +1,49 @@
+# cruces.py
+# Cruces de octavos de final del Mundial Sub-20 2025 (6 grupos, pasan 1°, 2° y los 4 mejores 3°)
+# según fechas_fase_eliminatoria.xlsx. El orden es el de la llave: los ganadores de
+# partidos consecutivos se cruzan en cuartos (M37-M38 -> M45, M39-M40 -> M46, ...).
+GRUPOS = "ABCDEF"
+
+OCTAVOS = [
+    ("M37", "2°A", "2°C"),
+    ("M38", "1°D", "3°B/E/F"),
+    ("M39", "1°B", "3°A/C/D"),
+    ("M40", "1°A", "3°C/D/E/F"),
+    ("M41", "1°E", "2°D"),
+    ("M42", "1°C", "3°A/B/F"),
+    ("M43", "2°F", "2°B"),
+    ("M44", "1°F", "2°E"),
+]
+
+# grupos de los 4 mejores terceros -> grupo del tercero que enfrenta a 1°A, 1°B, 1°C y 1°D
+# (tabla del reglamento, una fila por cada combinación posible de 4 de los 6 grupos)
+TERCEROS = {
+    "ABCD": "CDAB", "ABCE": "CABE", "ABCF": "CABF", "ABDE": "DABE", "ABDF": "DABF",
+    "ABEF": "EABF", "ACDE": "CDAE", "ACDF": "CDAF", "ACEF": "CAFE", "ADEF": "DAFE",
+    "BCDE": "CDBE", "BCDF": "CDBF", "BCEF": "ECBF", "BDEF": "EDBF", "CDEF": "CDFE",
+}
+RIVALES_DE_TERCEROS = "ABCD"
+
+# la misma tabla indexada por máscara de bits (bit i = pasa el tercero de GRUPOS[i]),
+# para resolverla con una sola indexación también sobre arrays
+TERCEROS_POR_MASCARA = [None] * (1 << len(GRUPOS))
+for _clave, _rivales in TERCEROS.items():
+    TERCEROS_POR_MASCARA[sum(1 << GRUPOS.index(g) for g in _clave)] = tuple(GRUPOS.index(g) for g in _rivales)
+
+
+def rival_del_puesto(puesto):
+    """Para un puesto de tercero ('3°B/E/F') devuelve el grupo del primero que lo enfrenta ('D')."""
+    for _, local, visitante in OCTAVOS:
+        if visitante == puesto:
+            return local.split("°")[1]
+    return None
+
+
+def grupos_de_terceros(grupos_clasificados):
+    """
+    Recibe los grupos de los 4 terceros que pasan (en cualquier orden) y devuelve
+    {'A': grupo del tercero que enfrenta a 1°A, 'B': ..., 'C': ..., 'D': ...}, o None si
+    la combinación no existe en la tabla.
+    """
+    rivales = TERCEROS.get("".join(sorted(grupos_clasificados)))
+    return dict(zip(RIVALES_DE_TERCEROS, rivales)) if rivales else None
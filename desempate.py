@@ -0,0 +1,129 @@
+# desempate.py
+import random
+
+# puntos de juego limpio (reglamento FIFA): amarilla -1, roja -4
+PUNTOS_AMARILLA = -1
+PUNTOS_ROJA = -4
+
+
+def puntos_fair_play(stats):
+    return PUNTOS_AMARILLA * stats['TA'] + PUNTOS_ROJA * stats['TR']
+
+
+def clave_principal(e):
+    return (e.stats['Pts'], e.stats['DG'], e.stats['GF'])
+
+
+class MotorDesempate:
+    """
+    Criterios de desempate de la fase de grupos (reglamento FIFA):
+      1) puntos, 2) diferencia de gol, 3) goles a favor en todos los partidos del grupo;
+      entre los equipos que siguen igualados:
+      4) puntos, 5) diferencia de gol, 6) goles a favor en los partidos entre ellos;
+      7) juego limpio (amarillas y rojas); 8) sorteo.
+    Los enfrentamientos directos se guardan por grupo en matrices que se actualizan
+    con cada resultado: desempatar k equipos cuesta O(k²) sin recorrer el calendario.
+    El sorteo se hace una sola vez por equipo (reproducible a partir de la semilla).
+    """
+    def __init__(self, semilla=''):
+        self.semilla = semilla
+        self._indice = {}     # id equipo -> (grupo, posición en la matriz)
+        self.miembros = {}    # grupo -> [id equipo]
+        self.puntos = {}      # grupo -> matriz: puntos[i][j] = puntos que i le sacó a j
+        self.goles = {}       # grupo -> matriz: goles[i][j] = goles de i contra j
+        self._sorteo = {}
+
+    def fijar_semilla(self, semilla):
+        if semilla != self.semilla:
+            self.semilla = semilla
+            self._sorteo = {}
+
+    def sorteo(self, id_equipo):
+        """Número fijo en [0, 1) por equipo; gana el sorteo el menor."""
+        if id_equipo not in self._sorteo:
+            self._sorteo[id_equipo] = random.Random(f"{self.semilla}|{id_equipo}").random()
+        return self._sorteo[id_equipo]
+
+    # ------------------------------------------------------------
+    def agregar_equipo(self, id_equipo, grupo):
+        actual = self._indice.get(id_equipo)
+        if actual and actual[0] == grupo:
+            return
+        if actual:
+            self._quitar(id_equipo)
+        if not grupo:
+            return
+        miembros = self.miembros.setdefault(grupo, [])
+        puntos = self.puntos.setdefault(grupo, [])
+        goles = self.goles.setdefault(grupo, [])
+        for fila in puntos:
+            fila.append(0)
+        for fila in goles:
+            fila.append(0)
+        miembros.append(id_equipo)
+        puntos.append([0] * len(miembros))
+        goles.append([0] * len(miembros))
+        self._indice[id_equipo] = (grupo, len(miembros) - 1)
+
+    def _quitar(self, id_equipo):
+        grupo, i = self._indice.pop(id_equipo)
+        del self.miembros[grupo][i]
+        for matriz in (self.puntos[grupo], self.goles[grupo]):
+            del matriz[i]
+            for fila in matriz:
+                del fila[i]
+        for j, otro in enumerate(self.miembros[grupo][i:], start=i):
+            self._indice[otro] = (grupo, j)
+
+    def registrar(self, id1, id2, goles1, goles2, signo=1):
+        """Suma (o resta con signo=-1) un resultado entre dos equipos del mismo grupo."""
+        a, b = self._indice.get(id1), self._indice.get(id2)
+        if not a or not b or a[0] != b[0]:
+            return
+        grupo, i, j = a[0], a[1], b[1]
+        self.goles[grupo][i][j] += signo * goles1
+        self.goles[grupo][j][i] += signo * goles2
+        p1, p2 = (3, 0) if goles1 > goles2 else ((0, 3) if goles1 < goles2 else (1, 1))
+        self.puntos[grupo][i][j] += signo * p1
+        self.puntos[grupo][j][i] += signo * p2
+
+    def reconstruir(self, partidos):
+        """Vuelve a armar las matrices desde los partidos de grupo ya jugados."""
+        for grupo, miembros in self.miembros.items():
+            n = len(miembros)
+            self.puntos[grupo] = [[0] * n for _ in range(n)]
+            self.goles[grupo] = [[0] * n for _ in range(n)]
+        for p in partidos:
+            if p.goles_e1 is not None and p.goles_e2 is not None:
+                self.registrar(p.id_equipo1, p.id_equipo2, p.goles_e1, p.goles_e2)
+
+    # ------------------------------------------------------------
+    def desempatar(self, bloque):
+        """Ordena equipos del mismo grupo igualados en puntos, DG y GF (criterios 4 a 8)."""
+        if len(bloque) < 2:
+            return list(bloque)
+        grupo = self._indice[bloque[0].identificador][0]
+        puntos, goles = self.puntos[grupo], self.goles[grupo]
+        pos = [self._indice[e.identificador][1] for e in bloque]
+
+        def clave(par):
+            i, e = par
+            hp = sum(puntos[i][j] for j in pos)
+            gf = sum(goles[i][j] for j in pos)
+            gc = sum(goles[j][i] for j in pos)
+            return (-hp, gc - gf, -gf, -puntos_fair_play(e.stats), self.sorteo(e.identificador))
+        return [e for _, e in sorted(zip(pos, bloque), key=clave)]
+
+    def ordenar_grupo(self, tabla):
+        """Recibe la tabla ya ordenada por (Pts, DG, GF) y resuelve los empates que queden."""
+        resultado = []
+        inicio = 0
+        for fin in range(1, len(tabla) + 1):
+            if fin == len(tabla) or clave_principal(tabla[fin]) != clave_principal(tabla[inicio]):
+                resultado.extend(self.desempatar(tabla[inicio:fin]) if fin - inicio > 1 else tabla[inicio:fin])
+                inicio = fin
+        return resultado
+
+    def clave_general(self, e):
+        """Para comparar equipos de grupos distintos (p. ej. terceros): sin enfrentamiento directo."""
+        return (-e.stats['Pts'], -e.stats['DG'], -e.stats['GF'], -puntos_fair_play(e.stats), self.sorteo(e.identificador))
@@ -2,8 +2,10 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from utils import apply_style, center_fullscreen
-from core import Torneo, Partido, Equipo
-import pandas as pd
+from core import Torneo, Partido, Equipo, TorneoError
+from tabla_virtual import TablaVirtual
+from persistencia import trabajador
+from programacion import programar_torneo
 import os
 
 class EliminationUI:
@@ -32,66 +34,34 @@ class EliminationUI:
     def _calculate_qualifiers(self):
         # take top 2 from each group
         groups = sorted(set(e.grupo for e in self.torneo.equipos.values()))
-        firsts = []; seconds = []; thirds = []
+        firsts = []; seconds = []
         for g in groups:
             tabla = self.torneo.calcular_tabla_posiciones(g)
             if len(tabla) >= 1: firsts.append(tabla[0].pais)
             if len(tabla) >= 2: seconds.append(tabla[1].pais)
-            if len(tabla) >= 3: thirds.append({'pais':tabla[2].pais,'grupo':g,'stats':tabla[2].stats})
-        # choose best 4 thirds by Pts, DG, GF
-        thirds_sorted = sorted(thirds, key=lambda t: (t['stats']['Pts'], t['stats']['DG'], t['stats']['GF']), reverse=True)
-        best_thirds = [t['pais'] for t in thirds_sorted[:4]]
+        # choose best 4 thirds by Pts, DG, GF, fair play and lots (see desempate.py)
+        best_thirds = [e.pais for e in self.torneo.mejores_terceros()]
         return {'1os': firsts, '2os': seconds, '3os_best': best_thirds}
 
     def _generate_octavos(self):
-        # This mapping MUST respect regla III — here we use a typical mapping placeholder:
-        # Example mapping (needs to be adapted to your PDF exact mapping if different)
-        # We'll create 8 matches by combining firsts/seconds/thirds_best in a reasonable order
-        f = self.qualifiers['1os']; s = self.qualifiers['2os']; t = self.qualifiers['3os_best']
-        # We'll fill octavos as pairs. NOTE: for production adapt to exact mapping
-        teams_order = []
-        # choose a simple deterministic pairing for demonstration:
-        # 1A vs 3C, 1B vs 3D, 1C vs 3A, 1D vs 3B, 1E vs 2F, 1F vs 2E, 2A vs 2C, 2B vs 2D
-        # need mapping group->team id (search team by pais)
-        group_map = {}
-        for id, e in self.torneo.equipos.items():
-            group_map.setdefault(e.grupo, []).append(e)
-        # helper search: find identifier by pais
-        def find_id_by_pais(pais):
-            for id,e in self.torneo.equipos.items():
-                if e.pais == pais:
-                    return id
-            return None
-        pairs = []
-        # simplistic pairs using available lists (may not exactly match PDF mapping)
-        # fill from firsts and seconds
-        # pair first 4 firsts with best thirds if available
-        for i in range(min(4,len(f))):
-            a = find_id_by_pais(f[i])
-            b = find_id_by_pais(self.qualifiers['3os_best'][i]) if i < len(self.qualifiers['3os_best']) else None
-            if a and b: pairs.append((a,b))
-        # remaining pairs use other firsts vs seconds
-        j = 4
-        while len(pairs) < 8 and j < len(f):
-            a = find_id_by_pais(f[j])
-            # pair with a second not yet used
-            for sec in s:
-                b = find_id_by_pais(sec)
-                if b and (a,b) not in pairs:
-                    pairs.append((a,b)); break
-            j += 1
-        # fallback: pair any available not same
-        ids = list(self.torneo.equipos.keys())
-        i=0
-        while len(pairs) < 8 and i+1 < len(ids):
-            if (ids[i],ids[i+1]) not in pairs:
-                pairs.append((ids[i],ids[i+1]))
-            i+=2
-        # create Partido objects
-        for a,b in pairs:
-            p = Partido(a,b,fecha="",hora="",fase="Octavos")
-            mid = self.torneo.agregar_partido(p)
+        # regulation pairings (cruces.py): best thirds are slotted with the precomputed table
+        for codigo, e1, e2 in self.torneo.cruces_octavos():
+            if not e1 or not e2:
+                continue
+            mid = self.torneo.buscar_partido(e1.identificador, e2.identificador, "Octavos")
+            if not mid:  # reopening the screen reuses the matches already created
+                p = Partido(e1.identificador,e2.identificador,fecha="",hora="",fase="Octavos")
+                mid = self.torneo.agregar_partido(p)
             self.phase_matches['Octavos'].append(mid)
+        self._programar()
+
+    def _programar(self):
+        # date, kickoff and venue from fechas_fase_eliminatoria.xlsx (see programacion.py)
+        try:
+            return programar_torneo(self.torneo)
+        except TorneoError as e:
+            messagebox.showwarning("Programación", str(e))
+            return []
 
     def build_ui(self):
         header = ttk.Frame(self.master,padding=8); header.pack(fill='x')
@@ -101,28 +71,29 @@ class EliminationUI:
         ttk.Button(top, text="Guardar Fase", command=self.save_phase).pack(side='right')
         ttk.Button(top, text="Continuar (siguiente fase)", command=self.next_phase).pack(side='right', padx=6)
 
-        cols = ("ID","Fase","Equipo1","G1","vs","G2","Equipo2","Resultado")
-        self.tree = ttk.Treeview(self.master, columns=cols, show='headings')
-        for c in cols: self.tree.heading(c, text=c)
-        self.tree.pack(fill='both', expand=True, padx=8, pady=8)
+        cols = ("ID","Fase","Equipo1","G1","vs","G2","Equipo2","Resultado","Fecha","Sede")
+        # virtual table keyed by match id: only visible rows exist, edits touch one row
+        self.tabla = TablaVirtual(self.master, cols)
+        self.tabla.pack(fill='both', expand=True, padx=8, pady=8)
+        self.tree = self.tabla.tree
         self.tree.bind("<Double-1>", self._on_double_click)
 
+    def _row(self, mid, p):
+        e1 = self.torneo.equipos.get(p.id_equipo1).pais if p.id_equipo1 in self.torneo.equipos else p.id_equipo1
+        e2 = self.torneo.equipos.get(p.id_equipo2).pais if p.id_equipo2 in self.torneo.equipos else p.id_equipo2
+        res = f"{p.goles_e1} : {p.goles_e2}" if p.goles_e1 is not None else "PENDIENTE"
+        fecha = f"{p.fecha} {p.hora}".strip()
+        return (mid,p.fase,e1,p.goles_e1 if p.goles_e1 is not None else "", "vs", p.goles_e2 if p.goles_e2 is not None else "", e2, res, fecha, p.sede)
+
     def load_phase(self, phase):
         self.phase_label.config(text=phase)
-        self.tree.delete(*self.tree.get_children())
         # show matches that have p.fase == phase
-        for mid,p in self.torneo.calendario.items():
-            if p.fase != phase: continue
-            e1 = self.torneo.equipos.get(p.id_equipo1).pais if p.id_equipo1 in self.torneo.equipos else p.id_equipo1
-            e2 = self.torneo.equipos.get(p.id_equipo2).pais if p.id_equipo2 in self.torneo.equipos else p.id_equipo2
-            res = f"{p.goles_e1} : {p.goles_e2}" if p.goles_e1 is not None else "PENDIENTE"
-            self.tree.insert("", tk.END, iid=mid, values=(mid,p.fase,e1,p.goles_e1 if p.goles_e1 is not None else "", "vs", p.goles_e2 if p.goles_e2 is not None else "", e2, res))
+        self.tabla.cargar((mid, self._row(mid, p)) for mid,p in self.torneo.partidos_por_fase(phase).items())
 
     def _on_double_click(self, event):
-        item = self.tree.selection()
-        if not item:
+        mid = self.tabla.seleccion()
+        if not mid:
             return
-        mid = item[0]
         p = self.torneo.calendario.get(mid)
         if not p:
             messagebox.showerror("Error", "No se encontró el partido seleccionado en el calendario interno.")
@@ -170,11 +141,14 @@ class EliminationUI:
                 win.focus_force()
                 return
 
-            p.goles_e1 = g1
-            p.goles_e2 = g2
-            self.torneo.guardar_datos()
+            try:
+                self.torneo.actualizar_marcador(mid, g1, g2)
+            except TorneoError as ex:
+                messagebox.showerror("Error", str(ex))
+                win.focus_force()
+                return
             win.destroy()
-            self.load_phase(self.current_phase)
+            self.tabla.actualizar(mid, self._row(mid, p))
             messagebox.showinfo(
                 "Resultado guardado",
                 f"{e1_name} ({e1_abbr}) {g1} : {g2} {e2_name} ({e2_abbr})"
@@ -186,21 +160,25 @@ class EliminationUI:
 
     def save_phase(self):
         # nothing extra needed: partidos ya guardados al editar. Save JSON and export excel
-        self.torneo.guardar_datos()
+        try:
+            self.torneo.guardar_datos()
+        except TorneoError as e:
+            messagebox.showerror("Error", str(e))
+            return
         # export current phase to excel
         rows=[]
-        for mid,p in self.torneo.calendario.items():
-            if p.fase != self.current_phase: continue
+        for mid,p in self.torneo.partidos_por_fase(self.current_phase).items():
             e1 = self.torneo.equipos.get(p.id_equipo1).pais if p.id_equipo1 in self.torneo.equipos else p.id_equipo1
             e2 = self.torneo.equipos.get(p.id_equipo2).pais if p.id_equipo2 in self.torneo.equipos else p.id_equipo2
             rows.append({'ID':mid,'Fase':p.fase,'Equipo1':e1,'G1':p.goles_e1,'G2':p.goles_e2,'Equipo2':e2})
         out = os.path.join(os.path.dirname(__file__), f"Resultados_{self.current_phase}.xlsx")
-        try:
-            pd.DataFrame(rows).to_excel(out,index=False)
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo exportar: {e}")
-            return
-        messagebox.showinfo("Guardado", f"Fase {self.current_phase} guardada y exportada.")
+        import pandas as pd  # sólo hace falta para exportar
+        df = pd.DataFrame(rows)
+        fase = self.current_phase
+        # written by the background worker: repeated clicks collapse into one write
+        trabajador.enviar(('excel', out), lambda: df.to_excel(out,index=False),
+                          al_terminar=lambda _: messagebox.showinfo("Guardado", f"Fase {fase} guardada y exportada."),
+                          al_fallar=lambda e: messagebox.showerror("Error", f"No se pudo exportar: {e}"))
 
     def next_phase(self):
         idx = self.phases_order.index(self.current_phase)
@@ -210,8 +188,7 @@ class EliminationUI:
                 return
             # compute winners from current phase to produce next phase matches (simple pairing sequential)
             winners = []
-            for mid,p in list(self.torneo.calendario.items()):
-                if p.fase != self.current_phase: continue
+            for mid,p in self.torneo.partidos_por_fase(self.current_phase).items():
                 if p.goles_e1 is None or p.goles_e2 is None:
                     messagebox.showwarning("Faltan resultados", "Hay partidos sin resultado. Complete antes de avanzar.")
                     return
@@ -224,11 +201,16 @@ class EliminationUI:
             while i+1 < len(winners):
                 pairs.append((winners[i], winners[i+1])); i+=2
             # create Partido for next phase
+            nuevos = []
             for a,b in pairs:
                 pp = Partido(a,b,fecha="",hora="",fase=next_phase)
-                self.torneo.agregar_partido(pp)
+                nuevos.append(self.torneo.agregar_partido(pp))
+            nuevos += [mid for mid in self._programar() if mid not in nuevos]
             self.current_phase = next_phase
-            self.torneo.guardar_datos()
+            try:
+                self.torneo.guardar_cambios(partidos=nuevos)
+            except TorneoError as e:
+                messagebox.showerror("Error", str(e))
             self.load_phase(self.current_phase)
         else:
             messagebox.showinfo("Info", "Ya estás en la última fase.")
@@ -1,10 +1,38 @@
 import tkinter as tk
 from tkinter import messagebox
-import pandas as pd
-from PIL import Image, ImageTk
-import os
+from flags import obtener_bandera
+from input_cache import cargar_cacheado
+from programacion import datos_final
+from registro import torneo_activo
+
+# rondas posibles, de la primera a la final (se usan las que aparezcan en el Excel)
+FASES = ["Treintaidosavos", "Dieciseisavos", "Octavos", "Cuartos", "Semifinal", "Final"]
+ANCHO_COLUMNA = 300
+ALTO_PARTIDO = 70  # alto reservado por partido de la primera ronda
+MARGEN_X, MARGEN_Y = 100, 100
+INTERVALO_REVISION = 2000  # ms entre revisiones de partidos.xlsx
+
+
+def leer_partidos_llave(path):
+    """{fase: [(EquipoA, EquipoB, GolesA, GolesB), ...]} desde partidos.xlsx."""
+    import pandas as pd
+    df = pd.read_excel(path)
+
+    def goles(g):
+        return "" if pd.isna(g) else str(int(g)) if float(g).is_integer() else str(g)
+
+    partidos = {}
+    for fase, a, b, ga, gb in zip(df["Fase"], df["EquipoA"], df["EquipoB"], df["GolesA"], df["GolesB"]):
+        partidos.setdefault(str(fase).strip().lower(), []).append((str(a), str(b), goles(ga), goles(gb)))
+    return partidos
+
 
 class EliminationBracketUI:
+    """
+    Llave dibujada una sola vez: cada partido tiene sus ítems del canvas etiquetados
+    (m<ronda>_<n>) y al cambiar un resultado sólo se reconfiguran los ítems que cambiaron.
+    La posición de cada partido se calcula para cualquier llave de 2^k equipos.
+    """
     def __init__(self, master):
         self.master = master
         self.master.title("Copa del Mundo Sub-20 | Llaves de Eliminación")
@@ -12,87 +40,157 @@ class EliminationBracketUI:
         self.master.geometry("1300x700")
 
         self.canvas = tk.Canvas(self.master, bg="#0e1621", highlightthickness=0)
+        scroll_y = tk.Scrollbar(self.master, orient="vertical", command=self.canvas.yview)
+        scroll_x = tk.Scrollbar(self.master, orient="horizontal", command=self.canvas.xview)
+        self.canvas.configure(yscrollcommand=scroll_y.set, xscrollcommand=scroll_x.set)
+        scroll_y.pack(side="right", fill="y")
+        scroll_x.pack(side="bottom", fill="x")
         self.canvas.pack(fill="both", expand=True)
 
-        self.images = []  # evitar que las banderas sean recolectadas por el GC
+        self.images = {}      # tag del ítem -> bandera mostrada (Tk necesita la referencia)
+        self.partidos = {}    # (ronda, n) -> (EquipoA, EquipoB, GolesA, GolesB) dibujado
+        self.fases = []
 
         self.load_data()
         self.draw_trophy()
+        self.master.after(INTERVALO_REVISION, self._revisar_cambios)
 
     # -----------------------------------------------------------------
     def load_data(self):
         """Lee los datos desde el Excel y construye las llaves."""
         try:
-            df = pd.read_excel("partidos.xlsx")
+            datos = cargar_cacheado("partidos.xlsx", leer_partidos_llave)
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo leer 'partidos.xlsx': {e}")
             return
 
-        fases = ["Octavos", "Cuartos", "Semifinal", "Final"]
-        x_positions = [150, 450, 750, 1050]
-        y_start = 120
-        y_spacing = 80
+        self.fases = self._rondas(datos)
+        if not self.fases:
+            return
+        # la primera ronda presente define el tamaño de la llave; las demás se dibujan al aparecer
+        primera = len(datos[self.fases[0].lower()])
+        self.alto_partido = ALTO_PARTIDO
+
+        for r, fase in enumerate(self.fases):
+            self.canvas.create_text(self.x_ronda(r) + 60, 50, text=fase, fill="white", font=("Arial", 12, "bold"))
+            for n, partido in enumerate(datos.get(fase.lower(), [])):
+                self.draw_match(r, n, partido)
 
-        for i, fase in enumerate(fases):
-            subset = df[df["Fase"].str.lower() == fase.lower()]
-            y = y_start
-            self.canvas.create_text(x_positions[i], 50, text=fase, fill="white", font=("Arial", 12, "bold"))
+        self.canvas.configure(scrollregion=(0, 0, self.x_ronda(len(self.fases)) + 300,
+                                            MARGEN_Y * 2 + primera * self.alto_partido))
 
-            for _, row in subset.iterrows():
-                self.draw_match(x_positions[i], y, row)
-                y += y_spacing * 2
+    @staticmethod
+    def _rondas(datos):
+        """Rondas de la llave: desde la primera que aparece en el Excel hasta la final."""
+        presentes = [i for i, f in enumerate(FASES) if f.lower() in datos]
+        return FASES[presentes[0]:] if presentes else []
 
     # -----------------------------------------------------------------
-    def draw_match(self, x, y, row):
-        """Dibuja un partido con banderas, nombres y marcador."""
-        eq1, eq2 = row["EquipoA"], row["EquipoB"]
-        g1, g2 = row["GolesA"], row["GolesB"]
-
-        # Cargar banderas
-        bandera1 = self.load_flag(eq1)
-        bandera2 = self.load_flag(eq2)
-
-        if bandera1:
-            self.canvas.create_image(x - 70, y, image=bandera1)
-            self.images.append(bandera1)
-        if bandera2:
-            self.canvas.create_image(x - 70, y + 40, image=bandera2)
-            self.images.append(bandera2)
+    def x_ronda(self, r):
+        return MARGEN_X + r * ANCHO_COLUMNA
+
+    def y_partido(self, r, n):
+        """Centro vertical del partido n de la ronda r: a mitad de los dos partidos que lo alimentan."""
+        return MARGEN_Y + (n + 0.5) * (2 ** r) * self.alto_partido
+
+    def draw_match(self, r, n, partido):
+        """Dibuja un partido con banderas, nombres y marcador, con ítems etiquetados para actualizarlo."""
+        eq1, eq2, g1, g2 = partido
+        x, y = self.x_ronda(r), self.y_partido(r, n) - 20
+        tag = f"m{r}_{n}"
+
+        # Banderas (el ítem existe aunque no haya imagen, para poder cambiarla después)
+        for eq, dy, lado in ((eq1, 0, "f1"), (eq2, 40, "f2")):
+            self.canvas.create_image(x - 70, y + dy, tags=(tag, f"{tag}_{lado}"))
+            self._poner_bandera(f"{tag}_{lado}", eq)
 
         # Nombres
-        self.canvas.create_text(x, y, text=eq1, fill="white", anchor="w", font=("Arial", 10, "bold"))
-        self.canvas.create_text(x, y + 40, text=eq2, fill="white", anchor="w", font=("Arial", 10, "bold"))
+        self.canvas.create_text(x, y, text=eq1, fill="white", anchor="w", font=("Arial", 10, "bold"),
+                                tags=(tag, f"{tag}_e1"))
+        self.canvas.create_text(x, y + 40, text=eq2, fill="white", anchor="w", font=("Arial", 10, "bold"),
+                                tags=(tag, f"{tag}_e2"))
 
         # Marcadores
-        self.canvas.create_rectangle(x + 150, y - 10, x + 190, y + 10, fill="#007bff", outline="")
-        self.canvas.create_rectangle(x + 150, y + 30, x + 190, y + 50, fill="#007bff", outline="")
-        self.canvas.create_text(x + 170, y, text=str(g1), fill="white", font=("Arial", 10, "bold"))
-        self.canvas.create_text(x + 170, y + 40, text=str(g2), fill="white", font=("Arial", 10, "bold"))
-
-        # Línea de conexión
-        self.canvas.create_line(x + 190, y + 20, x + 220, y + 20, fill="white", width=1)
+        self.canvas.create_rectangle(x + 150, y - 10, x + 190, y + 10, fill="#007bff", outline="", tags=(tag,))
+        self.canvas.create_rectangle(x + 150, y + 30, x + 190, y + 50, fill="#007bff", outline="", tags=(tag,))
+        self.canvas.create_text(x + 170, y, text=g1, fill="white", font=("Arial", 10, "bold"), tags=(tag, f"{tag}_g1"))
+        self.canvas.create_text(x + 170, y + 40, text=g2, fill="white", font=("Arial", 10, "bold"),
+                                tags=(tag, f"{tag}_g2"))
+
+        # Línea de conexión hasta el partido de la ronda siguiente
+        if r + 1 < len(self.fases):
+            x_sig, y_sig = self.x_ronda(r + 1) - 90, self.y_partido(r + 1, n // 2)
+            self.canvas.create_line(x + 190, y + 20, x_sig, y + 20, x_sig, y_sig, fill="white", width=1, tags=(tag,))
+
+        self.partidos[(r, n)] = partido
+
+    def update_match(self, r, n, partido):
+        """Cambia sólo los ítems del partido cuyo valor cambió."""
+        anterior = self.partidos.get((r, n))
+        if anterior is None:
+            self.draw_match(r, n, partido)
+            return
+        tag = f"m{r}_{n}"
+        for valor, viejo, parte in zip(partido, anterior, ("e1", "e2", "g1", "g2")):
+            if valor != viejo:
+                self.canvas.itemconfigure(f"{tag}_{parte}", text=valor)
+        if partido[0] != anterior[0]:
+            self._poner_bandera(f"{tag}_f1", partido[0])
+        if partido[1] != anterior[1]:
+            self._poner_bandera(f"{tag}_f2", partido[1])
+        self.partidos[(r, n)] = partido
+
+    def _poner_bandera(self, tag, pais):
+        bandera = self.load_flag(pais)
+        self.canvas.itemconfigure(tag, image=bandera or "")
+        if bandera:
+            self.images[tag] = bandera
+        else:
+            self.images.pop(tag, None)
+
+    def _revisar_cambios(self):
+        """Si partidos.xlsx cambió, actualiza sólo los partidos distintos a los dibujados."""
+        if not self.canvas.winfo_exists():
+            return
+        try:
+            datos = cargar_cacheado("partidos.xlsx", leer_partidos_llave)
+        except Exception:
+            datos = None
+        if datos is not None:
+            if self._rondas(datos) != self.fases:
+                # cambió el tamaño de la llave: se vuelve a armar entera
+                self.canvas.delete("all")
+                self.images.clear()
+                self.partidos.clear()
+                self.load_data()
+                self.draw_trophy()
+            else:
+                for r, fase in enumerate(self.fases):
+                    for n, partido in enumerate(datos.get(fase.lower(), [])):
+                        if self.partidos.get((r, n)) != partido:
+                            self.update_match(r, n, partido)
+        self.master.after(INTERVALO_REVISION, self._revisar_cambios)
 
     # -----------------------------------------------------------------
     def draw_trophy(self):
-        """Dibuja el trofeo y los datos del partido final en el centro."""
-        trophy_path = os.path.join("banderas", "trophy.png")
-        if os.path.exists(trophy_path):
-            trophy_img = Image.open(trophy_path).resize((80, 100))
-            trophy = ImageTk.PhotoImage(trophy_img)
-            self.canvas.create_image(650, 330, image=trophy)
-            self.images.append(trophy)
-
-        self.canvas.create_text(650, 450, text="Final - Estadio Nacional Julio Martínez Prádanos\n08/10/2025 - 16:30",
-                                fill="white", font=("Arial", 12, "bold"), justify="center")
+        """Dibuja el trofeo y los datos del partido final a la derecha de la final."""
+        r = max(0, len(self.fases) - 1)
+        x = self.x_ronda(r) + ANCHO_COLUMNA + 50
+        y = self.y_partido(r, 0) if self.fases else 330
+        trophy = obtener_bandera("trophy", (80, 100))
+        if trophy:
+            self.canvas.create_image(x, y, image=trophy, tags=("trofeo",))
+            self.images["trofeo"] = trophy
+
+        final = datos_final(torneo_activo())
+        if final:
+            fecha, hora, sede = final
+            dia = "/".join(reversed(fecha.split("-")))
+            lugar = f"Final - {sede}" if sede else "Final"
+            self.canvas.create_text(x, y + 120, text=f"{lugar}\n{dia} - {hora}",
+                                    fill="white", font=("Arial", 12, "bold"), justify="center", tags=("trofeo",))
 
     # -----------------------------------------------------------------
     def load_flag(self, country_name):
-        """Carga la bandera si existe, redimensionada a 40x25 px."""
-        path = os.path.join("banderas", f"{country_name}.png")
-        if not os.path.exists(path):
-            return None
-        try:
-            img = Image.open(path).resize((40, 25))
-            return ImageTk.PhotoImage(img)
-        except Exception:
-            return None
+        """Bandera de 40x25 px desde la caché compartida (None si no existe)."""
+        return obtener_bandera(country_name, (40, 25))
@@ -0,0 +1,97 @@
+# fixture.py
+from string import ascii_uppercase
+
+COLUMNAS_FIXTURE = ("Grupo", "Jornada", "Equipo1", "Equipo2")
+
+
+def nombres_grupos(cantidad):
+    """'A', 'B', ..., 'Z', 'AA', 'AB', ... (como las columnas de Excel)."""
+    nombres = []
+    for n in range(1, cantidad + 1):
+        nombre = ""
+        while n:
+            n, resto = divmod(n - 1, 26)
+            nombre = ascii_uppercase[resto] + nombre
+        nombres.append(nombre)
+    return nombres
+
+
+def round_robin(equipos, ida_y_vuelta=False):
+    """
+    Genera (jornada, local, visitante) con el método del círculo: un equipo queda fijo
+    y los demás rotan una posición por jornada; en cada jornada se enfrentan las
+    posiciones opuestas. Con cantidad impar se agrega un hueco (el fijo) y quien le
+    toca descansa. Localía: el fijo alterna jornada a jornada y en los otros cruces
+    es local el de la primera mitad, así cada equipo juega la mitad de sus partidos
+    de local (±1). Con ida_y_vuelta la segunda rueda repite la primera invertida.
+    """
+    equipos = list(equipos)
+    if len(equipos) < 2:
+        return
+    if len(equipos) % 2:
+        equipos.insert(0, None)
+    n = len(equipos)
+    # primera jornada: 1 vs 2, 3 vs 4, ... (se enfrentan las posiciones i y n-1-i)
+    ronda = equipos[0::2] + equipos[1::2][::-1]
+    jornadas = n - 1
+    for vuelta in range(2 if ida_y_vuelta else 1):
+        ronda_actual = list(ronda)
+        for r in range(jornadas):
+            for i in range(n // 2):
+                local, visitante = ronda_actual[i], ronda_actual[n - 1 - i]
+                if local is None or visitante is None:
+                    continue
+                if i == 0 and r % 2:
+                    local, visitante = visitante, local
+                if vuelta:
+                    local, visitante = visitante, local
+                yield vuelta * jornadas + r + 1, local, visitante
+            ronda_actual = ronda_actual[:1] + ronda_actual[2:] + ronda_actual[1:2]
+
+
+def generar_fixture(grupos, ida_y_vuelta=False):
+    """
+    Partidos de la fase de grupos ({'Grupo', 'Jornada', 'Equipo1', 'Equipo2'}, el mismo
+    formato que FIFA_Sub20_2025_FaseGrupos_Partidos.xlsx), grupo por grupo y jornada
+    por jornada. grupos es {nombre: [equipos en orden de bolillero]}; es un generador,
+    así que sirve igual para cientos de grupos sin armar listas intermedias.
+    """
+    for g, equipos in grupos.items():
+        for jornada, local, visitante in round_robin(equipos, ida_y_vuelta):
+            yield {'Grupo': g, 'Jornada': jornada, 'Equipo1': local, 'Equipo2': visitante}
+
+
+def exportar_fixture(filas, path):
+    """Escribe los partidos en un .xlsx fila por fila (openpyxl en modo sólo escritura)."""
+    from openpyxl import Workbook
+    libro = Workbook(write_only=True)
+    hoja = libro.create_sheet()
+    hoja.append(COLUMNAS_FIXTURE)
+    for fila in filas:
+        hoja.append([fila[c] for c in COLUMNAS_FIXTURE])
+    libro.save(path)
+
+
+def cargar_en_torneo(torneo, grupos, ida_y_vuelta=False, confederaciones=None):
+    """
+    Agrega al torneo los equipos (id = grupo + posición, como en PhaseGroupsUI) y los
+    partidos del fixture que todavía no estén. confederaciones es {país: confederación}.
+    Devuelve los match_id creados.
+    """
+    from core import Equipo, Partido
+    confederaciones = confederaciones or {}
+    ids = {}
+    for g, equipos in grupos.items():
+        for pos, pais in enumerate(equipos, start=1):
+            ident = ids[(g, pais)] = f"{g}{pos}"
+            actual = torneo.equipos.get(ident)
+            if not actual or (actual.pais, actual.grupo) != (pais, g):
+                torneo.agregar_equipo(Equipo(ident, pais, abreviatura=pais[:3].upper(),
+                                             confederacion=confederaciones.get(pais) or '', grupo=g))
+    nuevos = []
+    for fila in generar_fixture(grupos, ida_y_vuelta):
+        g = fila['Grupo']
+        id1, id2 = ids[(g, fila['Equipo1'])], ids[(g, fila['Equipo2'])]
+        if not torneo.buscar_partido(id1, id2):
+            nuevos.append(torneo.agregar_partido(Partido(id1, id2, fase="Fase de Grupos")))
+    return nuevos
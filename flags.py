@@ -0,0 +1,75 @@
+# flags.py
+import os
+from collections import OrderedDict
+from utils import normalize_name
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# carpetas donde pueden estar las banderas (las pantallas usaban convenciones distintas)
+CARPETAS_BANDERAS = [
+    os.path.join(os.path.dirname(BASE_DIR), "banderas"),
+    os.path.join(BASE_DIR, "banderas"),
+    "banderas",
+]
+MEMORIA_MAXIMA = 8 * 1024 * 1024  # bytes de imágenes decodificadas (RGBA)
+
+
+class CacheBanderas:
+    """
+    Banderas ya decodificadas y redimensionadas, compartidas por todas las pantallas.
+    Clave: (país normalizado, (ancho, alto)). Se descartan las menos usadas cuando
+    se pasa de memoria_maxima.
+    Tk borra la imagen cuando nadie la referencia: quien la muestra en un widget
+    tiene que guardar su propia referencia mientras la use.
+    """
+    def __init__(self, memoria_maxima=MEMORIA_MAXIMA):
+        self.memoria_maxima = memoria_maxima
+        self.memoria = 0
+        self._imagenes = OrderedDict()  # clave -> (PhotoImage, bytes)
+        self._rutas = {}                # país normalizado -> ruta o None
+
+    def _buscar_archivo(self, pais):
+        clave = normalize_name(pais)
+        if clave not in self._rutas:
+            self._rutas[clave] = None
+            for carpeta in CARPETAS_BANDERAS:
+                for nombre in (clave, pais):
+                    ruta = os.path.join(carpeta, nombre + ".png")
+                    if os.path.exists(ruta):
+                        self._rutas[clave] = ruta
+                        break
+                if self._rutas[clave]:
+                    break
+        return self._rutas[clave]
+
+    def obtener(self, pais, tamano):
+        """Devuelve un PhotoImage de la bandera con ese tamaño (o None si no hay archivo)."""
+        if not pais:
+            return None
+        clave = (normalize_name(pais), tuple(tamano))
+        if clave in self._imagenes:
+            self._imagenes.move_to_end(clave)
+            return self._imagenes[clave][0]
+        ruta = self._buscar_archivo(pais)
+        if not ruta:
+            return None
+        try:
+            from PIL import Image, ImageTk
+            img = Image.open(ruta).convert("RGBA").resize(clave[1])
+            foto = ImageTk.PhotoImage(img)
+        except Exception:
+            return None
+        costo = clave[1][0] * clave[1][1] * 4
+        self._imagenes[clave] = (foto, costo)
+        self.memoria += costo
+        while self.memoria > self.memoria_maxima and len(self._imagenes) > 1:
+            _, (_, liberado) = self._imagenes.popitem(last=False)
+            self.memoria -= liberado
+        return foto
+
+
+# instancia única para todo el proceso
+banderas = CacheBanderas()
+
+
+def obtener_bandera(pais, tamano):
+    return banderas.obtener(pais, tamano)
@@ -4,7 +4,12 @@ from tkinter import ttk, messagebox
 import pandas as pd
 import os
 from utils import apply_style, center_fullscreen
-from core import Torneo
+from registro import torneo_activo
+from tabla_virtual import TablaVirtual
+from persistencia import trabajador
+from agregados import (agregados_de, COLUMNAS_POSICIONES, COLUMNAS_RESULTADOS, COLUMNAS_GOLEADORES,
+                       COLUMNAS_CONFEDERACIONES, COLUMNAS_TARJETAS)
+from jugadores import estadisticas_de, COLUMNAS_BOTA_DE_ORO, COLUMNAS_DISCIPLINA
 
 class InformesUI:
     def __init__(self, master):
@@ -13,7 +18,11 @@ class InformesUI:
         apply_style(self.master)
         center_fullscreen(self.master)
 
-        self.torneo = Torneo()
+        self.torneo = torneo_activo()
+        # los números de cada informe se mantienen al registrar resultados (ver agregados.py)
+        self.agregados = agregados_de(self.torneo)
+        self.jugadores = estadisticas_de(self.torneo)
+        self.master.protocol("WM_DELETE_WINDOW", self.volver_menu)
 
         self._build_ui()
 
@@ -42,25 +51,21 @@ class InformesUI:
                    command=self.informe_confederaciones).pack(pady=6)
         ttk.Button(body, text="5️⃣ Equipos con más tarjetas", width=35,
                    command=self.informe_tarjetas).pack(pady=6)
+        ttk.Button(body, text="6️⃣ Bota de Oro (jugadores)", width=35,
+                   command=self.informe_bota_de_oro).pack(pady=6)
+        ttk.Button(body, text="7️⃣ Disciplina de jugadores", width=35,
+                   command=self.informe_disciplina).pack(pady=6)
 
     # ============================ INFORMES ============================
     def informe_posiciones(self):
         """Muestra la tabla general de posiciones de todos los grupos."""
         try:
-            data = []
-            for g in sorted(self.torneo.grupos):
-                tabla = self.torneo.calcular_tabla_posiciones(g)
-                for i, e in enumerate(tabla, start=1):
-                    data.append([
-                        g, i, e.pais, e.stats['PJ'], e.stats['G'], e.stats['E'], e.stats['P'],
-                        e.stats['GF'], e.stats['GC'], e.stats['DG'], e.stats['Pts']
-                    ])
-
+            data = self.agregados.posiciones()
             if not data:
                 messagebox.showinfo("Sin datos", "No hay datos cargados aún.")
                 return
 
-            df = pd.DataFrame(data, columns=["Grupo", "Pos", "Equipo", "PJ", "G", "E", "P", "GF", "GC", "DG", "Pts"])
+            df = pd.DataFrame(data, columns=COLUMNAS_POSICIONES)
             self._mostrar_tabla(df, "Tabla General de Posiciones")
 
         except Exception as e:
@@ -68,58 +73,48 @@ class InformesUI:
 
     def informe_resultados_grupos(self):
         """Muestra los resultados registrados de la fase de grupos."""
-        data = []
-        for p in self.torneo.calendario.values():
-            if p.fase != "Fase de Grupos":
-                continue
-            e1 = self.torneo.equipos.get(p.id_equipo1)
-            e2 = self.torneo.equipos.get(p.id_equipo2)
-            if not e1 or not e2:
-                continue
-            res = f"{p.goles_e1} - {p.goles_e2}" if p.goles_e1 is not None else "Pendiente"
-            data.append([e1.grupo, e1.pais, e2.pais, res])
-
+        data = self.agregados.resultados_grupos()
         if not data:
             messagebox.showinfo("Sin datos", "No se registraron resultados aún.")
             return
 
-        df = pd.DataFrame(data, columns=["Grupo", "Equipo 1", "Equipo 2", "Resultado"])
+        df = pd.DataFrame(data, columns=COLUMNAS_RESULTADOS)
         self._mostrar_tabla(df, "Resultados de la Fase de Grupos")
 
     def informe_goleadores(self):
         """Muestra los equipos con más goles a favor."""
-        data = []
-        for e in self.torneo.equipos.values():
-            data.append([e.pais, e.stats['GF'], e.stats['Pts']])
-        df = pd.DataFrame(data, columns=["Equipo", "Goles a favor", "Puntos"]).sort_values(by="Goles a favor", ascending=False)
+        df = pd.DataFrame(self.agregados.goleadores(), columns=COLUMNAS_GOLEADORES)
         self._mostrar_tabla(df, "Equipos con más goles")
 
     def informe_confederaciones(self):
         """Ejemplo: rendimiento por confederación (si existe en datos)."""
-        conf_data = {}
-        for e in self.torneo.equipos.values():
-            conf = e.confederacion or "Desconocida"
-            conf_data.setdefault(conf, {"PJ": 0, "G": 0, "E": 0, "P": 0, "Pts": 0})
-            conf_data[conf]["PJ"] += e.stats["PJ"]
-            conf_data[conf]["G"] += e.stats["G"]
-            conf_data[conf]["E"] += e.stats["E"]
-            conf_data[conf]["P"] += e.stats["P"]
-            conf_data[conf]["Pts"] += e.stats["Pts"]
-
-        rows = [[c, v["PJ"], v["G"], v["E"], v["P"], v["Pts"]] for c, v in conf_data.items()]
-        df = pd.DataFrame(rows, columns=["Confederación", "PJ", "G", "E", "P", "Pts"])
+        df = pd.DataFrame(self.agregados.confederaciones(), columns=COLUMNAS_CONFEDERACIONES)
         self._mostrar_tabla(df, "Rendimiento por Confederación")
 
     def informe_tarjetas(self):
-        """Ejemplo: equipos con más tarjetas (si se cargan en core.Partido)."""
-        data = []
-        for e in self.torneo.equipos.values():
-            ta = e.stats.get("TA", 0)
-            tr = e.stats.get("TR", 0)
-            data.append([e.pais, ta, tr])
-        df = pd.DataFrame(data, columns=["Equipo", "Tarj. Amarillas", "Tarj. Rojas"])
+        """Equipos ordenados por tarjetas recibidas (rojas como desempate)."""
+        df = pd.DataFrame(self.agregados.tarjetas(), columns=COLUMNAS_TARJETAS)
         self._mostrar_tabla(df, "Equipos con más tarjetas")
 
+    def informe_bota_de_oro(self):
+        """Máximos goleadores individuales (desempate: asistencias, después menos minutos)."""
+        data = self.jugadores.bota_de_oro(20)
+        if not data:
+            messagebox.showinfo("Sin datos", "No se cargaron estadísticas de jugadores aún.")
+            return
+        df = pd.DataFrame(data, columns=COLUMNAS_BOTA_DE_ORO)
+        df.insert(0, "Pos", range(1, len(df) + 1))
+        self._mostrar_tabla(df, "Bota de Oro")
+
+    def informe_disciplina(self):
+        """Jugadores amonestados o expulsados, del peor puntaje de juego limpio al mejor."""
+        data = self.jugadores.disciplina()
+        if not data:
+            messagebox.showinfo("Sin datos", "Ningún jugador recibió tarjetas aún.")
+            return
+        df = pd.DataFrame(data, columns=COLUMNAS_DISCIPLINA)
+        self._mostrar_tabla(df, "Disciplina de jugadores")
+
     # ============================ UTILIDAD ============================
     def _mostrar_tabla(self, df, titulo):
         """Muestra un DataFrame en una ventana."""
@@ -132,18 +127,10 @@ class InformesUI:
         frm = ttk.Frame(win, padding=8)
         frm.pack(fill='both', expand=True)
 
-        cols = list(df.columns)
-        tree = ttk.Treeview(frm, columns=cols, show='headings')
-        for c in cols:
-            tree.heading(c, text=c)
-            tree.column(c, anchor='center')
-        for _, row in df.iterrows():
-            tree.insert('', tk.END, values=list(row))
-        tree.pack(fill='both', expand=True)
-
-        scrollbar = ttk.Scrollbar(frm, orient='vertical', command=tree.yview)
-        tree.configure(yscrollcommand=scrollbar.set)
-        scrollbar.pack(side='right', fill='y')
+        # sólo se crean las filas visibles: sirve igual para informes con miles de filas
+        tabla = TablaVirtual(frm, list(df.columns))
+        tabla.pack(fill='both', expand=True)
+        tabla.cargar(enumerate(df.itertuples(index=False, name=None)))
 
     # ============================ VOLVER AL MENÚ ============================
     def volver_menu(self):
@@ -152,4 +139,5 @@ class InformesUI:
             self.torneo.guardar_datos()
         except Exception:
             pass
+        trabajador.esperar()  # no cerrar con escrituras pendientes
         self.master.destroy()
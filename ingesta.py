@@ -0,0 +1,104 @@
+# ingesta.py
+import os
+import csv
+import json
+import unicodedata
+
+# nombres de columna aceptados (sin tildes, en minúscula) -> clave de Torneo.registrar_resultados
+ALIAS_COLUMNAS = {
+    'match_id': 'match_id', 'id': 'match_id', 'partido': 'match_id',
+    'equipo1': 'equipo1', 'local': 'equipo1',
+    'equipo2': 'equipo2', 'visitante': 'equipo2',
+    'fase': 'fase',
+    'goles_e1': 'goles_e1', 'g1': 'goles_e1', 'goles1': 'goles_e1',
+    'goles_e2': 'goles_e2', 'g2': 'goles_e2', 'goles2': 'goles_e2',
+    'ta1': 'ta1', 'tarj_ama_e1': 'ta1',
+    'ta2': 'ta2', 'tarj_ama_e2': 'ta2',
+    'tr1': 'tr1', 'tarj_roja_e1': 'tr1',
+    'tr2': 'tr2', 'tarj_roja_e2': 'tr2',
+}
+
+# lo mismo para estadísticas de jugadores (una fila por jugador y partido) -> Torneo.registrar_jugadores
+ALIAS_JUGADORES = {
+    'match_id': 'match_id', 'id': 'match_id', 'partido': 'match_id',
+    'jugador': 'jugador', 'nombre': 'jugador',
+    'equipo': 'equipo', 'seleccion': 'equipo', 'pais': 'equipo',
+    'goles': 'goles', 'asistencias': 'asistencias',
+    'amarillas': 'amarillas', 'ta': 'amarillas', 'rojas': 'rojas', 'tr': 'rojas',
+    'minutos': 'minutos', 'min': 'minutos',
+}
+
+
+def _clave(columna, alias=ALIAS_COLUMNAS):
+    columna = ''.join(c for c in unicodedata.normalize('NFD', str(columna)) if unicodedata.category(c) != 'Mn')
+    return alias.get(columna.strip().lower().replace(' ', '_'))
+
+
+def normalizar_fila(fila, alias=ALIAS_COLUMNAS):
+    """Deja sólo las columnas conocidas, con la clave que espera registrar_resultados."""
+    normal = {}
+    for columna, valor in fila.items():
+        clave = _clave(columna, alias)
+        if clave is None or valor is None:
+            continue
+        if isinstance(valor, float):
+            if valor != valor:  # NaN de pandas
+                continue
+            if valor.is_integer():
+                valor = int(valor)
+        if isinstance(valor, str):
+            valor = valor.strip()
+            if not valor:
+                continue
+        normal[clave] = valor
+    return normal
+
+
+def leer_resultados(ruta):
+    """Lee resultados de un .csv, .json o .xlsx y devuelve una lista de dicts normalizados."""
+    return [normalizar_fila(f) for f in _leer_filas(ruta, 'resultados')]
+
+
+def _leer_filas(ruta, clave_json):
+    ext = os.path.splitext(ruta)[1].lower()
+    if ext == '.json':
+        with open(ruta, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        filas = data.get(clave_json, []) if isinstance(data, dict) else data
+    elif ext == '.csv':
+        with open(ruta, 'r', encoding='utf-8-sig', newline='') as f:
+            muestra = f.read(2048)
+            f.seek(0)
+            dialecto = csv.Sniffer().sniff(muestra, delimiters=',;\t')
+            filas = list(csv.DictReader(f, dialect=dialecto))
+    elif ext in ('.xlsx', '.xls'):
+        import pandas as pd  # sólo se paga al leer Excel
+        filas = pd.read_excel(ruta).to_dict('records')
+    else:
+        raise ValueError(f"Formato no soportado: {ext}")
+    return filas
+
+
+def importar_resultados(torneo, ruta, simulacion=False):
+    """Lee el archivo y lo registra en el torneo con una sola escritura (ver Torneo.registrar_resultados)."""
+    return torneo.registrar_resultados(leer_resultados(ruta), simulacion=simulacion)
+
+
+def leer_jugadores(ruta):
+    """Lee estadísticas de jugadores y las agrupa por partido: {match_id: [filas]}."""
+    por_partido = {}
+    for n, fila in enumerate(_leer_filas(ruta, 'jugadores'), start=1):
+        fila = normalizar_fila(fila, ALIAS_JUGADORES)
+        match_id = fila.pop('match_id', None)
+        if match_id is None:
+            raise ValueError(f"Fila {n}: falta la columna del partido (match_id).")
+        por_partido.setdefault(str(match_id), []).append(fila)
+    return por_partido
+
+
+def importar_jugadores(torneo, ruta):
+    """Registra las estadísticas de jugadores del archivo, un partido a la vez. Devuelve los partidos cargados."""
+    por_partido = leer_jugadores(ruta)
+    for match_id, filas in por_partido.items():
+        torneo.registrar_jugadores(match_id, filas)
+    return list(por_partido)
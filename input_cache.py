@@ -0,0 +1,55 @@
+# input_cache.py
+import os
+import pickle
+import hashlib
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(SCRIPT_DIR, '.cache_entradas')
+VERSION = 1  # subir si cambia el formato de lo que devuelven los parsers
+
+# copia en memoria de lo ya leído en este proceso: (ruta, parser) -> (firma, datos)
+_memoria = {}
+
+
+def _firma(ruta):
+    st = os.stat(ruta)
+    return (st.st_mtime_ns, st.st_size, VERSION)
+
+
+def cargar_cacheado(ruta, parser):
+    """
+    Devuelve parser(ruta), pero sólo lo ejecuta si el archivo cambió (fecha o tamaño)
+    desde la última vez. El resultado ya procesado se guarda en memoria y en
+    CACHE_DIR (pickle), así reabrir una pantalla no vuelve a parsear el Excel.
+    Los datos devueltos se comparten: no modificarlos.
+    """
+    ruta = os.path.abspath(ruta)
+    firma = _firma(ruta)
+    nombre_parser = f"{parser.__module__}.{parser.__qualname__}"
+    clave = (ruta, nombre_parser)
+
+    guardado = _memoria.get(clave)
+    if guardado and guardado[0] == firma:
+        return guardado[1]
+
+    archivo = os.path.join(CACHE_DIR, hashlib.sha1(f"{ruta}|{nombre_parser}".encode('utf-8')).hexdigest() + '.pickle')
+    try:
+        with open(archivo, 'rb') as f:
+            firma_guardada, datos = pickle.load(f)
+        if firma_guardada == firma:
+            _memoria[clave] = (firma, datos)
+            return datos
+    except (OSError, EOFError, ValueError, pickle.UnpicklingError, AttributeError, ImportError):
+        pass
+
+    datos = parser(ruta)
+    _memoria[clave] = (firma, datos)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = archivo + '.tmp'
+        with open(tmp, 'wb') as f:
+            pickle.dump((firma, datos), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, archivo)
+    except OSError:
+        pass  # sin caché en disco se sigue funcionando igual
+    return datos
@@ -0,0 +1,160 @@
+# jugadores.py
+import bisect
+import numpy as np
+from desempate import PUNTOS_AMARILLA, PUNTOS_ROJA
+
+# lo que se anota de cada jugador en cada partido (Partido.jugador_stats guarda dicts con
+# 'jugador', 'equipo' y estos campos); una columna de la tabla por campo
+CAMPOS_JUGADOR = ('goles', 'asistencias', 'amarillas', 'rojas', 'minutos')
+_POS = {c: i for i, c in enumerate(CAMPOS_JUGADOR)}
+
+COLUMNAS_BOTA_DE_ORO = ["Jugador", "Equipo", "Goles", "Asistencias", "Minutos"]
+COLUMNAS_DISCIPLINA = ["Jugador", "Equipo", "Amarillas", "Rojas", "Puntos fair play"]
+
+
+class EstadisticasJugadores:
+    """
+    Acumulados por jugador en columnas NumPy (campo x ordinal de jugador), armados a
+    partir de Partido.jugador_stats. Se suscribe con Torneo.escuchar: cuando cambian
+    las filas de un partido se resta lo que ese partido había sumado y se suma lo nuevo,
+    sin recorrer los demás partidos. Mantiene ordenados los índices de goleadores
+    (Bota de Oro: goles, asistencias, menos minutos) y de tarjetas, y los totales por equipo.
+    """
+    def __init__(self, torneo, capacidad=256):
+        self.torneo = torneo
+        self.capacidad = capacidad
+        self.version = 0
+        self._reconstruir()
+        torneo.escuchar(self._al_cambiar)
+
+    def cerrar(self):
+        """Deja de seguir los cambios del torneo (ver Torneo.soltar_derivados)."""
+        self.torneo.dejar_de_escuchar(self._al_cambiar)
+
+    # ============================ MANTENIMIENTO ============================
+    def _reconstruir(self):
+        self.valores = np.zeros((len(CAMPOS_JUGADOR), self.capacidad), dtype=np.int32)
+        self.apariciones = np.zeros(self.capacidad, dtype=np.int32)  # partidos con fila del jugador
+        self.jugadores = []        # ordinal -> (id equipo, nombre)
+        self._ordinal = {}         # (id equipo, nombre) -> ordinal
+        self._por_partido = {}     # match_id -> (ordinales, matriz de lo que sumó)
+        self._por_equipo = {}      # id equipo -> [ordinales]
+        self._totales_equipo = {}  # id equipo -> array con la suma de sus jugadores
+        self._goleadores = []      # [(-goles, -asistencias, minutos, equipo, nombre, ordinal)] ordenado
+        self._tarjetas = []        # [(fair play, -rojas, -amarillas, equipo, nombre, ordinal)] ordenado
+        for mid in self.torneo.calendario:
+            self._actualizar_partido(mid)
+        self.version += 1
+
+    def _al_cambiar(self, partidos, equipos):
+        if partidos is None and equipos is None:
+            self._reconstruir()
+            return
+        if partidos:
+            for mid in partidos:
+                self._actualizar_partido(mid)
+            self.version += 1
+
+    def _jugador(self, equipo, nombre):
+        clave = (equipo, nombre)
+        ordinal = self._ordinal.get(clave)
+        if ordinal is None:
+            ordinal = self._ordinal[clave] = len(self.jugadores)
+            self.jugadores.append(clave)
+            if ordinal >= self.valores.shape[1]:
+                nuevos = np.zeros((len(CAMPOS_JUGADOR), self.valores.shape[1] * 2), dtype=np.int32)
+                nuevos[:, :ordinal] = self.valores[:, :ordinal]
+                self.valores = nuevos
+                self.apariciones = np.concatenate([self.apariciones, np.zeros_like(self.apariciones)])
+            self._por_equipo.setdefault(equipo, []).append(ordinal)
+            self._totales_equipo.setdefault(equipo, np.zeros(len(CAMPOS_JUGADOR), dtype=np.int64))
+            self._indexar(ordinal)
+        return ordinal
+
+    def _claves(self, ordinal):
+        v = self.valores[:, ordinal]
+        g, a, ta, tr, m = (int(x) for x in v)
+        equipo, nombre = self.jugadores[ordinal]  # a igualdad, orden alfabético estable
+        return ((-g, -a, m, equipo, nombre, ordinal),
+                (PUNTOS_AMARILLA * ta + PUNTOS_ROJA * tr, -tr, -ta, equipo, nombre, ordinal))
+
+    def _indexar(self, ordinal):
+        goles, tarjetas = self._claves(ordinal)
+        bisect.insort(self._goleadores, goles)
+        bisect.insort(self._tarjetas, tarjetas)
+
+    def _desindexar(self, ordinal):
+        for lista, clave in zip((self._goleadores, self._tarjetas), self._claves(ordinal)):
+            i = bisect.bisect_left(lista, clave)
+            if i < len(lista) and lista[i] == clave:
+                del lista[i]
+
+    def _sumar(self, ordinales, filas, signo):
+        for ordinal in set(ordinales.tolist()):
+            self._desindexar(ordinal)
+        np.add.at(self.valores.T, ordinales, signo * filas)
+        self.apariciones[ordinales] += signo  # un jugador aparece una sola vez por partido
+        for ordinal, fila in zip(ordinales.tolist(), filas):
+            self._totales_equipo[self.jugadores[ordinal][0]] += signo * fila
+        for ordinal in set(ordinales.tolist()):
+            self._indexar(ordinal)
+
+    def _actualizar_partido(self, mid):
+        anterior = self._por_partido.pop(mid, None)
+        if anterior is not None:
+            self._sumar(*anterior, -1)
+        p = self.torneo.calendario.get(mid)
+        if p is None or not p.jugador_stats:
+            return
+        ordinales = np.array([self._jugador(js['equipo'], js['jugador']) for js in p.jugador_stats], dtype=np.intp)
+        filas = np.array([[int(js.get(c, 0) or 0) for c in CAMPOS_JUGADOR] for js in p.jugador_stats], dtype=np.int32)
+        self._sumar(ordinales, filas, 1)
+        self._por_partido[mid] = (ordinales, filas)
+
+    # ============================ LECTURA ============================
+    def _fila(self, ordinal):
+        equipo, nombre = self.jugadores[ordinal]
+        e = self.torneo.equipos.get(equipo)
+        return nombre, e.pais if e else equipo, self.valores[:, ordinal]
+
+    def bota_de_oro(self, n=10):
+        """Los n máximos goleadores (a igualdad: más asistencias, después menos minutos)."""
+        filas = []
+        for *_, ordinal in self._goleadores[:n]:
+            nombre, pais, v = self._fila(ordinal)
+            if v[_POS['goles']] == 0:
+                break
+            filas.append([nombre, pais, int(v[_POS['goles']]), int(v[_POS['asistencias']]), int(v[_POS['minutos']])])
+        return filas
+
+    def disciplina(self, n=None):
+        """Jugadores con tarjetas, del peor puntaje de juego limpio al mejor."""
+        filas = []
+        for puntos, *_, ordinal in (self._tarjetas if n is None else self._tarjetas[:n]):
+            if puntos == 0:
+                break
+            nombre, pais, v = self._fila(ordinal)
+            filas.append([nombre, pais, int(v[_POS['amarillas']]), int(v[_POS['rojas']]), puntos])
+        return filas
+
+    def jugador(self, equipo, nombre):
+        """Acumulados de un jugador como dict (ceros si no jugó)."""
+        ordinal = self._ordinal.get((equipo, nombre))
+        if ordinal is None:
+            return dict.fromkeys(CAMPOS_JUGADOR, 0)
+        return dict(zip(CAMPOS_JUGADOR, map(int, self.valores[:, ordinal])))
+
+    def plantel(self, equipo):
+        """{jugador: acumulados} de los jugadores con al menos un partido en el equipo."""
+        return {self.jugadores[o][1]: dict(zip(CAMPOS_JUGADOR, map(int, self.valores[:, o])))
+                for o in self._por_equipo.get(equipo, ()) if self.apariciones[o]}
+
+    def totales_equipo(self, equipo):
+        """Suma de los jugadores de un equipo, por campo."""
+        totales = self._totales_equipo.get(equipo)
+        return dict(zip(CAMPOS_JUGADOR, map(int, totales))) if totales is not None else dict.fromkeys(CAMPOS_JUGADOR, 0)
+
+
+def estadisticas_de(torneo):
+    """Las estadísticas de jugadores del torneo (se arman una vez y después sólo se mantienen)."""
+    return torneo.derivado('jugadores', EstadisticasJugadores)
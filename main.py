@@ -1,13 +1,35 @@
+import time
+_INICIO = time.perf_counter()
+import sys
+import importlib
 import tkinter as tk
-from assigner import GroupAssigner
-from phase_groups import PhaseGroupsUI
-from elimination import EliminationUI
+from tkinter import messagebox
 from utils import apply_style, center_fullscreen
 from datetime import datetime
-from informes.informes import InformesUI
-from elimination_bracket import EliminationBracketUI
-import pandas as pd
 import os
+from persistencia import trabajador
+
+# Las pantallas (y pandas/PIL que usan) se importan recién al abrirlas.
+# Con `python main.py --medir-arranque` se informa cuánto tarda cada importación
+# y cuándo queda disponible el menú principal.
+MEDIR_ARRANQUE = "--medir-arranque" in sys.argv
+
+
+def _medicion(texto):
+    if MEDIR_ARRANQUE:
+        print(f"[arranque] {(time.perf_counter() - _INICIO) * 1000:8.1f} ms  {texto}")
+
+
+def cargar(modulo, nombre=None):
+    """Importa `modulo` (o `nombre` desde él) la primera vez que se necesita."""
+    ya_cargado = modulo in sys.modules
+    inicio = time.perf_counter()
+    mod = importlib.import_module(modulo)
+    if not ya_cargado:
+        _medicion(f"import {modulo} ({(time.perf_counter() - inicio) * 1000:.1f} ms)")
+    return getattr(mod, nombre) if nombre else mod
+
+_medicion("módulos base importados (tkinter, utils)")
 
 # ====================================================
 # 🟦 Encabezado institucional
@@ -44,6 +66,15 @@ def run_assigner_and_flow():
     root.configure(bg="#f0f0f0")
     crear_encabezado(root)
 
+    # 🔹 Guardados en segundo plano: errores al loop de Tk y nada pendiente al salir
+    trabajador.al_fallar = lambda e: messagebox.showerror("Error al guardar", str(e))
+    trabajador.vincular(root)
+
+    def cerrar():
+        trabajador.esperar()
+        root.destroy()
+    root.protocol("WM_DELETE_WINDOW", cerrar)
+
     menu = tk.Frame(root, bg="#003366", padx=10, pady=10)
     menu.pack(side="left", fill="y")
     tk.Label(menu, text="Menú Principal", bg="#003366", fg="white",
@@ -59,25 +90,52 @@ def run_assigner_and_flow():
     tk.Button(menu, text="Llaves", width=20,
               command=abrir_llaves).pack(pady=5)
 
+    # 🔹 Competición con la que trabajan las pantallas (ver registro.py / torneos.json)
+    crear_selector_torneo(menu)
+
+    if MEDIR_ARRANQUE:
+        _medicion("ventana principal construida")
+        pesados = [m for m in ("pandas", "numpy", "PIL", "openpyxl") if m in sys.modules]
+        root.after_idle(lambda: _medicion(f"menú interactivo (módulos pesados cargados: {pesados or 'ninguno'})"))
     root.mainloop()
 
+def crear_selector_torneo(menu):
+    registro = cargar("registro", "registro")
+    if len(registro.ids()) < 2:
+        return  # una sola competición: no hace falta elegir
+    tk.Label(menu, text="Competición", bg="#003366", fg="white",
+             font=("Arial", 11, "bold")).pack(pady=(20, 5))
+    elegido = tk.StringVar(value=registro.activo)
+
+    def cambiar(id):
+        try:
+            registro.activar(id)
+        except Exception as e:
+            elegido.set(registro.activo)
+            messagebox.showerror("Error", f"No se pudo abrir la competición: {e}")
+
+    tk.OptionMenu(menu, elegido, *registro.ids(), command=cambiar).pack(pady=5)
+
 # ====================================================
 # ⚙️ Funciones de apertura
 # ====================================================
 def abrir_asignacion(root):
     """Abre la ventana de asignación de grupos."""
+    GroupAssigner = cargar("assigner", "GroupAssigner")
     assign_win = tk.Toplevel(root)
     crear_encabezado(assign_win)
     GroupAssigner(assign_win)
     assign_win.focus_force()
 
 def abrir_informe_fecha():
+    InformesUI = cargar("informes", "InformesUI")
     win = tk.Toplevel()
     crear_encabezado(win)
     InformesUI(win)
     win.focus_force()
 
 def abrir_llaves():
+    EliminationBracketUI = cargar("elimination_bracket", "EliminationBracketUI")
     win = tk.Toplevel()
     crear_encabezado(win)
     EliminationBracketUI(win)
@@ -86,6 +144,24 @@ def abrir_llaves():
 # ====================================================
 # ⚽ Fase de Grupos (rutas corregidas)
 # ====================================================
+def leer_grupos_asignados(path):
+    """{'A': ['Chile', ...], ...} desde Grupos_Asignados_Sub20_2025.xlsx."""
+    df_g = cargar("pandas").read_excel(path)
+    assigned_groups = {}
+    for g, eq in zip(df_g["Grupo"], df_g["Equipo"]):
+        assigned_groups.setdefault(str(g).strip().upper(), []).append(str(eq).strip())
+    return assigned_groups
+
+def leer_partidos_grupos(path):
+    """Lista de partidos {'Grupo', 'Jornada', 'Equipo1', 'Equipo2'} desde el Excel de la fase de grupos."""
+    df_p = cargar("pandas").read_excel(path)
+    return [{
+        "Grupo": str(g).strip().upper(),
+        "Jornada": int(j),
+        "Equipo1": str(e1),
+        "Equipo2": str(e2)
+    } for g, j, e1, e2 in zip(df_p["Grupo"], df_p["Jornada"], df_p["Equipo1"], df_p["Equipo2"])]
+
 def abrir_fase_grupos(root):
     """
     Abre la ventana de fase de grupos si existen los archivos generados.
@@ -97,37 +173,25 @@ def abrir_fase_grupos(root):
     grupos_path = os.path.join(data_dir, "Grupos_Asignados_Sub20_2025.xlsx")
     partidos_path = os.path.join(data_dir, "FIFA_Sub20_2025_FaseGrupos_Partidos.xlsx")
 
+    trabajador.esperar()  # por si la asignación todavía está escribiendo los Excel
     if not (os.path.exists(grupos_path) and os.path.exists(partidos_path)):
-        tk.messagebox.showwarning(
+        messagebox.showwarning(
             "Archivos no encontrados",
             "Antes de abrir la Fase de Grupos debés asignar los equipos y generar los partidos."
         )
         return
 
+    # los Excel sólo se parsean si cambiaron desde la última vez (ver input_cache.py)
+    cargar_cacheado = cargar("input_cache", "cargar_cacheado")
     try:
-        df_g = pd.read_excel(grupos_path)
-        df_p = pd.read_excel(partidos_path)
+        assigned_groups = cargar_cacheado(grupos_path, leer_grupos_asignados)
+        generated_matches = cargar_cacheado(partidos_path, leer_partidos_grupos)
     except Exception as e:
-        tk.messagebox.showerror("Error", f"No se pudieron leer los archivos: {e}")
+        messagebox.showerror("Error", f"No se pudieron leer los archivos: {e}")
         return
 
-    # Crear estructuras a partir de los Excel
-    assigned_groups = {}
-    for _, row in df_g.iterrows():
-        g = str(row["Grupo"]).strip().upper()
-        eq = str(row["Equipo"]).strip()
-        assigned_groups.setdefault(g, []).append(eq)
-
-    generated_matches = []
-    for _, row in df_p.iterrows():
-        generated_matches.append({
-            "Grupo": str(row["Grupo"]).strip().upper(),
-            "Jornada": int(row["Jornada"]),
-            "Equipo1": str(row["Equipo1"]),
-            "Equipo2": str(row["Equipo2"])
-        })
-
     # Crear la ventana de fase de grupos
+    PhaseGroupsUI = cargar("phase_groups", "PhaseGroupsUI")
     win = tk.Toplevel(root)
     crear_encabezado(win)
     PhaseGroupsUI(win, assigned_groups, generated_matches)
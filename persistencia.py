@@ -0,0 +1,120 @@
+# persistencia.py
+import threading
+import queue
+from collections import OrderedDict
+
+INTERVALO_RESPUESTAS = 50  # ms entre revisiones de callbacks pendientes en el loop de Tk
+
+
+class TrabajadorGuardado:
+    """
+    Un hilo que hace las escrituras a disco en orden, fuera del loop de Tk.
+    Cada tarea tiene una clave: si llega otra con la misma clave mientras la
+    primera todavía espera, se queda la más nueva (o se combinan con `fusionar`),
+    así varios guardados seguidos terminan en una sola escritura del último estado.
+    Los callbacks al_terminar / al_fallar se ejecutan en el hilo de Tk si hay una
+    ventana vinculada (ver vincular), si no en el mismo hilo del trabajador.
+    """
+    def __init__(self, al_fallar=None):
+        self.al_fallar = al_fallar          # manejador de errores por defecto
+        self._pendientes = OrderedDict()    # clave -> [funcion, datos, al_terminar, al_fallar]
+        self._en_curso = 0
+        self._condicion = threading.Condition()
+        self._respuestas = queue.Queue()
+        self._ventana = None
+        self._hilo_activo = False
+
+    # ------------------------------------------------------------
+    def enviar(self, clave, funcion, datos=None, fusionar=None, al_terminar=None, al_fallar=None):
+        """
+        Encola funcion(datos) (o funcion() si datos es None). Si ya había una tarea
+        pendiente con esa clave se reemplaza; con fusionar(viejos, nuevos) se combinan
+        sus datos en lugar de descartar los anteriores.
+        """
+        with self._condicion:
+            anterior = self._pendientes.get(clave)
+            if anterior is not None and fusionar is not None:
+                datos = fusionar(anterior[1], datos)
+            self._pendientes[clave] = [funcion, datos, al_terminar, al_fallar or self.al_fallar]
+            # queda detrás de lo enviado antes: el orden de escritura es el del último envío
+            self._pendientes.move_to_end(clave)
+            if not self._hilo_activo:
+                self._hilo_activo = True
+                threading.Thread(target=self._correr, name="guardado", daemon=True).start()
+            self._condicion.notify_all()
+
+    def esperar(self, timeout=None):
+        """Bloquea hasta que no quede nada por escribir (usar al cerrar una pantalla)."""
+        with self._condicion:
+            terminado = self._condicion.wait_for(lambda: not self._pendientes and not self._en_curso, timeout)
+        self._entregar_respuestas()
+        return terminado
+
+    def ocupado(self):
+        with self._condicion:
+            return bool(self._pendientes or self._en_curso)
+
+    def vincular(self, ventana):
+        """Hace que los callbacks se ejecuten en el loop de Tk de `ventana`."""
+        self._ventana = ventana
+        self._revisar_respuestas()
+
+    # ------------------------------------------------------------
+    def _correr(self):
+        while True:
+            with self._condicion:
+                if not self._pendientes:
+                    self._condicion.wait(timeout=5)
+                    if not self._pendientes:
+                        self._hilo_activo = False
+                        return  # el hilo se vuelve a crear con el próximo envío
+                    continue
+                _, (funcion, datos, al_terminar, al_fallar) = self._pendientes.popitem(last=False)
+                self._en_curso += 1
+            try:
+                resultado = funcion() if datos is None else funcion(datos)
+            except Exception as ex:
+                if al_fallar:
+                    self._responder(al_fallar, ex)
+            else:
+                if al_terminar:
+                    self._responder(al_terminar, resultado)
+            finally:
+                with self._condicion:
+                    self._en_curso -= 1
+                    self._condicion.notify_all()
+
+    def _responder(self, callback, valor):
+        if self._ventana is None:
+            callback(valor)
+        else:
+            self._respuestas.put((callback, valor))
+
+    def _entregar_respuestas(self):
+        while True:
+            try:
+                callback, valor = self._respuestas.get_nowait()
+            except queue.Empty:
+                return
+            callback(valor)
+
+    def _revisar_respuestas(self):
+        # Tk no es seguro entre hilos: los callbacks se ejecutan acá, desde el loop principal
+        try:
+            if not self._ventana.winfo_exists():
+                self._ventana = None
+                return
+        except Exception:
+            self._ventana = None
+            return
+        self._entregar_respuestas()
+        self._ventana.after(INTERVALO_RESPUESTAS, self._revisar_respuestas)
+
+
+def fusionar_cambios(viejos, nuevos):
+    """Combina dos guardados parciales (datos_torneo, equipos, partidos): gana lo más nuevo."""
+    return (nuevos[0], {**viejos[1], **nuevos[1]}, {**viejos[2], **nuevos[2]})
+
+
+# trabajador único del proceso (main.py lo vincula a la ventana principal)
+trabajador = TrabajadorGuardado()
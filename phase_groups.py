@@ -1,10 +1,13 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-from utils import apply_style, center_fullscreen
-from core import Torneo, Partido, Equipo
-import os
-from PIL import Image, ImageTk
-import unicodedata
+from tkinter import ttk, messagebox, filedialog
+from utils import apply_style, center_fullscreen, normalize_name
+from core import Partido, Equipo, TorneoError, load_team_info_from_excel
+from flags import obtener_bandera
+from cruces import OCTAVOS
+from tabla_virtual import TablaVirtual
+from persistencia import trabajador
+from registro import torneo_activo
+from programacion import programar_torneo
 
 
 class PhaseGroupsUI:
@@ -14,13 +17,13 @@ class PhaseGroupsUI:
         apply_style(self.master)
         center_fullscreen(self.master)
 
-        self.torneo = Torneo()
+        self.torneo = torneo_activo()
         self.assigned_groups = assigned_groups
         self.generated_matches = generated_matches
         self.current_jornada = 1
-        self.max_jornada = 3
-        self._flag_cache = {}
+        self.max_jornada = max((m['Jornada'] for m in generated_matches), default=1)
 
+        self.master.protocol("WM_DELETE_WINDOW", self.volver_menu)
         self._load_into_torneo()
         self._build_ui()
         self._load_jornada(self.current_jornada)
@@ -33,7 +36,9 @@ class PhaseGroupsUI:
         # Botones principales
         ttk.Button(top, text="Avanzar Jornada", command=self.advance_jornada).pack(side='right', padx=(4, 0))
         ttk.Button(top, text="Guardar Jornada", command=self.save_current_jornada).pack(side='right', padx=(4, 0))
-        ttk.Button(top, text="Informes (5 tipos)", command=self.show_reports_window).pack(side='right', padx=(4, 10))
+        ttk.Button(top, text="Importar resultados", command=self.importar_resultados).pack(side='right', padx=(4, 0))
+        ttk.Button(top, text="Importar jugadores", command=self.importar_jugadores).pack(side='right', padx=(4, 0))
+        ttk.Button(top, text="Informes (7 tipos)", command=self.show_reports_window).pack(side='right', padx=(4, 10))
         ttk.Button(top, text="Ver llaves de eliminación", command=self.mostrar_llaves).pack(side='right', padx=(4, 0))
         # 🔹 Botón para volver al menú principal
         ttk.Button(top, text="Volver al menú principal", command=self.volver_menu).pack(side='left', padx=(0, 10))
@@ -53,21 +58,11 @@ class PhaseGroupsUI:
 
         ttk.Frame(self.master, height=2).pack(fill='x')
 
-        # Tabla de partidos
-        cols = ("ID", "Grupo", "Equipo1", "G1", "vs", "G2", "Equipo2", "Resultado")
-        tree_frame = ttk.Frame(self.master)
-        tree_frame.pack(fill='both', expand=True, padx=10, pady=10)
-
-        scrollbar = ttk.Scrollbar(tree_frame)
-        scrollbar.pack(side='right', fill='y')
-
-        self.tree = ttk.Treeview(
-            tree_frame,
-            columns=cols,
-            show="headings",
-            yscrollcommand=scrollbar.set
-        )
-        scrollbar.config(command=self.tree.yview)
+        # Tabla de partidos (sólo se crean las filas visibles, ver tabla_virtual.py)
+        cols = ("ID", "Grupo", "Equipo1", "G1", "vs", "G2", "Equipo2", "Resultado", "Fecha", "Sede")
+        self.tabla = TablaVirtual(self.master, cols)
+        self.tabla.pack(fill='both', expand=True, padx=10, pady=10)
+        self.tree = self.tabla.tree
 
         style = ttk.Style()
         style.theme_use("clam")
@@ -76,60 +71,97 @@ class PhaseGroupsUI:
         style.configure("Treeview", font=('Segoe UI', 10), rowheight=26,
                         fieldbackground="#F9F9F9", background="#F9F9F9")
 
-        for c in cols:
-            self.tree.heading(c, text=c, anchor='center')
-            self.tree.column(c, anchor='center', stretch=True)
-
         self.tree.tag_configure('oddrow', background='#F8F8F8')
         self.tree.tag_configure('evenrow', background='#E7ECF0')
-        self.tree.pack(fill='both', expand=True)
         self.tree.bind("<Double-1>", self._on_double_click_row)
                 
     def volver_menu(self):
         """Cierra esta ventana y regresa al menú principal sin perder datos."""
-        self.torneo.guardar_datos()  # Asegura que se guarde todo lo cargado
+        try:
+            self.torneo.guardar_datos()  # Asegura que se guarde todo lo cargado
+        except TorneoError as e:
+            messagebox.showerror("Error", str(e))
+        trabajador.esperar()          # no cerrar con escrituras pendientes
         self.master.destroy()         # Cierra solo esta ventana
 
 
     # ============================ DATOS ============================
     def _load_into_torneo(self):
+        # al volver a abrir la pantalla el torneo ya tiene equipos y partidos: se reusan
+        # (reemplazar un equipo dejaría sus stats en cero con los resultados ya cargados)
+        try:
+            info = load_team_info_from_excel()
+        except TorneoError:
+            info = {}
         for g, lista in self.assigned_groups.items():
             for pos, pais in enumerate(lista, start=1):
                 ident = f"{g}{pos}"
-                eq = Equipo(ident, pais, abreviatura=pais[:3].upper(), grupo=g)
+                actual = self.torneo.equipos.get(ident)
+                if actual and (actual.pais, actual.grupo) == (pais, g):
+                    continue
+                conf = info.get(pais, {}).get('confederacion', '')
+                eq = Equipo(ident, pais, abreviatura=pais[:3].upper(), confederacion=conf, grupo=g)
                 self.torneo.agregar_equipo(eq)
 
+        posiciones = {g: {pais: pos for pos, pais in enumerate(lista, start=1)}
+                      for g, lista in self.assigned_groups.items()}
         for m in self.generated_matches:
             g = m['Grupo']
             e1 = m['Equipo1']
             e2 = m['Equipo2']
-            pos1 = self.assigned_groups[g].index(e1) + 1
-            pos2 = self.assigned_groups[g].index(e2) + 1
+            pos1 = posiciones[g][e1]
+            pos2 = posiciones[g][e2]
             id1 = f"{g}{pos1}"
             id2 = f"{g}{pos2}"
+            if self.torneo.buscar_partido(id1, id2):
+                continue
             p = Partido(id1, id2, fecha="", hora="", fase="Fase de Grupos")
             self.torneo.agregar_partido(p)
 
+        # si cambió algún equipo, sus stats vuelven a salir de los partidos ya jugados
+        self.torneo.reconstruir_estadisticas()
+        # fecha, hora y sede para los partidos que todavía no las tienen (ver programacion.py)
+        try:
+            programar_torneo(self.torneo)
+        except TorneoError as e:
+            messagebox.showwarning("Programación", str(e))
         self.torneo.configuracion_cerrada = True
-        self.torneo.guardar_datos()
+        try:
+            self.torneo.guardar_datos()
+        except TorneoError as e:
+            messagebox.showerror("Error", str(e))
 
     # ============================ FUNCIONES ============================
+    @staticmethod
+    def _programa(p):
+        """(fecha y hora, sede) del partido para la tabla."""
+        if not p or not p.fecha:
+            return ("", "")
+        return (f"{p.fecha} {p.hora}".strip(), p.sede)
+
     def _load_jornada(self, jornada):
         self.current_jornada = jornada
         self.jornada_label.config(text=f"FASE DE GRUPOS - JORNADA {self.current_jornada}")
-        self.tree.delete(*self.tree.get_children())
         self._populate_tree_for_jornada(jornada)
 
     def _populate_tree_for_jornada(self, jornada):
-        self.tree.delete(*self.tree.get_children())
+        filas = []
         for m in self.generated_matches:
             if m['Jornada'] != jornada:
                 continue
             g = m['Grupo']
             e1 = m['Equipo1']
             e2 = m['Equipo2']
-            tag = 'evenrow' if (len(self.tree.get_children()) % 2 == 0) else 'oddrow'
-            self.tree.insert("", tk.END, values=("", g, e1, "", "vs", "", e2, "PENDIENTE"), tags=(tag,))
+            match_id = self.torneo.buscar_partido(self.torneo.buscar_equipo_por_pais(e1),
+                                                  self.torneo.buscar_equipo_por_pais(e2))
+            p = self.torneo.calendario.get(match_id)
+            if p and p.goles_e1 is not None and p.goles_e2 is not None:
+                valores = ("", g, e1, p.goles_e1, "vs", p.goles_e2, e2, f"{p.goles_e1} : {p.goles_e2}")
+            else:
+                valores = ("", g, e1, "", "vs", "", e2, "PENDIENTE")
+            valores += self._programa(p)
+            filas.append((match_id or (g, e1, e2), valores))
+        self.tabla.cargar(filas)
 
     def advance_jornada(self):
         if self.current_jornada < self.max_jornada:
@@ -143,13 +175,54 @@ class PhaseGroupsUI:
         messagebox.showinfo("Guardado", f"Jornada {self.current_jornada} guardada correctamente.")
         self.show_standings_window()
 
-    # ============================ TABLA DE POSICIONES ============================
-    def show_standings_window(self, all_groups=False):
-        from PIL import Image, ImageTk
-        BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-        bandera_path = os.path.join(os.path.dirname(BASE_DIR), "banderas")
+    def importar_resultados(self):
+        """Carga de una vez los resultados de un archivo (CSV, Excel o JSON)."""
+        from ingesta import leer_resultados
+        ruta = filedialog.askopenfilename(
+            parent=self.master, title="Importar resultados",
+            filetypes=[("Resultados", "*.csv *.xlsx *.json"), ("Todos", "*.*")])
+        if not ruta:
+            return
+        try:
+            resultados = leer_resultados(ruta)
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo leer el archivo: {e}")
+            return
 
+        # primero se valida todo sin tocar el torneo
+        informe = self.torneo.registrar_resultados(resultados, simulacion=True)
+        if not informe.ok:
+            detalle = "\n".join(f"Fila {n}: {motivo}" for n, motivo in informe.conflictos[:15])
+            messagebox.showerror("Resultados con conflictos",
+                                 f"No se cargó ningún resultado ({len(informe.conflictos)} conflictos):\n{detalle}")
+            return
+        if not messagebox.askyesno("Confirmar", f"¿Registrar {len(informe.validos)} resultados?"):
+            return
+        try:
+            informe = self.torneo.registrar_resultados(resultados)
+        except TorneoError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        self._load_jornada(self.current_jornada)
+        messagebox.showinfo("Resultados importados", f"Se registraron {len(informe.aplicados)} resultados.")
+
+    def importar_jugadores(self):
+        """Carga goles, asistencias, tarjetas y minutos por jugador (una fila por jugador y partido)."""
+        from ingesta import importar_jugadores
+        ruta = filedialog.askopenfilename(
+            parent=self.master, title="Importar estadísticas de jugadores",
+            filetypes=[("Jugadores", "*.csv *.xlsx *.json"), ("Todos", "*.*")])
+        if not ruta:
+            return
+        try:
+            partidos = importar_jugadores(self.torneo, ruta)
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudieron cargar los jugadores: {e}")
+            return
+        messagebox.showinfo("Jugadores importados", f"Se cargaron estadísticas de {len(partidos)} partidos.")
 
+    # ============================ TABLA DE POSICIONES ============================
+    def show_standings_window(self, all_groups=False):
         win = tk.Toplevel(self.master)
         win.title("Tablas de Posiciones")
         win.geometry("950x550")
@@ -180,43 +253,34 @@ class PhaseGroupsUI:
                 tree.column(c, anchor="center", width=80)
             tree.column("Equipo", width=200, anchor='w')
 
+            tree.imagenes = []  # referencias para que Tk no borre las banderas
             tabla = self.torneo.calcular_tabla_posiciones(g)
             for i, t in enumerate(tabla, start=1):
                 tag = 'evenrow' if i % 2 == 0 else 'oddrow'
-                pais = t.pais
-                img_path = os.path.join(bandera_path, self._normalize_name(pais) + ".png")
-                bandera_img = None
-                if os.path.exists(img_path):
-                    bandera = Image.open(img_path).resize((26, 18))
-                    bandera_img = ImageTk.PhotoImage(bandera)
-                    self._flag_cache[pais] = bandera_img
+                bandera_img = obtener_bandera(t.pais, (26, 18))
                 iid = tree.insert("", tk.END, values=(i, t.pais, t.stats['PJ'], t.stats['G'], t.stats['E'],
                                                       t.stats['P'], t.stats['GF'], t.stats['GC'],
                                                       t.stats['DG'], t.stats['Pts']), tags=(tag,))
                 if bandera_img:
                     tree.item(iid, image=bandera_img)
-                    tree.image = bandera_img
+                    tree.imagenes.append(bandera_img)
 
             tree.pack(fill='both', expand=True)
 
     def _normalize_name(self, pais):
-        pais = ''.join(c for c in unicodedata.normalize('NFD', pais) if unicodedata.category(c) != 'Mn')
-        return pais.lower().replace(' ', '').replace('’', '').replace("'", "")
+        return normalize_name(pais)
         # ============================ INFORMES ============================
     def show_reports_window(self):
         """Abre la ventana de informes generales (1 a 5)"""
-        from informes.informes import InformesUI
+        from informes import InformesUI
         win = tk.Toplevel(self.master)
         InformesUI(win)
     
         # ============================ EVENTO: DOBLE CLIC ============================
     def _on_double_click_row(self, event):
         """Permite ingresar y guardar el resultado del partido seleccionado sin reiniciar el torneo."""
-        item = self.tree.selection()
-        if not item:
-            return
-
-        valores = self.tree.item(item[0], "values")
+        clave = self.tabla.seleccion()
+        valores = self.tabla.valores(clave)
         if not valores:
             return
 
@@ -259,56 +323,26 @@ class PhaseGroupsUI:
                 return
 
             # Buscar partido correspondiente
-            partido_encontrado = None
-            for p in self.torneo.calendario.values():
-                e1 = self.torneo.equipos.get(p.id_equipo1)
-                e2 = self.torneo.equipos.get(p.id_equipo2)
-                if e1 and e2 and e1.pais == equipo1 and e2.pais == equipo2 and p.fase == "Fase de Grupos":
-                    partido_encontrado = p
-                    break
-
-            if not partido_encontrado:
+            match_id = self.torneo.buscar_partido(self.torneo.buscar_equipo_por_pais(equipo1),
+                                                  self.torneo.buscar_equipo_por_pais(equipo2),
+                                                  "Fase de Grupos")
+
+            if not match_id:
                 messagebox.showerror("Error", "No se encontró el partido en el registro interno.")
                 win.destroy()
                 return
 
-            # Actualizar datos en memoria
-            p = partido_encontrado
-            p.goles_e1 = g1
-            p.goles_e2 = g2
-
-            e1 = self.torneo.equipos[p.id_equipo1]
-            e2 = self.torneo.equipos[p.id_equipo2]
-
-            # Actualizar estadísticas
-            e1.stats['PJ'] += 1
-            e2.stats['PJ'] += 1
-            e1.stats['GF'] += g1
-            e2.stats['GF'] += g2
-            e1.stats['GC'] += g2
-            e2.stats['GC'] += g1
-
-            if g1 > g2:
-                e1.stats['G'] += 1
-                e2.stats['P'] += 1
-                e1.stats['Pts'] += 3
-            elif g2 > g1:
-                e2.stats['G'] += 1
-                e1.stats['P'] += 1
-                e2.stats['Pts'] += 3
-            else:
-                e1.stats['E'] += 1
-                e2.stats['E'] += 1
-                e1.stats['Pts'] += 1
-                e2.stats['Pts'] += 1
-
-            e1.stats['DG'] = e1.stats['GF'] - e1.stats['GC']
-            e2.stats['DG'] = e2.stats['GF'] - e2.stats['GC']
+            # Registrar en el torneo (actualiza estadísticas y tabla de posiciones)
+            try:
+                self.torneo.registrar_resultado(match_id, g1, g2)
+            except TorneoError as e:
+                messagebox.showerror("Error", str(e))
+                win.destroy()
+                return
 
-            # Actualizar tabla visual
-            self.tree.set(item[0], column="G1", value=str(g1))
-            self.tree.set(item[0], column="G2", value=str(g2))
-            self.tree.set(item[0], column="Resultado", value=f"{g1} : {g2}")
+            # Actualizar sólo la fila editada
+            self.tabla.actualizar(clave, ("", grupo, equipo1, g1, "vs", g2, equipo2, f"{g1} : {g2}")
+                                  + self._programa(self.torneo.calendario.get(match_id)))
 
             # Cerrar ventana (sin mostrar messagebox)
             win.destroy()
@@ -322,15 +356,13 @@ class PhaseGroupsUI:
     # ============================ LLAVES DE ELIMINACIÓN ============================
     def mostrar_llaves(self):
         """Muestra las llaves de eliminación (Octavos → Cuartos → Semis → Final)."""
-        BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-        bandera_path = os.path.join(os.path.dirname(BASE_DIR), "banderas")
-
         win = tk.Toplevel(self.master)
         win.title("Llaves de Eliminación")
         win.geometry("1000x600")
         win.config(bg="#e8eef7")
         win.transient(self.master)
         win.focus_force()
+        win.imagenes = []  # referencias para que Tk no borre las banderas
 
         frm = ttk.Frame(win, padding=10)
         frm.pack(fill='both', expand=True)
@@ -349,34 +381,26 @@ class PhaseGroupsUI:
             ttk.Label(col, text=ronda, font=('Segoe UI', 11, 'bold')).pack(pady=(0, 5))
             columnas.append(col)
 
-        octavos_pairs = [
-            ("1°A", "2°C"), ("1°B", "3°A/C/D"), ("1°C", "3°A/B/F"), ("2°A", "2°B"),
-            ("1°D", "3°B/E/F"), ("2°E", "1°F"), ("1°E", "2°D"), ("1°F", "2°E")
-        ]
-
-        grupos_completos = all(p.goles_e1 is not None and p.goles_e2 is not None
-                               for p in self.torneo.calendario.values()
-                               if p.fase == "Fase de Grupos")
+        grupos_completos = not self.torneo.partidos_pendientes("Fase de Grupos")
 
-        for pair in octavos_pairs:
+        for codigo, pos1, pos2 in OCTAVOS:
             f = ttk.Frame(columnas[0], relief='ridge', borderwidth=2, padding=5)
             f.pack(pady=8, fill='x')
 
-            if not grupos_completos:
-                ttk.Label(f, text=f"{pair[0]}  vs  {pair[1]}",
+            e1 = self.torneo.obtener_equipo_por_posicion(pos1) if grupos_completos else None
+            e2 = self.torneo.obtener_equipo_por_posicion(pos2) if grupos_completos else None
+            if not (e1 and e2):
+                ttk.Label(f, text=f"{pos1}  vs  {pos2}",
                           font=('Segoe UI', 10, 'bold')).pack()
             else:
-                pais1, pais2 = pair
-                for pais in (pais1, pais2):
-                    img_path = os.path.join(bandera_path, self._normalize_name(pais) + ".png")
-                    bandera_img = None
-                    if os.path.exists(img_path):
-                        bandera = Image.open(img_path).resize((26, 18))
-                        bandera_img = ImageTk.PhotoImage(bandera)
-                        self._flag_cache[pais] = bandera_img
-
+                pais1, pais2 = e1.pais, e2.pais
                 fila = ttk.Frame(f)
                 fila.pack(pady=2)
+                for pais, lado in ((pais1, 'left'), (pais2, 'right')):
+                    bandera_img = obtener_bandera(pais, (26, 18))
+                    if bandera_img:
+                        win.imagenes.append(bandera_img)
+                        ttk.Label(fila, image=bandera_img).pack(side=lado, padx=4)
                 ttk.Label(fila, text=f"{pais1}  vs  {pais2}", font=('Segoe UI', 10)).pack()
 
         ttk.Label(frm, text="* Las llaves se completarán automáticamente al finalizar la Fase de Grupos.",
@@ -0,0 +1,406 @@
+# programacion.py
+import os
+from dataclasses import dataclass
+from datetime import date, timedelta
+from core import TorneoError
+from input_cache import cargar_cacheado
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+RUTA_FECHAS = os.path.join(SCRIPT_DIR, 'fechas_fase_eliminatoria.xlsx')
+
+DESCANSO_MINIMO = 2              # días libres entre dos partidos de un mismo equipo
+HORARIOS = ("17:00", "20:00")    # horarios de inicio (hora de Chile) para la fase de grupos
+MAXIMO_INTENTOS = 50_000         # días probados antes de abandonar la búsqueda
+
+
+@dataclass(frozen=True)
+class Sede:
+    nombre: str
+    ciudad: str
+    no_disponible: frozenset = frozenset()   # fechas ISO en que el estadio no se puede usar
+
+
+# sedes del Mundial Sub-20 Chile 2025; la primera disponible se usa para los partidos más importantes del día
+SEDES = (
+    Sede("Estadio Nacional Julio Martínez Prádanos", "Santiago"),
+    Sede("Estadio Elías Figueroa Brander", "Valparaíso"),
+    Sede("Estadio El Teniente", "Rancagua"),
+    Sede("Estadio Fiscal de Talca", "Talca"),
+)
+
+# rondas de eliminación en orden; la clave es la primera palabra del nombre de la fase
+FASES_ELIMINATORIAS = ("treintaidosavos", "dieciseisavos", "octavos", "cuartos", "semifinal", "tercer", "final")
+
+
+def _clave_fase(nombre):
+    palabra = str(nombre).split()[0].lower() if str(nombre).strip() else ""
+    return {"semifinales": "semifinal", "tercero": "tercer"}.get(palabra, palabra)
+
+
+def leer_fechas_eliminatoria(path):
+    """{fase: [(código, fecha ISO, hora HH:MM), ...]} ordenado por código, desde fechas_fase_eliminatoria.xlsx."""
+    import pandas as pd
+    df = pd.read_excel(path)
+    fechas = {}
+    for etapa, codigo, fecha, hora in zip(df["Etapa"], df["Código de Partido"], df["Fecha"], df["Hora (Chile)"]):
+        fechas.setdefault(_clave_fase(etapa), []).append(
+            (str(codigo).strip(), pd.Timestamp(fecha).date().isoformat(), str(hora)[:5]))
+    for partidos in fechas.values():
+        partidos.sort(key=lambda p: int(p[0].lstrip("M")))
+    return fechas
+
+
+def fechas_eliminatoria(path=RUTA_FECHAS):
+    """Las fechas fijas de la eliminatoria, o {} si el archivo no está."""
+    if not os.path.exists(path):
+        return {}
+    return cargar_cacheado(path, leer_fechas_eliminatoria)
+
+
+def datos_final(torneo=None, path=RUTA_FECHAS):
+    """(fecha ISO, hora, sede) de la final: la programada en el torneo o, si no hay, la del Excel."""
+    if torneo is not None:
+        for p in torneo.partidos_por_fase("Final").values():
+            if p.fecha:
+                return p.fecha, p.hora, p.sede
+    finales = fechas_eliminatoria(path).get("final")
+    if finales:
+        _, fecha, hora = finales[0]
+        return fecha, hora, SEDES[0].nombre
+    return None
+
+
+# ============================================================
+# 🔹 Búsqueda con propagación (dominios = máscaras de bits de días)
+# ============================================================
+class _Bloque:
+    """Uno o más partidos que se juegan el mismo día (y a la misma hora si son simultáneos)."""
+    __slots__ = ('partidos', 'equipos', 'grupo', 'jornada', 'fase', 'fijo', 'simultaneo')
+
+    def __init__(self, partidos, equipos, grupo=None, jornada=None, fase=None, fijo=None, simultaneo=False):
+        self.partidos = partidos        # [match_id]
+        self.equipos = equipos          # set de id de equipo
+        self.grupo = grupo
+        self.jornada = jornada
+        self.fase = fase                # índice en FASES_ELIMINATORIAS (-1 = fase de grupos)
+        self.fijo = fijo                # fecha ISO ya decidida (o None)
+        self.simultaneo = simultaneo
+
+
+class _Busqueda:
+    """
+    Asigna un día a cada bloque. Restricciones:
+      - descanso: dos bloques con un equipo en común quedan a más de `descanso` días;
+      - precedencia: (a, b, brecha) => día(b) >= día(a) + brecha (jornadas, rondas);
+      - capacidad: por día, no más partidos que sedes disponibles.
+    Los dominios son enteros usados como máscara de bits (bit d = día d permitido); tras cada
+    asignación se propagan cotas por las precedencias y se recortan los vecinos por descanso.
+    Tras max_intentos días probados sin solución la búsqueda se abandona con TorneoError.
+    """
+    def __init__(self, bloques, n_dias, capacidad, descanso, precedencias, max_intentos=MAXIMO_INTENTOS):
+        self.bloques = bloques
+        self.max_intentos = max_intentos
+        self.n_dias = n_dias
+        self.restante = list(capacidad)
+        self.brecha = descanso + 1
+        self.dom = [(1 << n_dias) - 1] * len(bloques)
+        self.dia = [None] * len(bloques)
+        self.carga = [0] * n_dias
+        self.ady = [[] for _ in bloques]
+        por_equipo = {}
+        for i, b in enumerate(bloques):
+            for e in b.equipos:
+                por_equipo.setdefault(e, []).append(i)
+        for ids in por_equipo.values():
+            for i in ids:
+                self.ady[i].extend(j for j in ids if j != i)
+        self.ady = [list(set(v)) for v in self.ady]
+        # otros bloques de la misma jornada del grupo (se prefiere jugarlos el mismo día)
+        por_jornada = {}
+        for i, b in enumerate(bloques):
+            if b.grupo is not None:
+                por_jornada.setdefault((b.grupo, b.jornada), []).append(i)
+        self.hermanos = [[j for j in por_jornada.get((b.grupo, b.jornada), ()) if j != i] if b.grupo is not None else []
+                         for i, b in enumerate(bloques)]
+        self.despues = [[] for _ in bloques]
+        self.antes = [[] for _ in bloques]
+        for a, b, brecha in precedencias:
+            self.despues[a].append((b, brecha))
+            self.antes[b].append((a, brecha))
+        self.rastro = []
+
+    # ------------------------------------------------------------
+    def _ventana(self, d):
+        lo, hi = max(0, d - self.brecha + 1), min(self.n_dias - 1, d + self.brecha - 1)
+        return ((1 << (hi - lo + 1)) - 1) << lo
+
+    def _recortar(self, j, nuevo, cola):
+        if nuevo != self.dom[j]:
+            self.rastro.append((j, self.dom[j]))
+            self.dom[j] = nuevo
+            cola.append(j)
+        return nuevo != 0
+
+    def _propagar(self, cola):
+        while cola:
+            v = cola.pop()
+            dom = self.dom[v]
+            lo, hi = (dom & -dom).bit_length() - 1, dom.bit_length() - 1
+            for j, brecha in self.despues[v]:
+                if not self._recortar(j, self.dom[j] & ~((1 << (lo + brecha)) - 1), cola):
+                    return False
+            for i, brecha in self.antes[v]:
+                tope = hi - brecha
+                if not self._recortar(i, self.dom[i] & ((1 << (tope + 1)) - 1 if tope >= 0 else 0), cola):
+                    return False
+            if lo == hi:
+                fuera = ~self._ventana(lo)
+                for j in self.ady[v]:
+                    if not self._recortar(j, self.dom[j] & fuera, cola):
+                        return False
+        return True
+
+    def _deshacer(self, hasta):
+        while len(self.rastro) > hasta:
+            j, dom = self.rastro.pop()
+            if j is None:            # asignación: (None, (día, partidos, bloque))
+                d, k, i = dom
+                self.restante[d] += k
+                self.carga[d] -= k
+                self.dia[i] = None
+            else:
+                self.dom[j] = dom
+
+    def _con_lugar(self, i):
+        k = len(self.bloques[i].partidos)
+        mascara = 0
+        for d in range(self.n_dias):
+            if self.restante[d] >= k:
+                mascara |= 1 << d
+        return self.dom[i] & mascara
+
+    def _asignar(self, i, d):
+        k = len(self.bloques[i].partidos)
+        self.restante[d] -= k
+        self.carga[d] += k
+        self.dia[i] = d
+        self.rastro.append((None, (d, k, i)))
+        self._recortar(i, 1 << d, [])
+        return self._propagar([i])
+
+    def _orden_valores(self, i, libres):
+        pareja = {self.dia[j] for j in self.hermanos[i]}
+        dias = [d for d in range(self.n_dias) if libres >> d & 1]
+        # mismo día que la otra mitad de la jornada del grupo, después el día menos cargado
+        return sorted(dias, key=lambda d: (d not in pareja, self.carga[d], d))
+
+    def resolver(self):
+        if not self._propagar(list(range(len(self.bloques)))):
+            return None
+        intentos = 0
+        pila = []
+        while True:
+            # variable con menos días posibles (MRV)
+            elegido, libres, mejor = None, 0, None
+            for i, d in enumerate(self.dia):
+                if d is None:
+                    posibles = self._con_lugar(i)
+                    n = posibles.bit_count()
+                    if mejor is None or n < mejor:
+                        elegido, libres, mejor = i, posibles, n
+                        if n <= 1:
+                            break
+            if elegido is None:
+                return self.dia
+            pila.append((elegido, self._orden_valores(elegido, libres), len(self.rastro)))
+            while pila:
+                i, valores, marca = pila[-1]
+                self._deshacer(marca)
+                avanzo = False
+                while valores:
+                    intentos += 1
+                    if intentos > self.max_intentos:
+                        raise TorneoError(f"No se encontró una programación tras probar {self.max_intentos} días; "
+                                          "probablemente no hay una posible con estas sedes y fechas.")
+                    if self._asignar(i, valores.pop(0)):
+                        avanzo = True
+                        break
+                    self._deshacer(marca)
+                if avanzo:
+                    break
+                pila.pop()
+            else:
+                return None
+
+
+# ============================================================
+# 🔹 Programación del torneo
+# ============================================================
+def _jornadas(partidos):
+    """Jornada de cada partido de un grupo: la primera en que ninguno de sus equipos ya juega."""
+    ocupados = []   # jornada -> equipos que ya juegan en ella
+    jornada = {}
+    for mid, p in partidos:
+        j = 0
+        while j < len(ocupados) and (p.id_equipo1 in ocupados[j] or p.id_equipo2 in ocupados[j]):
+            j += 1
+        if j == len(ocupados):
+            ocupados.append(set())
+        ocupados[j].update((p.id_equipo1, p.id_equipo2))
+        jornada[mid] = j + 1
+    return jornada
+
+
+def programar_torneo(torneo, sedes=SEDES, descanso=DESCANSO_MINIMO, horarios=HORARIOS,
+                     fechas_fijas=None, reprogramar=False):
+    """
+    Asigna fecha, hora y sede a los partidos de torneo.calendario que no las tienen
+    (con reprogramar=True también a los ya programados que no se jugaron).
+    Respeta el descanso mínimo de cada equipo, juega a la misma hora los partidos de la
+    última jornada de cada grupo y usa cada sede a lo sumo una vez por día y sólo en
+    fechas disponibles. Las rondas de eliminación toman fecha y hora de
+    fechas_fase_eliminatoria.xlsx (o de fechas_fijas: {fase: [(código, fecha, hora)]}).
+    Devuelve los match_id modificados (guardarlos con torneo.guardar_cambios).
+    Lanza TorneoError si no hay programación posible.
+    """
+    if fechas_fijas is None:
+        fechas_fijas = fechas_eliminatoria()
+    if not sedes:
+        raise TorneoError("No hay sedes para programar los partidos.")
+
+    def es_fijo(p):
+        return bool(p.fecha) and (not reprogramar or p.goles_e1 is not None)
+
+    # ---- bloques: partidos de grupo (la última jornada de cada grupo va junta) ----
+    bloques = []
+    por_grupo = {}
+    for mid, p in torneo.partidos_por_fase("Fase de Grupos").items():
+        e = torneo.equipos.get(p.id_equipo1)
+        por_grupo.setdefault(e.grupo if e else "", []).append((mid, p))
+    ultima_de_grupo = {}
+    for g, partidos in por_grupo.items():
+        jornada = _jornadas(partidos)
+        ultima = max(jornada.values())
+        ultima_de_grupo[g] = ultima
+        simultaneos = [(mid, p) for mid, p in partidos if jornada[mid] == ultima]
+        # la última jornada sólo se agrupa si ninguno de sus partidos tiene ya una fecha distinta
+        fechas = {p.fecha for _, p in simultaneos if es_fijo(p)}
+        juntos = len(simultaneos) > 1 and len(fechas) <= 1
+        for mid, p in partidos:
+            if juntos and jornada[mid] == ultima:
+                continue
+            bloques.append(_Bloque([mid], {p.id_equipo1, p.id_equipo2}, g, jornada[mid], -1,
+                                   p.fecha if es_fijo(p) else None))
+        if juntos:
+            equipos = set()
+            for _, p in simultaneos:
+                equipos.update((p.id_equipo1, p.id_equipo2))
+            bloques.append(_Bloque([mid for mid, _ in simultaneos], equipos, g, ultima, -1,
+                                   fechas.pop() if fechas else None, simultaneo=True))
+
+    # ---- bloques: rondas de eliminación (k-ésimo partido de la fase = k-ésimo código del Excel) ----
+    horas_fijas = {}
+    for fase in torneo.fases():
+        clave = _clave_fase(fase)
+        if clave not in FASES_ELIMINATORIAS:
+            continue
+        fijas = fechas_fijas.get(clave, [])
+        for k, (mid, p) in enumerate(torneo.partidos_por_fase(fase).items()):
+            fijo = p.fecha if es_fijo(p) else None
+            if fijo is None and k < len(fijas):
+                fijo = fijas[k][1]
+                horas_fijas[mid] = fijas[k][2]
+            bloques.append(_Bloque([mid], {p.id_equipo1, p.id_equipo2}, fase=FASES_ELIMINATORIAS.index(clave),
+                                   fijo=fijo))
+
+    if not bloques:
+        return []
+
+    # ---- días: del inicio al fin del torneo, ampliados si alguna fecha fija queda afuera ----
+    inicio = date.fromisoformat(torneo.fecha_inicio)
+    fin = date.fromisoformat(torneo.fecha_fin)
+    for b in bloques:
+        if b.fijo:
+            f = date.fromisoformat(b.fijo)
+            inicio, fin = min(inicio, f), max(fin, f)
+    n_dias = (fin - inicio).days + 1
+    dias = [(inicio + timedelta(days=d)).isoformat() for d in range(n_dias)]
+    sedes_del_dia = [[s for s in sedes if dia not in s.no_disponible] for dia in dias]
+
+    # ---- cotas necesarias: sin ellas la búsqueda recorre todo antes de fallar ----
+    lugares = sum(len(s) for s in sedes_del_dia)
+    n_partidos = sum(len(b.partidos) for b in bloques)
+    if n_partidos > lugares:
+        raise TorneoError(f"{n_partidos} partidos no entran en {lugares} turnos de sede "
+                          f"({n_dias} días del {dias[0]} al {dias[-1]}, {len(sedes)} sedes).")
+    por_equipo = {}
+    for b in bloques:
+        for e in b.equipos:
+            por_equipo[e] = por_equipo.get(e, 0) + 1
+    for e, n in por_equipo.items():
+        necesarios = (n - 1) * (descanso + 1) + 1
+        if necesarios > n_dias:
+            nombre = torneo.equipos[e].pais if e in torneo.equipos else e
+            raise TorneoError(f"{nombre} juega {n} partidos: con {descanso} días de descanso necesita "
+                              f"{necesarios} días y el torneo tiene {n_dias}.")
+
+    # ---- precedencias: jornadas de cada grupo en orden, rondas después de la anterior ----
+    precedencias = []
+    por_jornada = {}
+    por_fase = {}
+    for i, b in enumerate(bloques):
+        if b.fase == -1:
+            por_jornada.setdefault((b.grupo, b.jornada), []).append(i)
+        else:
+            por_fase.setdefault(b.fase, []).append(i)
+    for (g, j), ids in por_jornada.items():
+        for a in ids:
+            for b in por_jornada.get((g, j + 1), ()):
+                precedencias.append((a, b, 1))
+    # cada ronda de eliminación se juega después de la anterior (la primera, después de los grupos);
+    # el tercer puesto y la final vienen los dos después de las semifinales. El descanso de cada
+    # equipo ya lo cuida la restricción por equipo.
+    anteriores = [i for ids in por_jornada.values() for i in ids]
+    for f in sorted(por_fase):
+        for a in anteriores:
+            for b in por_fase[f]:
+                precedencias.append((a, b, 1))
+        if FASES_ELIMINATORIAS[f] not in ("tercer", "final"):
+            anteriores = por_fase[f]
+
+    busqueda = _Busqueda(bloques, n_dias, [len(s) for s in sedes_del_dia], descanso, precedencias)
+    for i, b in enumerate(bloques):
+        if b.fijo:
+            busqueda.dom[i] = 1 << dias.index(b.fijo)
+    asignados = busqueda.resolver()
+    if asignados is None:
+        raise TorneoError("No hay una programación que respete descansos, sedes y fechas fijas "
+                          f"({len(bloques)} bloques en {n_dias} días con {len(sedes)} sedes).")
+
+    # ---- hora y sede dentro de cada día ----
+    modificados = []
+    por_dia = {}
+    for i, d in enumerate(asignados):
+        por_dia.setdefault(d, []).append(bloques[i])
+    for d, del_dia in por_dia.items():
+        usadas = {p.sede for b in del_dia for p in map(torneo.calendario.get, b.partidos)
+                  if es_fijo(p) and p.sede}
+        libres = [s.nombre for s in sedes_del_dia[d] if s.nombre not in usadas]
+        # primero las rondas más avanzadas (la final se queda con la primera sede)
+        del_dia.sort(key=lambda b: -b.fase)
+        turno = 0
+        for b in del_dia:
+            partidos = [torneo.calendario[mid] for mid in b.partidos]
+            # hora del Excel, o la de un partido del bloque ya programado, o el próximo horario libre
+            hora = horas_fijas.get(b.partidos[0]) or next((p.hora for p in partidos if es_fijo(p) and p.hora), None)
+            if hora is None:
+                hora = horarios[turno % len(horarios)]
+                turno += 1
+            for mid, p in zip(b.partidos, partidos):
+                if es_fijo(p):
+                    continue
+                p.fecha = dias[d]
+                p.hora = hora
+                p.sede = libres.pop(0) if libres else ""
+                modificados.append(mid)
+    return modificados
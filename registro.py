@@ -0,0 +1,138 @@
+# registro.py
+import os
+import json
+import weakref
+from collections import OrderedDict
+from core import Torneo, TorneoError, SCRIPT_DIR, RUTA_DATOS
+from persistencia import trabajador
+
+# competiciones conocidas: {id: {'ruta': ..., 'nombre': ...}} (se puede editar a mano)
+RUTA_CATALOGO = os.path.join(SCRIPT_DIR, 'torneos.json')
+TORNEO_POR_DEFECTO = 'sub20'
+MAX_RESIDENTES = 4
+MEMORIA_MAXIMA = 64 * 1024 * 1024  # bytes estimados entre todos los torneos cargados
+
+# costo aproximado en memoria de cada objeto (medido con tracemalloc sobre un torneo cargado)
+BYTES_POR_EQUIPO = 800
+BYTES_POR_PARTIDO = 900
+
+
+def estimar_memoria(torneo):
+    return len(torneo.equipos) * BYTES_POR_EQUIPO + len(torneo.calendario) * BYTES_POR_PARTIDO
+
+
+class RegistroTorneos:
+    """
+    Abre torneos por id y mantiene en memoria los usados más recientemente.
+    Cuando hay más de max_residentes o se pasa de memoria_maxima se descarga el
+    menos usado (antes se guarda completo en su ruta).
+    Un torneo descargado que alguna pantalla todavía usa no se duplica: abrir()
+    devuelve esa misma instancia, con sus informes derivados al día. Recién cuando
+    nadie lo referencia se libera junto con sus derivados y se cierra su almacén.
+    """
+    def __init__(self, max_residentes=MAX_RESIDENTES, memoria_maxima=MEMORIA_MAXIMA, ruta_catalogo=RUTA_CATALOGO,
+                 escritor=None):
+        self.escritor = escritor  # se pasa a cada Torneo abierto (ver persistencia.py)
+        self.max_residentes = max_residentes
+        self.memoria_maxima = memoria_maxima
+        self.ruta_catalogo = ruta_catalogo
+        self.catalogo = {TORNEO_POR_DEFECTO: {'ruta': RUTA_DATOS, 'nombre': None}}
+        self._residentes = OrderedDict()               # id -> Torneo (LRU, el último es el más reciente)
+        self._en_uso = weakref.WeakValueDictionary()   # id -> Torneo todavía referenciado fuera del registro
+        self.activo = TORNEO_POR_DEFECTO
+        self._leer_catalogo()
+
+    # ------------------------------------------------------------
+    def _leer_catalogo(self):
+        if not os.path.exists(self.ruta_catalogo):
+            return
+        try:
+            with open(self.ruta_catalogo, 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+        except (OSError, ValueError):
+            return
+        for id, info in datos.items():
+            ruta = info.get('ruta', '')
+            if ruta and not os.path.isabs(ruta):
+                ruta = os.path.join(SCRIPT_DIR, ruta)
+            self.catalogo[id] = {'ruta': ruta, 'nombre': info.get('nombre')}
+
+    def guardar_catalogo(self):
+        try:
+            with open(self.ruta_catalogo, 'w', encoding='utf-8') as f:
+                json.dump(self.catalogo, f, ensure_ascii=False, indent=2)
+        except OSError as ex:
+            raise TorneoError(f"No se pudo guardar el catálogo de torneos: {ex}") from ex
+
+    def registrar(self, id, ruta, nombre=None):
+        """Agrega (o actualiza) una competición al catálogo. No la carga."""
+        self.catalogo[id] = {'ruta': ruta, 'nombre': nombre}
+
+    def ids(self):
+        return list(self.catalogo)
+
+    def residentes(self):
+        return list(self._residentes)
+
+    def memoria(self):
+        return sum(estimar_memoria(t) for t in self._residentes.values())
+
+    # ------------------------------------------------------------
+    def abrir(self, id=None):
+        """Devuelve el Torneo `id` (o el activo); sólo lee el disco si no estaba cargado."""
+        id = id or self.activo
+        torneo = self._residentes.get(id)
+        if torneo is not None:
+            self._residentes.move_to_end(id)
+            return torneo
+        if id not in self.catalogo:
+            raise TorneoError(f"Torneo desconocido: {id}")
+        torneo = self._en_uso.get(id)
+        if torneo is None:
+            info = self.catalogo[id]
+            opciones = {'nombre': info['nombre']} if info.get('nombre') else {}
+            torneo = Torneo(ruta=info['ruta'], escritor=self.escritor, **opciones)
+            if hasattr(torneo.almacen, 'cerrar'):  # SQLite: soltar la conexión cuando se libera el torneo
+                weakref.finalize(torneo, torneo.almacen.cerrar)
+            self._en_uso[id] = torneo
+        self._residentes[id] = torneo
+        self._liberar(conservar=id)
+        return torneo
+
+    def activar(self, id):
+        """Cambia la competición con la que trabajan las pantallas."""
+        torneo = self.abrir(id)
+        self.activo = id
+        return torneo
+
+    def descargar(self, id):
+        """Guarda el torneo y lo saca de memoria (si nadie más lo usa)."""
+        torneo = self._residentes.get(id)
+        if torneo is not None:
+            torneo.guardar_datos()
+            # los derivados siguen enganchados: una pantalla abierta los sigue usando
+            del self._residentes[id]
+
+    def _liberar(self, conservar):
+        while len(self._residentes) > 1 and (
+                len(self._residentes) > self.max_residentes or self.memoria() > self.memoria_maxima):
+            id = next(i for i in self._residentes if i != conservar)
+            try:
+                self.descargar(id)
+            except TorneoError:
+                # si no se pudo guardar, mejor seguir ocupando memoria que perder datos
+                self._residentes.move_to_end(id)
+                break
+
+    def guardar_todos(self):
+        for torneo in self._residentes.values():
+            torneo.guardar_datos()
+
+
+# registro único del proceso: las pantallas piden el torneo activo con torneo_activo()
+# y sus guardados se escriben en segundo plano
+registro = RegistroTorneos(escritor=trabajador)
+
+
+def torneo_activo():
+    return registro.abrir()
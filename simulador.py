@@ -0,0 +1,274 @@
+# simulador.py
+import numpy as np
+from desempate import puntos_fair_play
+import cruces
+
+# nombres de las rondas contando desde la final hacia atrás
+NOMBRES_RONDAS = ["Final", "Semifinal", "Cuartos", "Octavos", "Dieciseisavos", "Treintaidosavos"]
+
+
+class ModeloPoisson:
+    """
+    Goles de cada equipo ~ Poisson(media * fuerza_propia / fuerza_rival).
+    Sin fuerzas todos los equipos son iguales.
+    """
+    def __init__(self, media=1.3, fuerza=None):
+        self.media = media
+        self.fuerza = fuerza or {}
+
+    def lambdas(self, ids):
+        return np.array([self.fuerza.get(i, 1.0) for i in ids], dtype=np.float64)
+
+    def muestrear(self, rng, f1, f2):
+        """f1, f2: arrays de fuerzas (misma forma). Devuelve (goles1, goles2)."""
+        return rng.poisson(self.media * f1 / f2), rng.poisson(self.media * f2 / f1)
+
+
+def _orden_llave(n):
+    """Orden de cabezas de serie en una llave de n (1 vs n, 2 vs n-1, ... sin cruzarse antes de tiempo)."""
+    orden = [1]
+    while len(orden) < n:
+        m = len(orden) * 2
+        orden = [x for s in orden for x in (s, m + 1 - s)]
+    return np.array(orden) - 1
+
+
+class SimuladorTorneo:
+    """
+    Simula el resto del torneo muchas veces a partir de los resultados ya cargados
+    en torneo.calendario. Todo se calcula sobre arrays (simulaciones x equipos),
+    sin recorrer objetos Partido dentro del bucle de simulación. Los grupos pueden
+    tener distinta cantidad de equipos: las tablas se completan hasta el grupo más
+    grande con el índice self.hueco, que nunca clasifica ni se cuenta.
+    """
+    def __init__(self, torneo, modelo=None, semilla=None):
+        self.torneo = torneo
+        self.modelo = modelo or ModeloPoisson()
+        self.rng = np.random.default_rng(semilla)
+        self._preparar()
+
+    # ------------------------------------------------------------
+    def _preparar(self):
+        t = self.torneo
+        self.grupos = sorted(g for g in t.grupos if t.calcular_tabla_posiciones(g))
+        self.ids = [e.identificador for g in self.grupos for e in t.calcular_tabla_posiciones(g)]
+        self.idx = {id: i for i, id in enumerate(self.ids)}
+        self.miembros = [np.array([self.idx[e.identificador] for e in t.calcular_tabla_posiciones(g)])
+                         for g in self.grupos]
+        T = len(self.ids)
+        self.hueco = T  # puesto vacío en los grupos más chicos
+        self.k_max = max((len(m) for m in self.miembros), default=0)
+        self.fuerza = self.modelo.lambdas(self.ids)
+        self.fair_play = np.array([puntos_fair_play(t.equipos[id].stats) for id in self.ids], dtype=np.float64)
+        self.sorteo = np.array([t.sorteo(id) for id in self.ids])
+
+        # puntos/goles ya jugados (fijos) y partidos pendientes de grupo
+        self.pts0 = np.zeros(T); self.gf0 = np.zeros(T); self.gc0 = np.zeros(T)
+        pend1, pend2 = [], []
+        for p in t.partidos_por_fase("Fase de Grupos").values():
+            a, b = self.idx.get(p.id_equipo1), self.idx.get(p.id_equipo2)
+            if a is None or b is None:
+                continue
+            if p.goles_e1 is None or p.goles_e2 is None:
+                pend1.append(a); pend2.append(b)
+                continue
+            g1, g2 = p.goles_e1, p.goles_e2
+            self.gf0[a] += g1; self.gc0[a] += g2
+            self.gf0[b] += g2; self.gc0[b] += g1
+            self.pts0[a] += 3 if g1 > g2 else (1 if g1 == g2 else 0)
+            self.pts0[b] += 3 if g2 > g1 else (1 if g1 == g2 else 0)
+        self.pend1 = np.array(pend1, dtype=np.intp)
+        self.pend2 = np.array(pend2, dtype=np.intp)
+        # matrices de incidencia partido pendiente -> equipo
+        self.inc1 = np.zeros((len(pend1), T)); self.inc1[np.arange(len(pend1)), self.pend1] = 1
+        self.inc2 = np.zeros((len(pend2), T)); self.inc2[np.arange(len(pend2)), self.pend2] = 1
+
+        # enfrentamientos directos ya jugados (matrices del grupo en el orden de self.miembros)
+        # y, por grupo, qué partidos pendientes son entre sus equipos
+        local = {}
+        for gi, m in enumerate(self.miembros):
+            for li, i in enumerate(m):
+                local[i] = (gi, li)
+        self.h2h_puntos0, self.h2h_goles0, self.pend_grupo = [], [], []
+        for gi, (g, m) in enumerate(zip(self.grupos, self.miembros)):
+            posiciones, puntos, goles = t.enfrentamientos_directos(g)
+            orden = [posiciones[self.ids[i]] for i in m]
+            self.h2h_puntos0.append(np.array(puntos, dtype=np.float64).reshape(len(puntos), -1)[np.ix_(orden, orden)])
+            self.h2h_goles0.append(np.array(goles, dtype=np.float64).reshape(len(goles), -1)[np.ix_(orden, orden)])
+            # incidencia partido pendiente -> celda (i, j) de la matriz k x k aplanada
+            k = len(m)
+            columnas = [c for c, (a, b) in enumerate(zip(pend1, pend2)) if local[a][0] == gi and local[b][0] == gi]
+            ij = np.zeros((len(columnas), k * k)); ji = np.zeros((len(columnas), k * k))
+            for fila, c in enumerate(columnas):
+                i, j = local[pend1[c]][1], local[pend2[c]][1]
+                ij[fila, i * k + j] = 1
+                ji[fila, j * k + i] = 1
+            self.pend_grupo.append((np.array(columnas, dtype=np.intp), ij, ji))
+
+        # eliminatorias ya jugadas: ganador_fijo[a, b] = índice del ganador o -1
+        self.ganador_fijo = np.full((T, T), -1, dtype=np.intp)
+        for fase in t.fases():
+            if fase == "Fase de Grupos":
+                continue
+            for p in t.partidos_por_fase(fase).values():
+                a, b = self.idx.get(p.id_equipo1), self.idx.get(p.id_equipo2)
+                if a is None or b is None or p.goles_e1 is None or p.goles_e2 is None or p.goles_e1 == p.goles_e2:
+                    continue
+                ganador = a if p.goles_e1 > p.goles_e2 else b
+                self.ganador_fijo[a, b] = self.ganador_fijo[b, a] = ganador
+
+        # tamaño de la llave: potencia de 2 que entra con 1° y 2° de cada grupo,
+        # completada con los mejores terceros (si alcanzan)
+        G = len(self.grupos)
+        hay_terceros = bool(self.miembros) and min(len(m) for m in self.miembros) >= 3
+        disponibles = sum(min(len(m), 3 if hay_terceros else 2) for m in self.miembros)
+        self.tam_llave = 1
+        while self.tam_llave < 2 * G:
+            self.tam_llave *= 2
+        while self.tam_llave > disponibles:
+            self.tam_llave //= 2
+        self.n_terceros = max(0, self.tam_llave - 2 * G)
+        self.rondas = NOMBRES_RONDAS[:int(np.log2(self.tam_llave))][::-1] if self.tam_llave > 1 else []
+
+        # formato del Mundial (6 grupos, 4 mejores terceros): cruces reales de cruces.py
+        self.puestos_octavos = None
+        if self.grupos == list(cruces.GRUPOS) and self.tam_llave == 16 and self.n_terceros == 4:
+            self.puestos_octavos = []
+            for _, local, visitante in cruces.OCTAVOS:
+                for puesto in (local, visitante):
+                    lugar, grupos = puesto.split("°")
+                    if lugar == "3":
+                        self.puestos_octavos.append((2, cruces.RIVALES_DE_TERCEROS.index(cruces.rival_del_puesto(puesto))))
+                    else:
+                        self.puestos_octavos.append((int(lugar) - 1, cruces.GRUPOS.index(grupos)))
+            self.tabla_terceros = np.array([r if r else (0,) * 4 for r in cruces.TERCEROS_POR_MASCARA], dtype=np.intp)
+
+    # ------------------------------------------------------------
+    @staticmethod
+    def _base(pts, gf, gc):
+        # Pts, DG, GF empaquetados en un número (exacto en float64 para valores de fase de grupos)
+        return pts * 1e6 + (gf - gc + 500) * 1e3 + gf
+
+    def _fase_grupos(self, n):
+        pts = np.broadcast_to(self.pts0, (n, len(self.ids))).copy()
+        gf = np.broadcast_to(self.gf0, (n, len(self.ids))).copy()
+        gc = np.broadcast_to(self.gc0, (n, len(self.ids))).copy()
+        g1 = g2 = np.empty((n, 0))
+        if len(self.pend1):
+            g1, g2 = self.modelo.muestrear(self.rng,
+                                           np.broadcast_to(self.fuerza[self.pend1], (n, len(self.pend1))),
+                                           np.broadcast_to(self.fuerza[self.pend2], (n, len(self.pend2))))
+            p1 = 3 * (g1 > g2) + (g1 == g2)
+            p2 = 3 * (g2 > g1) + (g1 == g2)
+            pts += p1 @ self.inc1 + p2 @ self.inc2
+            gf += g1 @ self.inc1 + g2 @ self.inc2
+            gc += g2 @ self.inc1 + g1 @ self.inc2
+        return self._base(pts, gf, gc), g1, g2
+
+    def _posiciones(self, base, g1, g2):
+        """
+        Devuelve (n, G, k) con el índice global del equipo en cada puesto de cada grupo,
+        con los mismos criterios que desempate.py: Pts, DG, GF; entre empatados,
+        enfrentamiento directo; juego limpio; sorteo. También devuelve el puntaje
+        para comparar equipos de grupos distintos (sin enfrentamiento directo), con
+        una columna más para self.hueco que queda detrás de todos.
+        """
+        n = base.shape[0]
+        puntaje = base * 1e3 + (self.fair_play + 500) + (1 - self.sorteo) * 0.5
+        puntaje = np.concatenate([puntaje, np.full((n, 1), -np.inf)], axis=1)
+        tablas = np.full((n, len(self.miembros), self.k_max), self.hueco, dtype=np.intp)
+        for gi, m in enumerate(self.miembros):
+            k = len(m)
+            bg = base[:, m]
+            # el enfrentamiento directo sólo se calcula en las simulaciones con algún empate
+            empate = bg[:, :, None] == bg[:, None, :]
+            filas = np.flatnonzero(empate.sum((1, 2)) > k)
+            directo = np.zeros((n, k))
+            if len(filas):
+                r, empate = len(filas), empate[filas]
+                hp = np.broadcast_to(self.h2h_puntos0[gi], (r, k, k))
+                hg = np.broadcast_to(self.h2h_goles0[gi], (r, k, k))
+                columnas, ij, ji = self.pend_grupo[gi]
+                if len(columnas):
+                    a, b = g1[filas][:, columnas], g2[filas][:, columnas]
+                    hp = hp + ((3 * (a > b) + (a == b)) @ ij + (3 * (b > a) + (a == b)) @ ji).reshape(r, k, k)
+                    hg = hg + (a @ ij + b @ ji).reshape(r, k, k)
+                h_f = (hg * empate).sum(2)
+                h_c = (hg.transpose(0, 2, 1) * empate).sum(2)
+                directo[filas] = self._base((hp * empate).sum(2), h_f, h_c)
+            fp = np.broadcast_to(self.fair_play[m], (n, k))
+            sorteo = np.broadcast_to(self.sorteo[m], (n, k))
+            orden = np.lexsort((sorteo, -fp, -directo, -bg), axis=-1)
+            tablas[:, gi, :k] = m[orden]
+        return tablas, puntaje
+
+    def _armar_llave(self, tablas, puntaje):
+        """Clasificados en orden de llave (n, tam_llave) y los terceros que pasan (n, n_terceros)."""
+        n = tablas.shape[0]
+        filas = np.arange(n)[:, None]
+
+        def por_puntaje(eq):
+            return eq[filas, np.argsort(-puntaje[filas, eq], axis=1)]
+
+        if self.puestos_octavos:
+            # grupos de los 4 mejores terceros -> máscara -> fila de la tabla de terceros
+            grupos_terceros = np.argsort(-puntaje[filas, tablas[:, :, 2]], axis=1)[:, :self.n_terceros]
+            rivales = self.tabla_terceros[(1 << grupos_terceros).sum(axis=1)]
+            llave = np.stack([tablas[filas[:, 0], rivales[:, g], 2] if lugar == 2 else tablas[:, g, lugar]
+                              for lugar, g in self.puestos_octavos], axis=1)
+            return llave, tablas[filas, grupos_terceros, 2]
+
+        primeros, segundos = por_puntaje(tablas[:, :, 0]), por_puntaje(tablas[:, :, 1])
+        if self.n_terceros:
+            terceros = por_puntaje(tablas[:, :, 2])[:, :self.n_terceros]
+        else:
+            terceros = np.empty((n, 0), dtype=np.intp)
+        sembrados = np.concatenate([primeros, segundos, terceros], axis=1)
+        # los huecos (grupos sin segundo) pasan al final, detrás de los terceros
+        sembrados = np.take_along_axis(sembrados, np.argsort(sembrados == self.hueco, axis=1, kind='stable'), axis=1)
+        sembrados = sembrados[:, :self.tam_llave]
+        return sembrados[:, _orden_llave(self.tam_llave)], terceros
+
+    def _jugar_ronda(self, llave):
+        a, b = llave[:, 0::2], llave[:, 1::2]
+        g1, g2 = self.modelo.muestrear(self.rng, self.fuerza[a], self.fuerza[b])
+        # empate: penales al 50 %
+        gana_a = (g1 > g2) | ((g1 == g2) & (self.rng.random(g1.shape) < 0.5))
+        ganador = np.where(gana_a, a, b)
+        fijo = self.ganador_fijo[a, b]
+        return np.where(fijo >= 0, fijo, ganador)
+
+    # ------------------------------------------------------------
+    def simular(self, n=100_000, lote=25_000):
+        """
+        Corre n torneos y devuelve {pais: {'1°': p, '2°': p, '3°': p, 'Mejor 3°': p,
+        <ronda>: p, ..., 'Campeón': p}} con probabilidades entre 0 y 1.
+        """
+        T = len(self.ids)
+        conteo = {c: np.zeros(T) for c in ['1°', '2°', '3°', 'Mejor 3°'] + self.rondas + ['Campeón']}
+        hechos = 0
+        while hechos < n:
+            m = min(lote, n - hechos)
+            tablas, puntaje = self._posiciones(*self._fase_grupos(m))
+            for puesto, clave in enumerate(['1°', '2°', '3°'][:tablas.shape[2]]):
+                conteo[clave] += np.bincount(tablas[:, :, puesto].ravel(), minlength=T + 1)[:T]
+            if self.rondas:
+                llave, terceros = self._armar_llave(tablas, puntaje)
+                conteo['Mejor 3°'] += np.bincount(terceros.ravel(), minlength=T)
+                for ronda in self.rondas:
+                    conteo[ronda] += np.bincount(llave.ravel(), minlength=T)
+                    llave = self._jugar_ronda(llave)
+                conteo['Campeón'] += np.bincount(llave.ravel(), minlength=T)
+            hechos += m
+        return {self.torneo.equipos[id].pais: {c: float(v[i] / n) for c, v in conteo.items()}
+                for i, id in enumerate(self.ids)}
+
+
+if __name__ == "__main__":
+    import time
+    from core import Torneo
+    inicio = time.perf_counter()
+    resultado = SimuladorTorneo(Torneo()).simular()
+    print(f"Simulación terminada en {time.perf_counter() - inicio:.2f} s")
+    for pais, probs in sorted(resultado.items(), key=lambda x: -x[1].get('Campeón', 0)):
+        print(f"{pais:20s} " + "  ".join(f"{c}: {p:6.1%}" for c, p in probs.items()))
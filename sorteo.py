@@ -0,0 +1,228 @@
+# sorteo.py
+import random
+from collections import Counter
+from core import TorneoError
+from fixture import nombres_grupos
+
+# máximo de equipos de una misma confederación por grupo (UEFA puede repetir, como en FIFA)
+MAXIMO_POR_CONFEDERACION = 1
+MAXIMOS_CONFEDERACION = {"UEFA": 2}
+MAXIMO_ESTADOS = 500_000  # estados recordados antes de vaciar la memoria de la búsqueda
+
+
+def armar_bombos(equipos, n_grupos, bombos=None):
+    """
+    Reparte los equipos en bombos de n_grupos equipos. Si bombos ({país: número}) trae
+    a todos los equipos se usa ese número; si no, el orden de la lista (los primeros
+    n_grupos al bombo 1, los siguientes al 2, ...).
+    """
+    if bombos and all(bombos.get(e) is not None for e in equipos):
+        resultado = [[e for e in equipos if bombos[e] == n] for n in sorted({bombos[e] for e in equipos})]
+    else:
+        resultado = [equipos[i:i + n_grupos] for i in range(0, len(equipos), n_grupos)]
+    for i, bombo in enumerate(resultado, start=1):
+        if len(bombo) != n_grupos:
+            raise TorneoError(f"El bombo {i} tiene {len(bombo)} equipos y hay {n_grupos} grupos.")
+    return resultado
+
+
+class Sorteo:
+    """
+    Sorteo por bombos con máximos por confederación: del bombo 1 al último se saca un
+    equipo al azar y va a un grupo elegido al azar, con la misma probabilidad, entre los
+    que todavía no tienen equipo de ese bombo, no superan el máximo de su confederación
+    y dejan el resto del sorteo completable. Como ningún grupo tiene preferencia, cada
+    equipo cae en cada grupo con probabilidad 1/n_grupos. Lo completable lo decide una
+    búsqueda con vuelta atrás sobre máscaras de bits (grupos libres del bombo, grupos
+    llenos por confederación) que recuerda los estados ya resueltos; en el último bombo
+    basta la condición de Hall. El sorteo nunca se traba y los siguientes reusan lo calculado.
+    """
+    def __init__(self, bombos, confederaciones, maximos=None, maximo=MAXIMO_POR_CONFEDERACION):
+        self.bombos = [list(b) for b in bombos]
+        self.n_grupos = len(self.bombos[0]) if self.bombos else 0
+        if not self.n_grupos or any(len(b) != self.n_grupos for b in self.bombos):
+            raise TorneoError("Todos los bombos deben tener un equipo por grupo.")
+        maximos = MAXIMOS_CONFEDERACION if maximos is None else maximos
+        nombres = sorted({confederaciones.get(e) or "" for b in self.bombos for e in b})
+        indice = {c: i for i, c in enumerate(nombres)}
+        # sin confederación conocida no hay restricción
+        self._limite = [maximos.get(c, maximo) if c else len(self.bombos) for c in nombres]
+        self._conf = {e: indice[confederaciones.get(e) or ""] for b in self.bombos for e in b}
+        base = len(self.bombos) + 1  # una cuenta nunca llega a la cantidad de bombos + 1
+        self._peso = [base ** i for i in range(len(nombres))]
+        self._confs_bombo = [sorted(self._conf[e] for e in b) for b in self.bombos]
+        self.grupos = nombres_grupos(self.n_grupos)
+        self._todos = (1 << self.n_grupos) - 1
+        self._resueltos = {}  # estado (grupos ordenados, así los equivalentes comparten) -> completable
+        self._reiniciar()
+        if not self._completable(0, self._confs_bombo[0], self._todos):
+            raise TorneoError("Ningún sorteo respeta los máximos por confederación con estos bombos.")
+
+    # ============================ BÚSQUEDA ============================
+    def _reiniciar(self):
+        self._cuentas = [[0] * len(self._limite) for _ in range(self.n_grupos)]
+        self._llenos = [0] * len(self._limite)  # confederación -> máscara de grupos en el máximo
+        self._firmas = [0] * self.n_grupos      # grupo -> cuentas codificadas en un entero
+
+    def _poner(self, g, c):
+        self._cuentas[g][c] += 1
+        self._firmas[g] += self._peso[c]
+        if self._cuentas[g][c] == self._limite[c]:
+            self._llenos[c] |= 1 << g
+
+    def _sacar(self, g, c):
+        self._cuentas[g][c] -= 1
+        self._firmas[g] -= self._peso[c]
+        self._llenos[c] &= ~(1 << g)
+
+    def _estado(self, libres):
+        """Grupos ordenados (cuentas y si siguen libres): estados equivalentes dan la misma clave."""
+        return tuple(sorted([f * 2 + (libres >> g & 1) for g, f in enumerate(self._firmas)]))
+
+    def _reparto_posible(self, pendientes, libres):
+        """
+        ¿Entran los equipos pendientes del bombo en los grupos libres? Los de una misma
+        confederación admiten los mismos grupos, así que alcanza con la condición de Hall
+        sobre conjuntos de confederaciones: ninguna combinación pide más grupos de los que
+        admite entre todas.
+        """
+        admitidos, pedidos = [], []
+        for i, c in enumerate(pendientes):  # ordenados: las de una misma confederación van juntas
+            if i and c == pendientes[i - 1]:
+                pedidos[-1] += 1
+            else:
+                admitidos.append(libres & ~self._llenos[c])
+                pedidos.append(1)
+        union = [0] * (1 << len(pedidos))
+        total = [0] * (1 << len(pedidos))
+        for mascara in range(1, 1 << len(pedidos)):
+            bajo = (mascara & -mascara).bit_length() - 1
+            anterior = mascara & (mascara - 1)
+            union[mascara] = union[anterior] | admitidos[bajo]
+            total[mascara] = total[anterior] + pedidos[bajo]
+            if union[mascara].bit_count() < total[mascara]:
+                return False
+        return True
+
+    def _completable(self, k, pendientes, libres):
+        """¿Se pueden ubicar los equipos pendientes del bombo k (sus confederaciones) y todos los de los bombos siguientes?"""
+        if not pendientes:
+            k += 1
+            if k == len(self.bombos):
+                return True
+            pendientes, libres = self._confs_bombo[k], self._todos
+        if k == len(self.bombos) - 1:
+            return self._reparto_posible(pendientes, libres)
+        clave = (k, tuple(pendientes), self._estado(libres))
+        resuelto = self._resueltos.get(clave)
+        if resuelto is not None:
+            return resuelto
+
+        # primero la confederación con menos grupos posibles
+        mejor = None
+        for c in set(pendientes):
+            permitidos = libres & ~self._llenos[c]
+            cantidad = bin(permitidos).count("1")
+            if mejor is None or cantidad < mejor[0]:
+                mejor = (cantidad, c, permitidos)
+        _, c, permitidos = mejor
+        resto = list(pendientes)
+        resto.remove(c)
+
+        ok = False
+        probados = set()
+        while permitidos and not ok:
+            bit = permitidos & -permitidos
+            permitidos ^= bit
+            g = bit.bit_length() - 1
+            firma = self._firmas[g]
+            if firma in probados:  # mismo contenido que un grupo ya probado: mismo resultado
+                continue
+            probados.add(firma)
+            self._poner(g, c)
+            ok = self._completable(k, resto, libres & ~bit)
+            self._sacar(g, c)
+        if len(self._resueltos) >= MAXIMO_ESTADOS:
+            self._resueltos.clear()
+        self._resueltos[clave] = ok
+        return ok
+
+    # ============================ SORTEO ============================
+    def sortear(self, rng=random):
+        """Un sorteo completo: {grupo: [equipo del bombo 1, del bombo 2, ...]}."""
+        self._reiniciar()
+        grupos = [[] for _ in range(self.n_grupos)]
+        for k, bombo in enumerate(self.bombos):
+            orden = list(bombo)
+            rng.shuffle(orden)
+            libres = self._todos
+            pendientes = sorted(self._conf[e] for e in orden)
+            for equipo in orden:
+                c = self._conf[equipo]
+                pendientes.remove(c)
+                # un grupo al azar entre los permitidos hasta dar con uno que deja el sorteo
+                # completable: queda elegido con la misma probabilidad entre los posibles.
+                # Grupos con la misma firma son intercambiables (sirven todos o ninguno), así
+                # que un rechazo descarta a todos y si sólo queda una firma no hace falta probar.
+                permitidos = [g for g in range(self.n_grupos) if (libres & ~self._llenos[c]) >> g & 1]
+                while True:
+                    if not permitidos:  # no pasa: el estado anterior era completable
+                        raise TorneoError(f"No hay grupo posible para {equipo}.")
+                    g = permitidos[rng.randrange(len(permitidos))]
+                    firma = self._firmas[g]
+                    otros = [h for h in permitidos if self._firmas[h] != firma]
+                    self._poner(g, c)
+                    if not otros or self._completable(k, pendientes, libres & ~(1 << g)):
+                        break
+                    self._sacar(g, c)
+                    permitidos = otros
+                grupos[g].append(equipo)
+                libres &= ~(1 << g)
+        return dict(zip(self.grupos, grupos))
+
+    def muestrear(self, cantidad, semilla=None):
+        """Genera `cantidad` sorteos independientes (reproducibles con la misma semilla)."""
+        rng = random.Random(semilla)
+        for _ in range(cantidad):
+            yield self.sortear(rng)
+
+
+def analizar_equidad(sorteos):
+    """
+    Frecuencias sobre muchos sorteos: {equipo: {grupo: proporción}} y
+    {(equipo, equipo): proporción de sorteos en que comparten grupo}. Con un
+    procedimiento parejo cada equipo cae en cada grupo con proporción 1/n_grupos.
+    """
+    en_grupo = Counter()
+    rivales = Counter()
+    total = 0
+    for sorteo in sorteos:
+        total += 1
+        for g, equipos in sorteo.items():
+            for i, e in enumerate(equipos):
+                en_grupo[(e, g)] += 1
+                for otro in equipos[i + 1:]:
+                    rivales[tuple(sorted((e, otro)))] += 1
+    if not total:
+        return {}, {}
+    por_equipo = {}
+    for (e, g), n in en_grupo.items():
+        por_equipo.setdefault(e, {})[g] = n / total
+    return por_equipo, {par: n / total for par, n in rivales.items()}
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    from core import load_teams_from_excel, load_team_info_from_excel
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    info = load_team_info_from_excel()
+    equipos = load_teams_from_excel()
+    n_grupos = len(equipos) // 4
+    sorteo = Sorteo(armar_bombos(equipos[:n_grupos * 4], n_grupos, {e: d['bombo'] for e, d in info.items()}),
+                    {e: d['confederacion'] for e, d in info.items()})
+    inicio = time.perf_counter()
+    por_equipo, _ = analizar_equidad(sorteo.muestrear(cantidad, semilla=0))
+    print(f"{cantidad} sorteos en {time.perf_counter() - inicio:.2f} s (esperado por grupo: {1 / n_grupos:.1%})")
+    for e in equipos[:n_grupos * 4]:
+        print(f"{e:20s} " + "  ".join(f"{g}: {por_equipo[e].get(g, 0):6.1%}" for g in sorteo.grupos))
@@ -0,0 +1,237 @@
+# storage.py
+import os
+import json
+import sqlite3
+import threading
+
+# el diario se compacta cuando pesa más que esta fracción de la instantánea: cada
+# reescritura completa se paga con escrituras chicas proporcionales a su tamaño,
+# así el costo promedio por guardado no crece con el calendario
+PROPORCION_DIARIO = 0.5
+DIARIO_MIN_BYTES = 64 * 1024  # con instantáneas chicas no vale la pena compactar antes
+
+# ============================================================
+# 🔹 Almacenamiento del torneo
+# ============================================================
+# Cada almacén sabe guardar el torneo completo, guardar sólo algunos partidos/equipos
+# y devolver los datos guardados como una secuencia de "registros":
+#   {'t': datos generales, 'e': {id: equipo}, 'p': {id: partido}}
+# que Torneo aplica en orden al cargar.
+
+
+class AlmacenJSON:
+    """
+    Instantánea JSON + diario de cambios (una línea por modificación).
+    El diario se compacta en la instantánea cuando sus bytes pasan PROPORCION_DIARIO
+    de los de la instantánea. Los bytes se cuentan al pedir el guardado (anotar_*),
+    no al escribirlo: con un escritor en segundo plano las escrituras llegan después.
+    """
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.diario = os.path.splitext(ruta)[0] + '.journal'
+        self._bytes_diario = 0
+        self._bytes_instantanea = 0
+        self._compactando = False  # hay un guardado completo pedido que todavía no se escribió
+
+    def guardar_todo(self, datos_torneo, equipos, partidos):
+        # se escribe a un temporal y se reemplaza, así un corte nunca deja el JSON truncado
+        data = {'torneo': datos_torneo, 'equipos': equipos, 'calendario': partidos}
+        tmp = self.ruta + '.tmp'
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+                f.flush()
+                os.fsync(f.fileno())
+                self._bytes_instantanea = f.tell()
+            os.replace(tmp, self.ruta)
+            # el diario ya quedó incluido en la instantánea
+            if os.path.exists(self.diario):
+                os.remove(self.diario)
+        finally:
+            self._compactando = False
+
+    @staticmethod
+    def _linea(datos_torneo, equipos, partidos):
+        registro = {'t': datos_torneo}
+        if partidos:
+            registro['p'] = partidos
+        if equipos:
+            registro['e'] = equipos
+        return (json.dumps(registro, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+
+    def guardar_cambios(self, datos_torneo, equipos, partidos):
+        with open(self.diario, 'ab') as f:
+            f.write(self._linea(datos_torneo, equipos, partidos))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def anotar_cambios(self, datos_torneo, equipos, partidos):
+        """Cuenta un guardado parcial pedido (escrito ya o encolado)."""
+        self._bytes_diario += len(self._linea(datos_torneo, equipos, partidos))
+
+    def anotar_compactacion(self):
+        """Un guardado completo pedido: lo que siga va a un diario nuevo."""
+        self._bytes_diario = 0
+        self._compactando = True
+
+    def necesita_compactar(self):
+        if self._compactando:  # ya hay una en camino (p. ej. encolada en el trabajador)
+            return False
+        return self._bytes_diario > PROPORCION_DIARIO * max(self._bytes_instantanea, DIARIO_MIN_BYTES)
+
+    def cargar(self):
+        registros = []
+        if os.path.exists(self.ruta):
+            try:
+                with open(self.ruta, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except Exception:
+                data = {}
+            registros.append({'t': data.get('torneo', {}),
+                              'e': data.get('equipos', {}),
+                              'p': data.get('calendario', {})})
+
+        self._bytes_instantanea = os.path.getsize(self.ruta) if os.path.exists(self.ruta) else 0
+        self._bytes_diario = 0
+        if os.path.exists(self.diario):
+            with open(self.diario, 'rb') as f:
+                for linea in f:
+                    try:
+                        registros.append(json.loads(linea))
+                    except ValueError:
+                        break  # última línea cortada por una caída: se descarta
+                    self._bytes_diario += len(linea)
+        return registros
+
+
+class AlmacenSQLite:
+    """
+    Base SQLite con tablas de equipos, partidos y estadísticas por jugador.
+    Cada guardar_cambios es una transacción chica con los registros modificados.
+    """
+    ESQUEMA = """
+        CREATE TABLE IF NOT EXISTS torneo (
+            clave TEXT PRIMARY KEY,
+            valor TEXT
+        );
+        CREATE TABLE IF NOT EXISTS equipos (
+            identificador TEXT PRIMARY KEY,
+            pais TEXT NOT NULL,
+            abreviatura TEXT,
+            confederacion TEXT,
+            grupo TEXT,
+            stats TEXT
+        );
+        CREATE TABLE IF NOT EXISTS partidos (
+            id TEXT PRIMARY KEY,
+            id_equipo1 TEXT NOT NULL,
+            id_equipo2 TEXT NOT NULL,
+            fecha TEXT,
+            hora TEXT,
+            fase TEXT,
+            goles_e1 INTEGER,
+            goles_e2 INTEGER,
+            tarj_ama_e1 INTEGER DEFAULT 0,
+            tarj_ama_e2 INTEGER DEFAULT 0,
+            tarj_roja_e1 INTEGER DEFAULT 0,
+            tarj_roja_e2 INTEGER DEFAULT 0,
+            sede TEXT
+        );
+        CREATE TABLE IF NOT EXISTS jugador_stats (
+            partido_id TEXT NOT NULL,
+            orden INTEGER NOT NULL,
+            datos TEXT,
+            PRIMARY KEY (partido_id, orden)
+        );
+        CREATE INDEX IF NOT EXISTS idx_equipos_grupo ON equipos(grupo);
+        CREATE INDEX IF NOT EXISTS idx_partidos_fase ON partidos(fase);
+        CREATE INDEX IF NOT EXISTS idx_partidos_e1 ON partidos(id_equipo1);
+        CREATE INDEX IF NOT EXISTS idx_partidos_e2 ON partidos(id_equipo2);
+    """
+    CAMPOS_PARTIDO = ('id_equipo1', 'id_equipo2', 'fecha', 'hora', 'fase',
+                      'goles_e1', 'goles_e2', 'tarj_ama_e1', 'tarj_ama_e2',
+                      'tarj_roja_e1', 'tarj_roja_e2', 'sede')
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        # la conexión se comparte con el hilo de guardado (persistencia.py): un lock la serializa
+        self.conn = sqlite3.connect(ruta, check_same_thread=False)
+        self._lock = threading.RLock()
+        self.conn.executescript(self.ESQUEMA)
+        # bases creadas antes de que los partidos tuvieran sede
+        columnas = {fila[1] for fila in self.conn.execute("PRAGMA table_info(partidos)")}
+        if 'sede' not in columnas:
+            self.conn.execute("ALTER TABLE partidos ADD COLUMN sede TEXT")
+            self.conn.commit()
+
+    def _escribir(self, datos_torneo, equipos, partidos):
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO torneo (clave, valor) VALUES (?, ?)",
+            [(k, json.dumps(v, ensure_ascii=False)) for k, v in datos_torneo.items()])
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO equipos VALUES (?, ?, ?, ?, ?, ?)",
+            [(id, e['pais'], e.get('abreviatura', ''), e.get('confederacion', ''), e.get('grupo', ''),
+              json.dumps(e.get('stats', {}), ensure_ascii=False)) for id, e in equipos.items()])
+        self.conn.executemany(
+            f"INSERT OR REPLACE INTO partidos VALUES (?, {', '.join('?' * len(self.CAMPOS_PARTIDO))})",
+            [(id,) + tuple(p.get(c) for c in self.CAMPOS_PARTIDO) for id, p in partidos.items()])
+        if partidos:
+            self.conn.executemany("DELETE FROM jugador_stats WHERE partido_id = ?", [(id,) for id in partidos])
+            self.conn.executemany(
+                "INSERT INTO jugador_stats VALUES (?, ?, ?)",
+                [(id, i, json.dumps(js, ensure_ascii=False))
+                 for id, p in partidos.items() for i, js in enumerate(p.get('jugador_stats') or [])])
+
+    def guardar_todo(self, datos_torneo, equipos, partidos):
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM equipos")
+            self.conn.execute("DELETE FROM partidos")
+            self.conn.execute("DELETE FROM jugador_stats")
+            self._escribir(datos_torneo, equipos, partidos)
+
+    def guardar_cambios(self, datos_torneo, equipos, partidos):
+        with self._lock, self.conn:
+            self._escribir(datos_torneo, equipos, partidos)
+
+    def anotar_cambios(self, datos_torneo, equipos, partidos):
+        pass
+
+    def anotar_compactacion(self):
+        pass
+
+    def necesita_compactar(self):
+        return False
+
+    def cargar(self):
+        with self._lock:
+            return self._cargar()
+
+    def _cargar(self):
+        t = {k: json.loads(v) for k, v in self.conn.execute("SELECT clave, valor FROM torneo")}
+        equipos = {}
+        for id, pais, abrev, conf, grupo, stats in self.conn.execute("SELECT * FROM equipos"):
+            equipos[id] = {'identificador': id, 'pais': pais, 'abreviatura': abrev,
+                           'confederacion': conf, 'grupo': grupo}
+            if stats:
+                equipos[id]['stats'] = json.loads(stats)
+        partidos = {}
+        for fila in self.conn.execute("SELECT * FROM partidos ORDER BY id"):
+            partidos[fila[0]] = dict(zip(self.CAMPOS_PARTIDO, fila[1:]))
+            partidos[fila[0]]['jugador_stats'] = []
+        for id, _, datos in self.conn.execute("SELECT * FROM jugador_stats ORDER BY partido_id, orden"):
+            if id in partidos:
+                partidos[id]['jugador_stats'].append(json.loads(datos))
+        if not t and not equipos and not partidos:
+            return []
+        return [{'t': t, 'e': equipos, 'p': partidos}]
+
+    def cerrar(self):
+        with self._lock:
+            self.conn.close()
+
+
+def crear_almacen(ruta):
+    """Elige el almacén según la extensión del archivo (.db/.sqlite → SQLite, otro → JSON)."""
+    if os.path.splitext(ruta)[1].lower() in ('.db', '.sqlite', '.sqlite3'):
+        return AlmacenSQLite(ruta)
+    return AlmacenJSON(ruta)
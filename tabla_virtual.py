@@ -0,0 +1,150 @@
+# tabla_virtual.py
+import tkinter as tk
+from tkinter import ttk
+
+
+class TablaVirtual(ttk.Frame):
+    """
+    Treeview que sólo tiene creadas las filas que entran en pantalla.
+    Los datos viven en un modelo (clave -> valores); al desplazarse se reutilizan
+    las mismas filas del Treeview con otros valores, y actualizar(clave, ...)
+    toca una sola fila (y sólo si está a la vista).
+    Las filas alternan las etiquetas 'evenrow' / 'oddrow' (configurarlas con
+    tabla.tree.tag_configure). Sin alto_fila se usa el rowheight del estilo del
+    Treeview, leído en cada redimensionado (otra pantalla puede cambiarlo).
+    """
+    def __init__(self, master, columnas, alto_fila=None, **opciones):
+        super().__init__(master)
+        self.columnas = tuple(columnas)
+        self.alto_fila = alto_fila
+        self.claves = []       # orden de las filas del modelo
+        self.filas = {}        # clave -> valores
+        self._indice = {}      # clave -> posición en self.claves
+        self.inicio = 0        # primera fila del modelo a la vista
+        self._huecos = []      # iids de las filas del Treeview, en orden
+        self._seleccion = None
+
+        self.scrollbar = ttk.Scrollbar(self, orient='vertical', command=self._desplazar)
+        self.scrollbar.pack(side='right', fill='y')
+        self.tree = ttk.Treeview(self, columns=self.columnas, show='headings', selectmode='browse', **opciones)
+        for c in self.columnas:
+            self.tree.heading(c, text=c, anchor='center')
+            self.tree.column(c, anchor='center', stretch=True)
+        self.tree.pack(fill='both', expand=True)
+
+        self.tree.bind('<Configure>', self._al_redimensionar)
+        self.tree.bind('<<TreeviewSelect>>', self._al_seleccionar)
+        self.tree.bind('<MouseWheel>', lambda e: self._mover(-1 if e.delta > 0 else 1, 'units'))
+        self.tree.bind('<Button-4>', lambda e: self._mover(-1, 'units'))
+        self.tree.bind('<Button-5>', lambda e: self._mover(1, 'units'))
+        self.tree.bind('<Up>', lambda e: self._mover_seleccion(-1))
+        self.tree.bind('<Down>', lambda e: self._mover_seleccion(1))
+        self.tree.bind('<Prior>', lambda e: self._mover(-1, 'pages'))
+        self.tree.bind('<Next>', lambda e: self._mover(1, 'pages'))
+
+    # ============================ MODELO ============================
+    def cargar(self, filas):
+        """Reemplaza todos los datos: filas es un iterable de (clave, valores)."""
+        self.claves = []
+        self.filas = {}
+        for clave, valores in filas:
+            self.claves.append(clave)
+            self.filas[clave] = tuple(valores)
+        self._indice = {clave: i for i, clave in enumerate(self.claves)}
+        self.inicio = 0
+        if self._seleccion not in self.filas:
+            self._seleccion = None
+        self._dibujar()
+
+    def actualizar(self, clave, valores):
+        """Cambia los valores de una fila; si está a la vista se redibuja sólo esa."""
+        if clave not in self.filas:
+            return
+        self.filas[clave] = tuple(valores)
+        hueco = self._indice[clave] - self.inicio
+        if 0 <= hueco < len(self._huecos):
+            self.tree.item(self._huecos[hueco], values=self.filas[clave])
+
+    def valores(self, clave):
+        return self.filas.get(clave)
+
+    def seleccion(self):
+        """Clave de la fila seleccionada (o None)."""
+        return self._seleccion
+
+    # ============================ VISTA ============================
+    def _dibujar(self):
+        total = len(self.claves)
+        visibles = len(self._huecos)
+        self.inicio = max(0, min(self.inicio, total - visibles))
+        seleccionado = None
+        for hueco, iid in enumerate(self._huecos):
+            i = self.inicio + hueco
+            if i < total:
+                clave = self.claves[i]
+                self.tree.item(iid, values=self.filas[clave], tags=('evenrow' if i % 2 == 0 else 'oddrow',))
+                if clave == self._seleccion:
+                    seleccionado = iid
+            else:
+                self.tree.item(iid, values=(), tags=())
+        if seleccionado:
+            self.tree.selection_set(seleccionado)
+        else:
+            self.tree.selection_remove(self.tree.selection())
+        if total:
+            self.scrollbar.set(self.inicio / total, min(1.0, (self.inicio + visibles) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _alto_fila(self):
+        if self.alto_fila:
+            return self.alto_fila
+        estilo = self.tree.cget('style') or 'Treeview'
+        try:
+            return int(ttk.Style(self).lookup(estilo, 'rowheight') or 20)
+        except (tk.TclError, ValueError):
+            return 20
+
+    def _al_redimensionar(self, event):
+        # una fila de encabezado + las que entran en el alto disponible
+        visibles = max(1, event.height // self._alto_fila() - 1)
+        if visibles == len(self._huecos):
+            return
+        while len(self._huecos) < visibles:
+            self._huecos.append(self.tree.insert('', tk.END, values=()))
+        while len(self._huecos) > visibles:
+            self.tree.delete(self._huecos.pop())
+        self._dibujar()
+
+    def _al_seleccionar(self, event):
+        elegido = self.tree.selection()
+        if not elegido:
+            return
+        i = self.inicio + self._huecos.index(elegido[0])
+        self._seleccion = self.claves[i] if i < len(self.claves) else None
+
+    def _desplazar(self, accion, cantidad, unidad=None):
+        # mismo protocolo que yview: ('moveto', fracción) o ('scroll', n, 'units'|'pages')
+        if accion == 'moveto':
+            self.inicio = int(float(cantidad) * len(self.claves))
+            self._dibujar()
+        else:
+            self._mover(int(cantidad), unidad)
+
+    def _mover(self, n, unidad):
+        paso = max(1, len(self._huecos) - 1) if unidad == 'pages' else 1
+        self.inicio += n * paso
+        self._dibujar()
+        return 'break'
+
+    def _mover_seleccion(self, n):
+        if self._seleccion is None or not self.claves:
+            return None
+        i = max(0, min(len(self.claves) - 1, self._indice[self._seleccion] + n))
+        self._seleccion = self.claves[i]
+        if i < self.inicio:
+            self.inicio = i
+        elif i >= self.inicio + len(self._huecos):
+            self.inicio = i - len(self._huecos) + 1
+        self._dibujar()
+        return 'break'
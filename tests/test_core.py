@@ -0,0 +1,83 @@
+import pytest
+from core import Torneo, Equipo, Partido, TorneoError
+
+
+def _torneo(tmp_path, archivo='torneo.json'):
+    torneo = Torneo(nombre="Prueba", ruta=str(tmp_path / archivo), cargar=False)
+    for i in range(1, 5):
+        torneo.agregar_equipo(Equipo(f"A{i}", f"País {i}", grupo="A"))
+    ids = [torneo.agregar_partido(Partido(f"A{i}", f"A{j}")) for i in range(1, 5) for j in range(i + 1, 5)]
+    torneo.cerrar_configuracion()
+    return torneo, ids
+
+
+def _stats(torneo):
+    return {id: dict(e.stats) for id, e in torneo.equipos.items()}
+
+
+def test_corregir_marcador_descuenta_el_anterior(tmp_path):
+    torneo, ids = _torneo(tmp_path)
+    torneo.registrar_resultado(ids[0], 2, 1, ta1=2)
+    torneo.registrar_resultado(ids[0], 0, 3, tr2=1)
+
+    limpio, ids_limpio = _torneo(tmp_path, 'otro.json')
+    limpio.registrar_resultado(ids_limpio[0], 0, 3, tr2=1)
+    assert _stats(torneo) == _stats(limpio)
+    assert torneo.equipos["A2"].stats['Pts'] == 3 and torneo.equipos["A1"].stats['G'] == 0
+    assert torneo.reconstruir_estadisticas(aplicar=False) == []
+    _, puntos, goles = torneo.enfrentamientos_directos("A")
+    assert (puntos[0][1], puntos[1][0]) == (0, 3)
+    assert (goles[0][1], goles[1][0]) == (0, 3)
+    assert [e.identificador for e in torneo.calcular_tabla_posiciones("A")][0] == "A2"
+
+
+def test_resultado_sin_configuracion_cerrada(tmp_path):
+    torneo = Torneo(nombre="Prueba", ruta=str(tmp_path / 'torneo.json'), cargar=False)
+    torneo.agregar_equipo(Equipo("A1", "País 1", grupo="A"))
+    torneo.agregar_equipo(Equipo("A2", "País 2", grupo="A"))
+    mid = torneo.agregar_partido(Partido("A1", "A2"))
+    with pytest.raises(TorneoError):
+        torneo.registrar_resultado(mid, 1, 0)
+
+
+def test_lote_valido_se_aplica_entero(tmp_path):
+    torneo, ids = _torneo(tmp_path)
+    informe = torneo.registrar_resultados([
+        {'match_id': ids[0], 'goles_e1': 1, 'goles_e2': 0},
+        {'equipo1': "País 4", 'equipo2': "País 3", 'goles_e1': "2", 'goles_e2': 0},  # local y visitante al revés
+    ])
+    assert informe.ok
+    assert informe.aplicados == informe.validos == [ids[0], ids[5]]
+    assert (torneo.calendario[ids[5]].goles_e1, torneo.calendario[ids[5]].goles_e2) == (0, 2)
+    assert torneo.equipos["A4"].stats['Pts'] == 3
+
+
+def test_lote_con_conflictos_no_cambia_nada(tmp_path):
+    torneo, ids = _torneo(tmp_path)
+    torneo.registrar_resultado(ids[1], 1, 1)
+    antes = _stats(torneo)
+    informe = torneo.registrar_resultados([
+        {'match_id': ids[0], 'goles_e1': 1, 'goles_e2': 0},
+        {'match_id': ids[0], 'goles_e1': 2, 'goles_e2': 0},
+        {'match_id': ids[1], 'goles_e1': 0, 'goles_e2': 0},
+        {'equipo1': "Nadie", 'equipo2': "País 2", 'goles_e1': 0, 'goles_e2': 0},
+        {'match_id': ids[2], 'goles_e1': -1, 'goles_e2': 0},
+        {'match_id': ids[3], 'goles_e1': "dos", 'goles_e2': 0},
+        {'match_id': "M999", 'goles_e1': 0, 'goles_e2': 0},
+    ])
+    assert not informe.ok
+    assert [n for n, _ in informe.conflictos] == [2, 3, 4, 5, 6, 7]
+    assert "más de una vez" in informe.conflictos[0][1]
+    assert "ya tiene resultado" in informe.conflictos[1][1]
+    assert informe.validos == [ids[0]]
+    assert informe.aplicados == []
+    assert torneo.calendario[ids[0]].goles_e1 is None
+    assert _stats(torneo) == antes
+
+
+def test_lote_en_simulacion_solo_valida(tmp_path):
+    torneo, ids = _torneo(tmp_path)
+    informe = torneo.registrar_resultados([{'match_id': ids[0], 'goles_e1': 1, 'goles_e2': 0}], simulacion=True)
+    assert informe.ok and informe.validos == [ids[0]] and informe.aplicados == []
+    assert torneo.calendario[ids[0]].goles_e1 is None
+    assert torneo.equipos["A1"].stats['PJ'] == 0
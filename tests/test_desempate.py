@@ -0,0 +1,86 @@
+import pytest
+from core import Torneo, Equipo, Partido
+import cruces
+
+
+def _torneo(tmp_path, grupos):
+    torneo = Torneo(nombre="Prueba", ruta=str(tmp_path / 'torneo.json'), cargar=False)
+    for g, ids in grupos.items():
+        for ident in ids:
+            torneo.agregar_equipo(Equipo(ident, f"País {ident}", grupo=g))
+    return torneo
+
+
+def _jugar(torneo, resultados):
+    """resultados: [(id1, id2, goles1, goles2, amarillas1, amarillas2)]"""
+    ids = [torneo.agregar_partido(Partido(r[0], r[1])) for r in resultados]
+    torneo.cerrar_configuracion()
+    for mid, (_, _, g1, g2, ta1, ta2) in zip(ids, resultados):
+        torneo.registrar_resultado(mid, g1, g2, ta1, ta2)
+
+
+def _orden(torneo, grupo):
+    return [e.identificador for e in torneo.calcular_tabla_posiciones(grupo)]
+
+
+@pytest.mark.parametrize("x, y", [("A1", "A2"), ("A2", "A1")])
+def test_enfrentamiento_directo(tmp_path, x, y):
+    # x e y terminan con 4 puntos, DG 0 y 3 goles a favor; x le ganó a y
+    torneo = _torneo(tmp_path, {"A": ["A1", "A2", "A3", "A4"]})
+    _jugar(torneo, [(x, y, 2, 1, 0, 0), (x, "A3", 0, 1, 0, 0), (x, "A4", 1, 1, 0, 0),
+                    (y, "A3", 1, 0, 0, 0), (y, "A4", 1, 1, 0, 0), ("A3", "A4", 0, 0, 0, 0)])
+    assert torneo.equipos[x].stats == torneo.equipos[y].stats
+    orden = _orden(torneo, "A")
+    assert orden.index(x) < orden.index(y)
+
+
+@pytest.mark.parametrize("amonestado", ["A1", "A2", "A3"])
+def test_juego_limpio(tmp_path, amonestado):
+    # tres equipos que se ganaron en ronda 1-0: igualados en todo salvo las tarjetas
+    torneo = _torneo(tmp_path, {"A": ["A1", "A2", "A3"]})
+    partidos = [("A1", "A2"), ("A2", "A3"), ("A3", "A1")]
+    _jugar(torneo, [(a, b, 1, 0, 2 if a == amonestado else 0, 2 if b == amonestado else 0) for a, b in partidos])
+    assert _orden(torneo, "A")[-1] == amonestado
+
+
+def test_mejores_terceros_y_cruces(tmp_path):
+    grupos = {g: [f"{g}{i}" for i in range(1, 4)] for g in cruces.GRUPOS}
+    torneo = _torneo(tmp_path, grupos)
+    # el tercero de cada grupo pierde 0-3 con el primero y 0-k con el segundo
+    derrota = {"A": 1, "B": 4, "C": 2, "D": 5, "E": 3, "F": 6}
+    resultados = []
+    for g, (p, s, t) in grupos.items():
+        resultados += [(p, s, 3, 0, 0, 0), (p, t, 3, 0, 0, 0), (s, t, derrota[g], 0, 0, 0)]
+    _jugar(torneo, resultados)
+
+    assert [e.identificador for e in torneo.mejores_terceros()] == ["A3", "C3", "E3", "B3"]
+    assert torneo.asignacion_terceros() == {'A': 'C', 'B': 'A', 'C': 'B', 'D': 'E'}
+    cruces_octavos = {codigo: (l.identificador, v.identificador) for codigo, l, v in torneo.cruces_octavos()}
+    assert cruces_octavos["M38"] == ("D1", "E3")
+    assert cruces_octavos["M39"] == ("B1", "A3")
+    assert cruces_octavos["M40"] == ("A1", "C3")
+    assert cruces_octavos["M42"] == ("C1", "B3")
+    assert cruces_octavos["M37"] == ("A2", "C2")
+
+
+def test_terceros_igualados_por_juego_limpio(tmp_path):
+    grupos = {g: [f"{g}{i}" for i in range(1, 4)] for g in cruces.GRUPOS}
+    torneo = _torneo(tmp_path, grupos)
+    resultados = []
+    for g, (p, s, t) in grupos.items():
+        # A y B con terceros idénticos salvo que el de A vio una amarilla
+        k = {"A": 1, "B": 1}.get(g, 5)
+        resultados += [(p, s, 3, 0, 0, 0), (p, t, 3, 0, 0, 1 if g == "A" else 0), (s, t, k, 0, 0, 0)]
+    _jugar(torneo, resultados)
+    assert [e.identificador for e in torneo.mejores_terceros()][:2] == ["B3", "A3"]
+
+
+def test_tabla_de_terceros_completa():
+    for clave, rivales in cruces.TERCEROS.items():
+        asignacion = cruces.grupos_de_terceros(reversed(clave))
+        # cada tercero va a un solo cruce y nunca contra el primero de su propio grupo
+        assert sorted(asignacion.values()) == sorted(clave)
+        assert all(rival != grupo for rival, grupo in asignacion.items())
+        for rival, grupo in asignacion.items():
+            puesto = next(v for _, l, v in cruces.OCTAVOS if l == f"1°{rival}" and v.startswith("3°"))
+            assert grupo in puesto
@@ -0,0 +1,48 @@
+from collections import Counter
+import pytest
+from core import Torneo
+from fixture import nombres_grupos, round_robin, generar_fixture, cargar_en_torneo
+
+
+@pytest.mark.parametrize("n", range(2, 9))
+def test_todos_contra_todos(n):
+    equipos = [f"E{i}" for i in range(n)]
+    partidos = list(round_robin(equipos))
+    jornadas = n - 1 if n % 2 == 0 else n
+    assert len(partidos) == n * (n - 1) // 2
+    assert {frozenset((l, v)) for _, l, v in partidos} == {frozenset((a, b)) for a in equipos for b in equipos if a < b}
+    assert {j for j, _, _ in partidos} == set(range(1, jornadas + 1))
+    for jornada in range(1, jornadas + 1):
+        en_cancha = [e for j, l, v in partidos if j == jornada for e in (l, v)]
+        assert len(en_cancha) == len(set(en_cancha)) == n - n % 2  # con impar uno descansa
+    locales = Counter(l for _, l, _ in partidos)
+    assert max(abs(2 * locales[e] - (n - 1)) for e in equipos) <= 1
+
+
+def test_ida_y_vuelta_invierte_la_localia():
+    equipos = ["A", "B", "C", "D"]
+    ida = [(j, l, v) for j, l, v in round_robin(equipos, ida_y_vuelta=True) if j <= 3]
+    vuelta = [(j, l, v) for j, l, v in round_robin(equipos, ida_y_vuelta=True) if j > 3]
+    assert [(j + 3, v, l) for j, l, v in ida] == vuelta
+
+
+def test_menos_de_dos_equipos():
+    assert list(round_robin(["A"])) == []
+
+
+def test_nombres_grupos():
+    assert nombres_grupos(3) == ["A", "B", "C"]
+    assert nombres_grupos(28)[25:] == ["Z", "AA", "AB"]
+
+
+def test_cargar_en_torneo(tmp_path):
+    torneo = Torneo(nombre="Prueba", ruta=str(tmp_path / 'torneo.json'), cargar=False)
+    grupos = {"A": ["Chile", "Japón", "Egipto", "Nueva Zelanda"], "B": ["Francia", "Sudáfrica", "Noruega"]}
+    nuevos = cargar_en_torneo(torneo, grupos, confederaciones={"Chile": "CONMEBOL", "Japón": "AFC"})
+    assert len(nuevos) == len(list(generar_fixture(grupos))) == 9
+    assert (torneo.equipos["A1"].pais, torneo.equipos["A1"].confederacion) == ("Chile", "CONMEBOL")
+    assert torneo.equipos["B3"].grupo == "B"
+    assert torneo.buscar_partido("A1", "A2") in nuevos
+    # otra vez con los mismos grupos: no se duplica nada
+    assert cargar_en_torneo(torneo, grupos) == []
+    assert len(torneo.calendario) == 9
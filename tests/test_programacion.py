@@ -0,0 +1,43 @@
+from datetime import date, timedelta
+import pytest
+from core import Torneo, Equipo, Partido, TorneoError
+from fixture import nombres_grupos, generar_fixture
+from programacion import programar_torneo, SEDES
+
+
+def _torneo(tmp_path, n_grupos, dias=None):
+    torneo = Torneo(nombre="Prueba", ruta=str(tmp_path / 'torneo.json'), cargar=False)
+    grupos = {g: [f"{g}{pos}" for pos in range(1, 5)] for g in nombres_grupos(n_grupos)}
+    for g, ids in grupos.items():
+        for ident in ids:
+            torneo.agregar_equipo(Equipo(ident, f"País {ident}", grupo=g))
+    for fila in generar_fixture(grupos):
+        torneo.agregar_partido(Partido(fila['Equipo1'], fila['Equipo2'], fase="Fase de Grupos"))
+    if dias:
+        torneo.fecha_fin = (date.fromisoformat(torneo.fecha_inicio) + timedelta(days=dias - 1)).isoformat()
+    return torneo
+
+
+def test_programa_todos_los_partidos(tmp_path):
+    torneo = _torneo(tmp_path, 6)
+    assert len(programar_torneo(torneo, fechas_fijas={})) == 36
+    por_dia = {}
+    for p in torneo.calendario.values():
+        por_dia.setdefault(p.fecha, []).append(p.sede)
+    assert all(len(sedes) == len(set(sedes)) <= len(SEDES) for sedes in por_dia.values())
+
+
+def test_mas_partidos_que_turnos_de_sede(tmp_path):
+    with pytest.raises(TorneoError, match="96 partidos no entran en 92 turnos"):
+        programar_torneo(_torneo(tmp_path, 16), fechas_fijas={})
+
+
+def test_descanso_que_no_entra_en_las_fechas(tmp_path):
+    with pytest.raises(TorneoError, match="necesita 7 días y el torneo tiene 6"):
+        programar_torneo(_torneo(tmp_path, 1, dias=6), fechas_fijas={})
+
+
+def test_busqueda_sin_solucion_termina(tmp_path):
+    # pasa las cotas (48 partidos, 48 turnos) pero las jornadas no se acomodan en 12 días
+    with pytest.raises(TorneoError, match="No se encontró una programación"):
+        programar_torneo(_torneo(tmp_path, 8, dias=12), fechas_fijas={})
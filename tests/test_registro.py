@@ -0,0 +1,78 @@
+import gc
+import sqlite3
+import weakref
+import pytest
+from core import Equipo, Partido
+from registro import RegistroTorneos
+from agregados import agregados_de
+from jugadores import estadisticas_de
+
+
+def _registro(tmp_path):
+    reg = RegistroTorneos(max_residentes=1, ruta_catalogo=str(tmp_path / 'torneos.json'))
+    reg.registrar('a', str(tmp_path / 'a.json'))
+    reg.registrar('b', str(tmp_path / 'b.json'))
+    return reg
+
+
+def _con_resultado(torneo):
+    for i in range(1, 3):
+        torneo.agregar_equipo(Equipo(f"A{i}", f"País {i}", grupo="A"))
+    mid = torneo.agregar_partido(Partido("A1", "A2"))
+    torneo.cerrar_configuracion()
+    torneo.registrar_resultado(mid, 2, 1)
+    return mid
+
+
+def test_descargar_libera_torneo_con_agregados(tmp_path):
+    reg = _registro(tmp_path)
+    torneo = reg.abrir('a')
+    _con_resultado(torneo)
+    assert agregados_de(torneo).posiciones()
+    ref = weakref.ref(torneo)
+    del torneo
+
+    reg.abrir('b')  # con max_residentes=1 se descarga 'a'
+    gc.collect()
+    assert ref() is None
+
+
+def test_agregados_siguen_al_dia_tras_descargar(tmp_path):
+    reg = _registro(tmp_path)
+    torneo = reg.abrir('a')
+    mid = _con_resultado(torneo)
+    agregados = agregados_de(torneo)  # como los guarda una pantalla abierta
+    reg.descargar('a')
+
+    assert reg.abrir('a') is torneo
+    torneo.registrar_resultado(mid, 3, 3)
+    assert agregados_de(torneo) is agregados
+    assert agregados.resultados_grupos() == [["A", "País 1", "País 2", "3 - 3"]]
+
+
+def test_descargar_cierra_la_base_sqlite(tmp_path):
+    reg = _registro(tmp_path)
+    reg.registrar('c', str(tmp_path / 'c.db'))
+    torneo = reg.abrir('c')
+    _con_resultado(torneo)
+    conexion = torneo.almacen.conn
+    del torneo
+
+    reg.abrir('b')
+    gc.collect()
+    with pytest.raises(sqlite3.ProgrammingError):
+        conexion.execute("SELECT 1")
+
+
+def test_descargar_libera_torneo_con_estadisticas_de_jugadores(tmp_path):
+    reg = _registro(tmp_path)
+    torneo = reg.abrir('a')
+    mid = _con_resultado(torneo)
+    torneo.registrar_jugadores(mid, [{'jugador': "Goleador", 'equipo': "A1", 'goles': 2}])
+    assert estadisticas_de(torneo).bota_de_oro() == [["Goleador", "País 1", 2, 0, 0]]
+    ref = weakref.ref(torneo)
+    del torneo
+
+    reg.abrir('b')
+    gc.collect()
+    assert ref() is None
@@ -0,0 +1,24 @@
+import pytest
+from core import Torneo, Equipo, Partido
+from fixture import generar_fixture
+from simulador import SimuladorTorneo
+
+
+def _torneo(tmp_path, grupos):
+    torneo = Torneo(nombre="Prueba", ruta=str(tmp_path / 'torneo.json'), cargar=False)
+    for g, ids in grupos.items():
+        for ident in ids:
+            torneo.agregar_equipo(Equipo(ident, f"País {ident}", grupo=g))
+    for fila in generar_fixture(grupos):
+        torneo.agregar_partido(Partido(fila['Equipo1'], fila['Equipo2'], fase="Fase de Grupos"))
+    return torneo
+
+
+def test_grupos_de_distinto_tamano(tmp_path):
+    torneo = _torneo(tmp_path, {"A": ["A1", "A2", "A3", "A4"], "B": ["B1", "B2", "B3"]})
+    resultado = SimuladorTorneo(torneo, semilla=0).simular(2000, lote=500)
+    assert len(resultado) == 7
+    for puesto in ('1°', '2°', '3°'):
+        assert sum(p[puesto] for p in resultado.values()) == pytest.approx(2)
+    assert sum(p['Semifinal'] for p in resultado.values()) == pytest.approx(4)
+    assert sum(p['Campeón'] for p in resultado.values()) == pytest.approx(1)
@@ -0,0 +1,42 @@
+from collections import Counter
+import pytest
+from core import TorneoError
+from sorteo import Sorteo, armar_bombos, analizar_equidad
+
+CONFEDERACIONES = {"Francia": "UEFA", "España": "UEFA", "Italia": "UEFA", "Noruega": "UEFA",
+                   "Brasil": "CONMEBOL", "Argentina": "CONMEBOL", "Japón": "AFC", "Corea": "AFC",
+                   "Nigeria": "CAF", "Marruecos": "CAF", "México": "CONCACAF", "Nueva Zelanda": "OFC"}
+BOMBOS = [["Francia", "Brasil", "Japón"], ["España", "Argentina", "Nigeria"],
+          ["Italia", "Corea", "Marruecos"], ["Noruega", "México", "Nueva Zelanda"]]
+
+
+def test_respeta_maximos_por_confederacion():
+    sorteo = Sorteo(BOMBOS, CONFEDERACIONES)
+    for resultado in sorteo.muestrear(500, semilla=1):
+        assert list(resultado) == ["A", "B", "C"]
+        for equipos in resultado.values():
+            assert [next(i for i, b in enumerate(BOMBOS) if e in b) for e in equipos] == [0, 1, 2, 3]
+            cuentas = Counter(CONFEDERACIONES[e] for e in equipos)
+            assert cuentas["UEFA"] <= 2
+            assert all(n == 1 for c, n in cuentas.items() if c != "UEFA")
+
+
+def test_ningun_grupo_favorecido():
+    por_equipo, _ = analizar_equidad(Sorteo(BOMBOS, CONFEDERACIONES).muestrear(3000, semilla=0))
+    for equipo, grupos in por_equipo.items():
+        for proporcion in grupos.values():
+            assert proporcion == pytest.approx(1 / 3, abs=0.04), equipo
+
+
+def test_sorteo_imposible():
+    with pytest.raises(TorneoError, match="Ningún sorteo"):
+        Sorteo([["Francia", "España"], ["Italia", "Brasil"]], CONFEDERACIONES, maximos={"UEFA": 1})
+
+
+def test_armar_bombos_por_orden_o_por_numero():
+    equipos = ["Francia", "Brasil", "España", "Japón"]
+    assert armar_bombos(equipos, 2) == [["Francia", "Brasil"], ["España", "Japón"]]
+    assert armar_bombos(equipos, 2, {"Francia": 1, "España": 1, "Brasil": 2, "Japón": 2}) == \
+        [["Francia", "España"], ["Brasil", "Japón"]]
+    with pytest.raises(TorneoError, match="bombo 2"):
+        armar_bombos(equipos[:3], 2)
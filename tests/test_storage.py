@@ -0,0 +1,74 @@
+import os
+import pytest
+import storage
+from core import Torneo, Equipo, Partido
+
+
+def _torneo(ruta):
+    torneo = Torneo(nombre="Prueba", ruta=str(ruta), cargar=False)
+    for i in range(1, 5):
+        torneo.agregar_equipo(Equipo(f"A{i}", f"País {i}", grupo="A"))
+    ids = [torneo.agregar_partido(Partido(f"A{i}", f"A{j}")) for i in range(1, 5) for j in range(i + 1, 5)]
+    torneo.cerrar_configuracion()
+    return torneo, ids
+
+
+def _marcadores(torneo):
+    return {mid: (p.goles_e1, p.goles_e2) for mid, p in torneo.calendario.items()}
+
+
+@pytest.mark.parametrize("nombre", ["torneo.json", "torneo.db"])
+def test_reabrir_reproduce_los_resultados(tmp_path, nombre):
+    torneo, ids = _torneo(tmp_path / nombre)
+    torneo.registrar_resultado(ids[0], 2, 1, ta1=1)
+    torneo.registrar_resultado(ids[1], 0, 0)
+    torneo.registrar_resultado(ids[0], 3, 1)  # corrección
+
+    copia = Torneo(nombre="Prueba", ruta=str(tmp_path / nombre))
+    assert _marcadores(copia) == _marcadores(torneo)
+    assert ([e.identificador for e in copia.calcular_tabla_posiciones("A")]
+            == [e.identificador for e in torneo.calcular_tabla_posiciones("A")])
+    assert copia.equipos["A1"].stats == torneo.equipos["A1"].stats
+
+
+def test_diario_se_reaplica_sobre_la_instantanea(tmp_path):
+    torneo, ids = _torneo(tmp_path / 'torneo.json')
+    torneo.registrar_resultado(ids[0], 2, 1)
+    torneo.registrar_resultado(ids[1], 1, 1)
+    diario = tmp_path / 'torneo.journal'
+    assert len(diario.read_bytes().splitlines()) == 2
+
+    copia = Torneo(nombre="Prueba", ruta=str(tmp_path / 'torneo.json'))
+    assert _marcadores(copia) == _marcadores(torneo)
+
+
+def test_ultima_linea_cortada_se_descarta(tmp_path):
+    torneo, ids = _torneo(tmp_path / 'torneo.json')
+    torneo.registrar_resultado(ids[0], 2, 1)
+    torneo.registrar_resultado(ids[1], 1, 1)
+    diario = tmp_path / 'torneo.journal'
+    contenido = diario.read_bytes()
+    diario.write_bytes(contenido[:-10])  # la caída cortó la última escritura
+
+    copia = Torneo(nombre="Prueba", ruta=str(tmp_path / 'torneo.json'))
+    assert copia.calendario[ids[0]].goles_e1 == 2
+    assert copia.calendario[ids[1]].goles_e1 is None
+    assert copia.equipos["A1"].stats['PJ'] == 1
+
+
+def test_diario_grande_se_compacta(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, 'DIARIO_MIN_BYTES', 0)
+    torneo, ids = _torneo(tmp_path / 'torneo.json')
+    diario = tmp_path / 'torneo.journal'
+    compactado = False
+    for n in range(20):
+        torneo.registrar_resultado(ids[n % len(ids)], n % 4, 1)
+        if not diario.exists():
+            compactado = True
+    assert compactado
+    # el diario nunca pesa más que la proporción fijada de la instantánea
+    tam_instantanea = os.path.getsize(tmp_path / 'torneo.json')
+    assert not diario.exists() or diario.stat().st_size <= storage.PROPORCION_DIARIO * tam_instantanea
+
+    copia = Torneo(nombre="Prueba", ruta=str(tmp_path / 'torneo.json'))
+    assert _marcadores(copia) == _marcadores(torneo)
@@ -2,6 +2,7 @@
 import tkinter as tk
 from tkinter import ttk
 import os
+import unicodedata
 
 def apply_style(root):
     style = ttk.Style(root)
@@ -19,6 +20,11 @@ def apply_style(root):
     style.map("TButton", foreground=[('active','white')], background=[('active',primary),('!disabled',primary)])
     return style
 
+def normalize_name(pais):
+    """'Japón' -> 'japon', 'Corea del Sur' -> 'coreadelsur' (nombre de archivo de la bandera)."""
+    pais = ''.join(c for c in unicodedata.normalize('NFD', pais) if unicodedata.category(c) != 'Mn')
+    return pais.lower().replace(' ', '').replace('’', '').replace("'", "")
+
 def center_fullscreen(root):
     root.update_idletasks()
     if os.name == 'nt':